@@ -0,0 +1,74 @@
+""" Cost of validating node responses: jsonschema.validate on every response
+as before, the validator compiled once per query class, and the fast check
+of the required keys. The mix is what the peer monitor gets from every
+peer, plus a full mempool.
+
+    python -m benchmarks.node_responses
+"""
+
+import os
+import random
+import timeit
+
+from jsonschema import validate
+
+# the query modules are imported through the API clients, which read the settings
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+from burst.api.brs.p2p import queries as p2p
+from burst.api.brs.v1 import queries as v1
+
+PEERS = 200
+
+
+def peer_responses() -> list:
+    random.seed(0)
+    ids = [str(random.getrandbits(64)) for _ in range(100)]
+    addresses = [f"{random.randrange(256)}.{random.randrange(256)}.{random.randrange(256)}.1" for _ in range(300)]
+    return [
+        (p2p.GetInfo(), {
+            "announcedAddress": "peer.example.org",
+            "application": "BRS",
+            "version": "v3.7.2",
+            "platform": "PC",
+            "shareAddress": True,
+        }),
+        (p2p.GetCumulativeDifficulty(), {
+            "cumulativeDifficulty": "123456789012345678901234567890",
+            "blockchainHeight": 1200000,
+        }),
+        (p2p.GetNextBlockIds({"blockId": ids[0]}), {"nextBlockIds": ids}),
+        (p2p.GetPeers(), {"peers": addresses}),
+    ]
+
+
+def mempool_response() -> tuple:
+    tx = {
+        "type": 0, "subtype": 0, "timestamp": 154715780, "deadline": 1000,
+        "senderPublicKey": "447db598ab0b8b128516b3a70b9d87ea4cdb460fb4c550167cbfceda865fb03d",
+        "recipient": "13493329130306648054", "amountNQT": 10000000, "feeNQT": 735000,
+        "ecBlockHeight": 639673, "ecBlockId": "3483458127310479448", "attachment": {}, "version": 1,
+    }
+    return (
+        v1.GetUnconfirmedTransactions(),
+        {"unconfirmedTransactions": [dict(tx) for _ in range(1000)], "requestProcessingTime": 3},
+    )
+
+
+def bench(name: str, func, responses: int, number: int = 5):
+    seconds = min(timeit.repeat(func, number=1, repeat=number))
+    print(f"{name:<34} {seconds / responses * 10 ** 6:8.2f} us/response")
+
+
+def main():
+    crawl = peer_responses() * PEERS
+    mempool = [mempool_response()]
+
+    for name, responses in (("peer crawl", crawl), ("mempool", mempool)):
+        bench(f"{name}, jsonschema.validate", lambda: [validate(d, q._response_json_schema) for q, d in responses], len(responses))
+        bench(f"{name}, compiled", lambda: [q._check_schema(d) for q, d in responses], len(responses))
+        bench(f"{name}, fast", lambda: [q._check_required(d) for q, d in responses], len(responses))
+
+
+if __name__ == "__main__":
+    main()
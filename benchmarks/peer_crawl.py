@@ -0,0 +1,124 @@
+""" Crawl time of peer_cmd and of the pending transactions refresh against a
+fake network on the loopback (see scan/tests/fake_node.py), no node or
+database needed: the tip comes from the fake network and the updates are
+classified with check_state instead of being written to PeerMonitor. The
+refresh runs CachingPendingTxs as watch_pending_txs does, with the account
+lookups answered from memory.
+
+    python -m benchmarks.peer_crawl --peers 200 --latency 0.05 --failure-rate 0.1
+"""
+
+import argparse
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+# the API clients and the crawler read the settings
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django
+
+django.setup()
+
+from django.test import override_settings
+
+from scan import peers
+from scan.caching_data.pending_txs import CachingPendingTxs
+from scan.models import PeerMonitor
+from scan.tests.fake_node import FakeNetwork, cumulative_difficulty
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+def crawl(network: FakeNetwork, seeds: int) -> None:
+    local_difficulty = network.local_difficulty()
+    results = {}
+
+    def apply_updates(local_difficulty, updates, addresses):
+        results.update(updates)
+
+    with mock.patch.multiple(
+        peers,
+        get_local_difficulty=lambda: local_difficulty,
+        get_nodes_list=lambda: network.addresses[:seeds],
+        get_country_by_ip=lambda ip: "??",
+        get_block_cumulative_difficulty=cumulative_difficulty,
+        apply_updates=apply_updates,
+    ):
+        requests = network.requests
+        start = time.perf_counter()
+        peers.peer_cmd()
+        seconds = time.perf_counter() - start
+
+        state_names = dict(PeerMonitor.STATE_CHOICES)
+        states = Counter(
+            state_names[peers.check_state(local_difficulty, update, None) if update else PeerMonitor.State.UNREACHABLE]
+            for update in results.values()
+        )
+    print(
+        f"peer_cmd: {len(results)} peers in {seconds:.2f} s, {len(results) / seconds:.1f} peers/s, "
+        f"{network.requests - requests} requests"
+    )
+    print("  " + ", ".join(f"{state} {count}" for state, count in sorted(states.items())))
+
+
+def mempool(network: FakeNetwork, calls: int, threads: int) -> None:
+    pending_txs = CachingPendingTxs()
+
+    def call(_):
+        try:
+            pending_txs.update_live_data()
+            return len(pending_txs.cached_data)
+        except Exception:
+            return None
+
+    accounts = mock.MagicMock()
+    accounts.using.return_value.filter.return_value.values_list.return_value.distinct.return_value = []
+    with override_settings(SIGNUM_NODE=network.api_url, CACHES=LOCMEM_CACHES), \
+            mock.patch("scan.caching_data.pending_txs.Account.objects", accounts), \
+            mock.patch("scan.caching_data.pending_txs.get_account_names", return_value={}):
+        for workers in sorted({1, threads}):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(call, range(calls)))
+            seconds = time.perf_counter() - start
+            failed = results.count(None)
+            print(
+                f"CachingPendingTxs.update_live_data, {workers} thread(s): {calls / seconds:.1f} calls/s, "
+                f"{seconds / calls * 1000:.2f} ms/call, {failed} failed"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--peers", type=int, default=100)
+    parser.add_argument("--seeds", type=int, default=5, help="peers known before the crawl")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per request")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--fork-rate", type=float, default=0.05)
+    parser.add_argument("--lag", type=int, default=3, help="peers are up to LAG blocks behind")
+    parser.add_argument("--mempool", type=int, default=1000, help="unconfirmed transactions")
+    parser.add_argument("--calls", type=int, default=50, help="pending transactions refreshes")
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    logging.getLogger("scan.peers").setLevel(logging.WARNING)
+
+    with FakeNetwork(
+        peers=args.peers,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+        fork_rate=args.fork_rate,
+        lag=args.lag,
+        mempool=args.mempool,
+    ) as network:
+        crawl(network, args.seeds)
+        mempool(network, args.calls, args.threads)
+
+
+if __name__ == "__main__":
+    main()
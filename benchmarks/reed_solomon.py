@@ -0,0 +1,102 @@
+""" Per-address cost of the Reed-Solomon codec, compared with the string
+based long division it replaced.
+
+    python -m benchmarks.reed_solomon
+"""
+
+import random
+import timeit
+from functools import lru_cache
+
+from burst.libs.reed_solomon import (
+    alphabet,
+    base_10_length,
+    base_32_length,
+    codeword_map,
+    cypher_string_length,
+    decode_many,
+    encode_id,
+    encode_many,
+    gf_mul,
+    initial_codeword_length,
+)
+
+ADDRESSES = 10000
+
+
+def legacy_encode(plain: str) -> str:
+    plain_string = bytearray(plain, "utf-8")
+    length = len(plain_string)
+
+    plain_string_10 = bytearray(base_10_length)
+    for x in range(length):
+        plain_string_10[x] = plain_string[x] - ord("0")
+
+    codeword = bytearray(initial_codeword_length)
+
+    codeword_length = 0
+    while length > 0:
+        new_length = 0
+        digit_32 = 0
+
+        for x in range(length):
+            digit_32 = digit_32 * 10 + plain_string_10[x]
+            if digit_32 >= 32:
+                plain_string_10[new_length] = digit_32 >> 5
+                digit_32 &= 31
+                new_length += 1
+            elif new_length > 0:
+                plain_string_10[new_length] = 0
+                new_length += 1
+
+        length = new_length
+        codeword[codeword_length] = digit_32
+        codeword_length += 1
+
+    p = bytearray(4)
+
+    for x in range(base_32_length - 1, -1, -1):
+        fb = codeword[x] ^ p[3]
+        p[3] = p[2] ^ gf_mul(30, fb)
+        p[2] = p[1] ^ gf_mul(6, fb)
+        p[1] = p[0] ^ gf_mul(9, fb)
+        p[0] = gf_mul(17, fb)
+
+    for x in range(4):
+        codeword[x + base_32_length] = p[x]
+
+    cypher_string_builder = ""
+
+    for x in range(cypher_string_length):
+        cypher_string_builder += alphabet[codeword[codeword_map[x]]]
+
+        if (x & 3) == 3 and x < 13:
+            cypher_string_builder += "-"
+
+    return cypher_string_builder
+
+
+def bench(name: str, func, number: int = 5):
+    seconds = min(timeit.repeat(func, number=1, repeat=number))
+    print(f"{name:<34} {seconds / ADDRESSES * 10 ** 6:8.2f} us/address")
+
+
+def main():
+    random.seed(0)
+    account_ids = [random.getrandbits(64) for _ in range(ADDRESSES)]
+    addresses = encode_many(account_ids)
+    assert addresses == [legacy_encode(str(account_id)) for account_id in account_ids]
+
+    cached = lru_cache(maxsize=None)(encode_id)
+    encode_many(account_ids)
+    for account_id in account_ids:
+        cached(account_id)
+
+    bench("legacy encode", lambda: [legacy_encode(str(account_id)) for account_id in account_ids])
+    bench("encode_many", lambda: encode_many(account_ids))
+    bench("encode, lru cache hit", lambda: [cached(account_id) for account_id in account_ids])
+    bench("decode_many", lambda: decode_many(addresses))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,8 @@ class P2PApi(BrsApiBase):
     headers = {"User-Agent": f"BRS/{settings.BRS_P2P_VERSION}"}
 
     _default_port = settings.DEFAULT_P2P_PORT
+    # peers are visited once per scan, keeping connections to them is useless
+    _shared_client = False
 
     def get_peers(self) -> list:
         return self._request(queries.GetPeers())["peers"]
@@ -1,50 +1,64 @@
 """ https://github.com/burst-apps-team/burstcoin/tree/develop/src/brs/http
 """
 
+from functools import lru_cache
 from urllib.parse import urlparse
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
-from requests import session
-from requests.exceptions import RequestException
 
 from burst.api.brs.v1 import queries
+from burst.api.client import NodeClient, get_client
 from burst.api.exceptions import APIException, ClientException
 from burst.api.typing import JSONType
 
 
+@lru_cache(maxsize=1024)
+def get_node_url(node_address: str, default_port: int) -> str:
+    """ Validated URL of the node, with the default port if none is given """
+    if not node_address.startswith("http"):
+        node_address = f"http://{node_address}"
+
+    validate = URLValidator()
+    try:
+        validate(node_address)
+    except ValidationError:
+        raise ClientException("Not valid address")
+
+    parsed_url = urlparse(node_address)
+
+    if not parsed_url.port and not parsed_url.query:
+        node_address = f"{node_address}:{default_port}"
+
+    return node_address
+
+
 class BrsApiBase:
     endpoint = "burst"
     headers = None
     _default_port = settings.DEFAULT_API_V1_PORT
-    _session = None
+    # share the pooled client of the node with the other instances, see get_client,
+    # otherwise use a client of the instance, without retries
+    _shared_client = True
+    _client = None
 
-    def __init__(self, node_address: str) -> None:
+    def __init__(self, node_address: str, timeout: float = None) -> None:
         """Constructor
         :param node_address: domain or ip address
+        :param timeout: seconds to connect and to wait for data, instead of the timeout of each query
         """
-        if not node_address.startswith("http"):
-            node_address = f"http://{node_address}"
-
-        validate = URLValidator()
-        try:
-            validate(node_address)
-        except ValidationError:
-            raise ClientException("Not valid address")
-
-        parsed_url = urlparse(node_address)
-
-        if not parsed_url.port and not parsed_url.query:
-            node_address = f"{node_address}:{self._default_port}"
-
-        self.node_url = node_address
-        self._session = session()
+        self.node_url = get_node_url(node_address, self._default_port)
+        self.timeout = timeout
+        if self._shared_client:
+            self._client = get_client(self.node_url)
+        else:
+            self._client = NodeClient(self.node_url, retries=0)
 
     def _close_session(self) -> None:
-        """ Close session if exists"""
-        if self._session:
-            self._session.close()
+        """ Close session if not shared"""
+        if self._client and not self._shared_client:
+            self._client.close()
 
     def __del__(self) -> None:
         """ Destructor """
@@ -54,19 +68,15 @@ class BrsApiBase:
         """ Make HTTP request using requests module """
         url = f"{self.node_url}/{self.endpoint}"
 
-        try:
-            response = self._session.request(
-                query.http_method,
-                url,
-                headers=self.headers,
-                json=query.params if query.http_method == "POST" else None,
-                params=query.params if query.http_method == "GET" else None,
-                timeout=query.timeout,
-                verify=False,
-            )
-            response.raise_for_status()
-        except RequestException as e:
-            raise APIException("network", e)
+        response = self._client.request(
+            query.http_method,
+            url,
+            headers=self.headers,
+            json=query.params if query.http_method == "POST" else None,
+            params=query.params if query.http_method == "GET" else None,
+            timeout=self.timeout or query.timeout,
+            verify=False,
+        )
 
         try:
             json_response = response.json()
@@ -93,6 +103,9 @@ class BrsApi(BrsApiBase):
     def get_asset(self, asset_id: int) -> dict:
         return self._request(queries.GetAsset({"asset": asset_id}))
 
+    def get_assets(self, asset_ids: list) -> list:
+        return self._request(queries.GetAssets({"assets": asset_ids}))["assets"]
+
     def get_mining_info(self) -> dict:
         return self._request(queries.GetMiningInfo())
 
@@ -3,10 +3,38 @@
 
 import abc, os
 
-from jsonschema import ValidationError, validate
+from django.conf import settings
+from jsonschema import ValidationError
+from jsonschema.validators import validator_for
 
 from burst.api.exceptions import APIException, ClientException
 
+# python types of the JSON schema types, bool is not a number in JSON
+JSON_TYPES = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+
+def compile_required(schema: dict) -> tuple:
+    """ (key, python types, bool allowed) of every required key of the schema """
+    checks = []
+    for key in schema.get("required", ()):
+        json_types = schema.get("properties", {}).get(key, {}).get("type")
+        if json_types is None:
+            checks.append((key, (object,), True))
+            continue
+        if isinstance(json_types, str):
+            json_types = [json_types]
+        types = sum((JSON_TYPES[json_type] for json_type in json_types), ())
+        checks.append((key, types, "boolean" in json_types))
+    return tuple(checks)
+
 
 class QueryBase(abc.ABC):
     _request_type_field = "requestType"
@@ -65,6 +93,16 @@ class QueryBase(abc.ABC):
         if unknown_params:
             raise ClientException(f"Unknown params: {unknown_params}")
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        """ Compile the response schema once per query class """
+        super().__init_subclass__(**kwargs)
+        schema = cls.__dict__.get("_response_json_schema")
+        if schema:
+            validator_class = validator_for(schema)
+            validator_class.check_schema(schema)
+            cls._response_validator = validator_class(schema)
+            cls._response_required = compile_required(schema)
+
     def validate_response(self, data) -> bool:
         # TODO: return true or raise
         if not self._response_json_schema:
@@ -73,12 +111,28 @@ class QueryBase(abc.ABC):
         if self._error_field in data:
             raise APIException(data)
 
+        if settings.NODE_RESPONSE_VALIDATION == "fast":
+            self._check_required(data)
+        else:
+            self._check_schema(data)
+        return True
+
+    def _check_schema(self, data) -> None:
         try:
-            validate(data, self._response_json_schema)
+            self._response_validator.validate(data)
         except ValidationError as e:
             raise APIException("malformed_data", e)
-        else:
-            return True
+
+    def _check_required(self, data) -> None:
+        """ Only the presence and the type of the required keys """
+        if not isinstance(data, dict):
+            raise APIException("malformed_data", "not an object")
+        for key, types, bool_allowed in self._response_required:
+            if key not in data:
+                raise APIException("malformed_data", f"{key!r} is a required property")
+            value = data[key]
+            if not isinstance(value, types) or (isinstance(value, bool) and not bool_allowed):
+                raise APIException("malformed_data", f"{value!r} is not of type {types} ({key!r})")
 
 
 class GetPeers(QueryBase):
@@ -172,6 +226,20 @@ class GetAsset(QueryBase):
         ],
     }
 
+class GetAssets(QueryBase):
+    _request_type = "getAssets"
+    _http_method = "GET"
+    _required_params = {"assets"}
+    _response_json_schema = {
+        "type": "object",
+        "properties": {
+            "assets": {"type": "array"},
+            "requestProcessingTime": {"type": "number"},
+        },
+        "required": ["assets", "requestProcessingTime"],
+    }
+
+
 class GetBlockChainStatus(QueryBase):
     _request_type = "getBlockchainStatus"
     _http_method = "GET"
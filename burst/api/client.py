@@ -0,0 +1,102 @@
+""" HTTP client of a node: one keep-alive session per node URL per process,
+with retries and a circuit breaker.
+"""
+import threading
+import time
+
+from django.conf import settings
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
+
+from burst.api.exceptions import APIException
+
+
+class CircuitBreaker:
+    """ Opens after ``failures`` consecutive failures: calls then fail at once
+    for ``reset_timeout`` seconds, after which a single call is let through to
+    probe the node. Its success closes the circuit again.
+    """
+
+    def __init__(self, failures: int, reset_timeout: float) -> None:
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self._failed = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def success(self) -> None:
+        with self._lock:
+            self._failed = 0
+            self._opened_at = None
+            self._probing = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self._failed += 1
+            self._probing = False
+            if self._failed >= self.failures:
+                self._opened_at = time.monotonic()
+
+
+class NodeClient:
+    def __init__(self, node_url: str, retries: int = None) -> None:
+        self.node_url = node_url
+        self.breaker = CircuitBreaker(settings.NODE_BREAKER_FAILURES, settings.NODE_BREAKER_RESET_TIMEOUT)
+
+        retry = Retry(
+            total=settings.NODE_RETRIES if retries is None else retries,
+            read=0,  # a slow node would hold the caller for another timeout
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=("GET",),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.NODE_POOL_MAXSIZE, max_retries=retry)
+        self.session = Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, url: str, **kwargs):
+        if not self.breaker.allow():
+            raise APIException("network", f"{self.node_url} is failing, not calling it for a while")
+        try:
+            response = self.session.request(method, url, **kwargs)
+            response.raise_for_status()
+        except RequestException as e:
+            if e.response is None or e.response.status_code >= 500:
+                self.breaker.failure()
+            else:
+                self.breaker.success()
+            raise APIException("network", e)
+        self.breaker.success()
+        return response
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(node_url: str) -> NodeClient:
+    """ The shared client of the node """
+    client = _clients.get(node_url)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(node_url)
+            if client is None:
+                client = _clients[node_url] = NodeClient(node_url)
+    return client
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from requests import Response
+from requests.exceptions import ConnectionError
+
+from burst.api.brs.p2p.api import P2PApi
+from burst.api.brs.v1.api import BrsApi
+from burst.api.client import CircuitBreaker, NodeClient, get_client
+from burst.api.exceptions import APIException
+
+
+def make_response(status_code):
+    response = Response()
+    response.status_code = status_code
+    response._content = b"{}"
+    return response
+
+
+class CircuitBreakerTest(SimpleTestCase):
+    @mock.patch("burst.api.client.time.monotonic")
+    def test_open_probe_close(self, now):
+        now.return_value = 100
+        breaker = CircuitBreaker(failures=2, reset_timeout=30)
+        breaker.failure()
+        self.assertTrue(breaker.allow())
+        breaker.failure()
+        self.assertFalse(breaker.allow())
+
+        now.return_value = 131
+        self.assertTrue(breaker.allow())
+        # only one probe at a time
+        self.assertFalse(breaker.allow())
+        breaker.failure()
+        self.assertFalse(breaker.allow())
+
+        now.return_value = 162
+        self.assertTrue(breaker.allow())
+        breaker.success()
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow())
+
+
+@override_settings(NODE_BREAKER_FAILURES=2, NODE_BREAKER_RESET_TIMEOUT=30)
+class NodeClientTest(SimpleTestCase):
+    def test_shared(self):
+        node_url = f"http://node.test:{settings.DEFAULT_API_V1_PORT}"
+        self.assertIs(BrsApi("node.test")._client, get_client(node_url))
+        self.assertIs(BrsApi("node.test")._client, BrsApi(node_url)._client)
+        self.assertIsNot(P2PApi("node.test")._client, P2PApi("node.test")._client)
+
+    def test_breaker(self):
+        client = NodeClient("http://node.test")
+        with mock.patch.object(client.session, "request", side_effect=ConnectionError) as request:
+            for _ in range(3):
+                with self.assertRaises(APIException):
+                    client.request("GET", "http://node.test/burst")
+        # the third call did not reach the node
+        self.assertEqual(request.call_count, 2)
+
+    def test_client_errors_do_not_open(self):
+        client = NodeClient("http://node.test")
+        with mock.patch.object(client.session, "request", return_value=make_response(400)):
+            for _ in range(3):
+                with self.assertRaises(APIException):
+                    client.request("GET", "http://node.test/burst")
+        self.assertTrue(client.breaker.allow())
+
+        with mock.patch.object(client.session, "request", return_value=make_response(200)):
+            self.assertEqual(client.request("GET", "http://node.test/burst").json(), {})
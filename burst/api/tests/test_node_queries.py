@@ -0,0 +1,53 @@
+from django.test import SimpleTestCase, override_settings
+
+from burst.api.brs.p2p import queries as p2p
+from burst.api.brs.v1 import queries as v1
+from burst.api.exceptions import APIException
+
+PEER = {
+    "state": 1,
+    "announcedAddress": None,
+    "shareAddress": True,
+    "downloadedVolume": 10,
+    "uploadedVolume": 10,
+    "application": "BRS",
+    "version": "v3.7.2",
+    "platform": "PC",
+    "blacklisted": False,
+    "lastUpdated": 1.5,
+    "requestProcessingTime": 0,
+}
+
+
+class ValidateResponseTest(SimpleTestCase):
+    def assertMalformed(self, query, data):
+        for mode in ("fast", "full"):
+            with self.subTest(mode=mode), override_settings(NODE_RESPONSE_VALIDATION=mode):
+                with self.assertRaises(APIException) as e:
+                    query.validate_response(data)
+                self.assertEqual(e.exception.args[0], "malformed_data")
+
+    def test_compiled_once(self):
+        self.assertIs(v1.GetPeer({"peer": "a"})._response_validator, v1.GetPeer({"peer": "b"})._response_validator)
+        self.assertFalse(hasattr(p2p.AddPeers, "_response_validator"))
+
+    def test_valid(self):
+        for mode in ("fast", "full"):
+            with override_settings(NODE_RESPONSE_VALIDATION=mode):
+                self.assertTrue(v1.GetPeer({"peer": "a"}).validate_response(PEER))
+                self.assertTrue(p2p.GetCumulativeDifficulty().validate_response(
+                    {"cumulativeDifficulty": "1", "blockchainHeight": 2}
+                ))
+                self.assertTrue(p2p.AddPeers().validate_response([]))
+
+    def test_malformed(self):
+        query = v1.GetPeer({"peer": "a"})
+        self.assertMalformed(query, {k: v for k, v in PEER.items() if k != "version"})
+        self.assertMalformed(query, {**PEER, "version": 3})
+        self.assertMalformed(query, {**PEER, "state": True})
+        self.assertMalformed(query, {**PEER, "shareAddress": 1})
+        self.assertMalformed(p2p.GetCumulativeDifficulty(), {"cumulativeDifficulty": "1", "blockchainHeight": "2"})
+
+    def test_error(self):
+        with self.assertRaises(APIException):
+            v1.GetPeers().validate_response({"errorCode": 5})
@@ -16,6 +16,8 @@ MAX_MULTI_SAME_OUT_RECIPIENTS = 128
 
 BLOCK_CHAIN_START_AT = 1407722400
 
+MAX_ROLLBACK = 1440
+
 
 """ https://github.com/burst-apps-team/burstcoin/blob/master/src/brs/TransactionType.java
 """
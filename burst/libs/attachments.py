@@ -0,0 +1,83 @@
+import struct
+
+from django.conf import settings
+
+from burst.constants import TxSubtypeBurstMining, TxSubtypeColoredCoins, TxType
+
+# asset id and quantity of each of the up to 4 transfers of a multi transfer
+MULTI_TRANSFER_START = 2
+MULTI_TRANSFER_SLOTS = 4
+
+
+def asset_offset(height: int) -> int:
+    """ Attachments get a version byte from the Digital Goods Store fork on """
+    if 0 < height < settings.DIGITAL_GOODS_STORE_BLOCK:
+        return 0
+    return 1
+
+
+def read_u64s(data: memoryview, start: int, count: int) -> tuple:
+    """ Little-endian unsigned longs, the truncated ones read as what is left of them """
+    if len(data) >= start + 8 * count:
+        return struct.unpack_from(f"<{count}Q", data, start)
+    return tuple(
+        int.from_bytes(data[start + 8 * i:start + 8 * i + 8], byteorder="little")
+        for i in range(count)
+    )
+
+
+class TxAttachment:
+    """ Fields of a transaction attachment, decoded once per transaction.
+
+        For asset transactions asset_id and quantity are the first two fields
+        after the version byte; the third one is the price of orders and the
+        asset distributed to holders, the fourth one the distributed quantity.
+    """
+
+    __slots__ = (
+        "offset",
+        "amount",
+        "asset_id",
+        "quantity",
+        "price",
+        "distributed_quantity",
+        "multi_size",
+        "multi_transfers",
+    )
+
+    def __init__(self, tx_type: int, tx_subtype: int, height: int, attachment_bytes: bytes or None) -> None:
+        self.offset = asset_offset(height)
+        self.amount = 0
+        self.asset_id = self.quantity = self.price = self.distributed_quantity = 0
+        self.multi_size = 0
+        self.multi_transfers = ()
+
+        if not attachment_bytes:
+            return
+        data = memoryview(attachment_bytes)
+
+        if tx_type == TxType.BURST_MINING and tx_subtype in (
+            TxSubtypeBurstMining.COMMITMENT_ADD,
+            TxSubtypeBurstMining.COMMITMENT_REMOVE,
+        ):
+            (self.amount,) = read_u64s(data, self.offset, 1)
+
+        elif tx_type == TxType.COLORED_COINS:
+            self.asset_id, self.quantity, self.price, self.distributed_quantity = read_u64s(data, self.offset, 4)
+            if tx_subtype == TxSubtypeColoredCoins.ASSET_TRANSFER_MULTI:
+                self.multi_size = data[self.offset] if len(data) > self.offset else 0
+                fields = read_u64s(data, MULTI_TRANSFER_START, 2 * MULTI_TRANSFER_SLOTS)
+                self.multi_transfers = tuple(zip(fields[::2], fields[1::2]))
+
+    @property
+    def distributed_asset_id(self) -> int:
+        return self.price
+
+
+def get_tx_attachment(tx) -> TxAttachment:
+    """ Decoded attachment of the transaction, cached on it """
+    try:
+        return tx._attachment
+    except AttributeError:
+        tx._attachment = TxAttachment(tx.type, tx.subtype, tx.height, tx.attachment_bytes)
+        return tx._attachment
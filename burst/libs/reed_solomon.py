@@ -89,139 +89,120 @@ class ReedSolomonError(Exception):
     pass
 
 
-class ReedSolomon:
-    @staticmethod
-    def gf_mul(a: int, b: int) -> int:
-        if a == 0 or b == 0:
-            return 0
-
-        idx = (gf_log[a] + gf_log[b]) % 31
+def gf_mul(a: int, b: int) -> int:
+    if a == 0 or b == 0:
+        return 0
 
-        return gf_exp[idx]
+    idx = (gf_log[a] + gf_log[b]) % 31
 
-    def encode(self, plain: str) -> str:
-        """
-        :param plain: The numeric ID of the account
-        :return: The RS encoding of the ID in the form XXXX-XXXX-XXXX-XXXXX
-        """
-        plain_string = bytearray(plain, "utf-8")
-        length = len(plain_string)
-        if length > base_10_length or length == 0:
-            raise ReedSolomonError
+    return gf_exp[idx]
 
-        plain_string_10 = bytearray(base_10_length)
-        for x in range(length):
-            b = plain_string[x] - ord("0")
-            if 0 > b < 256:
-                raise ReedSolomonError
-            plain_string_10[x] = b
 
-        codeword = bytearray(initial_codeword_length)
-
-        codeword_length = 0
-        while length > 0:
-            new_length = 0
-            digit_32 = 0
-
-            for x in range(length):
-                digit_32 = digit_32 * 10 + plain_string_10[x]
-                if digit_32 >= 32:
-                    plain_string_10[new_length] = digit_32 >> 5
-                    digit_32 &= 31
-                    new_length += 1
-                elif new_length > 0:
-                    plain_string_10[new_length] = 0
-                    new_length += 1
+def _parity_table(position: int) -> tuple:
+    """ Parity symbols, packed 5 bits each, of a codeword holding only
+        `value` at `position`. The parity is linear, so the parity of any
+        codeword is the XOR of the entries of its symbols.
+    """
+    table = []
+    for value in range(alphabet_length):
+        p = [0, 0, 0, 0]
+        for x in range(base_32_length - 1, -1, -1):
+            fb = (value if x == position else 0) ^ p[3]
+            p[3] = p[2] ^ gf_mul(30, fb)
+            p[2] = p[1] ^ gf_mul(6, fb)
+            p[1] = p[0] ^ gf_mul(9, fb)
+            p[0] = gf_mul(17, fb)
+        table.append(p[0] | p[1] << 5 | p[2] << 10 | p[3] << 15)
+    return tuple(table)
 
-            length = new_length
-            codeword[codeword_length] = digit_32
-            codeword_length += 1
 
-        p = bytearray(4)
+parity_tables = tuple(_parity_table(x) for x in range(base_32_length))
+alphabet_index = {char: index for index, char in enumerate(alphabet)}
+# codeword symbol shown at each position of the address
+cypher_symbol_shifts = tuple(5 * index for index in codeword_map)
+cypher_format = "{}{}{}{}-{}{}{}{}-{}{}{}{}-{}{}{}{}{}"
 
-        for x in range(base_32_length - 1, -1, -1):
-            fb = codeword[x] ^ p[3]
-            p[3] = p[2] ^ self.gf_mul(30, fb)
-            p[2] = p[1] ^ self.gf_mul(6, fb)
-            p[1] = p[0] ^ self.gf_mul(9, fb)
-            p[0] = self.gf_mul(17, fb)
 
-        # len(initial_codeword) - base_32_length == 17 - 13 == 4
-        for x in range(4):
-            codeword[x + base_32_length] = p[x]
+def encode_id(account_id: int) -> str:
+    """
+    :param account_id: The numeric ID of the account
+    :return: The RS encoding of the ID in the form XXXX-XXXX-XXXX-XXXXX
+    """
+    if not 0 <= account_id < 1 << 64:
+        raise ReedSolomonError
 
-        cypher_string_builder = ""
+    parity = 0
+    value = account_id
+    for table in parity_tables:
+        parity ^= table[value & 31]
+        value >>= 5
 
-        for x in range(cypher_string_length):
-            codework_index = codeword_map[x]
-            alphabet_index = codeword[codework_index]
-            cypher_string_builder += alphabet[alphabet_index]
+    codeword = account_id | parity << 5 * base_32_length
+    return cypher_format.format(*[alphabet[codeword >> shift & 31] for shift in cypher_symbol_shifts])
 
-            if (x & 3) == 3 and x < 13:
-                cypher_string_builder += "-"
 
-        return cypher_string_builder
+def decode_id(cypher_string: str) -> int:
+    """
+    :param cypher_string: The RS encoded address in the form BURST-XXXX-XXXX-XXXX-XXXXX
+    :return: The numeric ID of the account
+    """
+    if cypher_string[:6] == "BURST-":
+        cypher_string = cypher_string[6:]
 
-    def decode(self, cypher_string: str) -> str:
-        """
-        :param cypher_string: The RS encoded address in the form BURST-XXXX-XXXX-XXXX-XXXXX
-        :return: The numeric ID of the account
-        """
-        if cypher_string[:6] == "BURST-":
-            cypher_string = cypher_string[6:]
+    cypher_string = cypher_string.replace("-", "")
 
-        cypher_string = cypher_string.replace("-", "")
+    if len(cypher_string) != cypher_string_length:
+        raise ReedSolomonError
 
-        if len(cypher_string) != cypher_string_length:
-            raise ReedSolomonError
+    codeword = 0
+    try:
+        for char, shift in zip(cypher_string, cypher_symbol_shifts):
+            codeword |= alphabet_index[char] << shift
+    except KeyError:
+        raise ReedSolomonError
 
-        codeword = bytearray(initial_codeword)
+    account_id = codeword & (1 << 5 * base_32_length) - 1
+    parity = 0
+    value = account_id
+    for table in parity_tables:
+        parity ^= table[value & 31]
+        value >>= 5
 
-        codeword_length = 0
-        for x in range(cypher_string_length):
-            if cypher_string[x] not in alphabet:
-                raise ReedSolomonError
-            position_in_alphabet = alphabet.index(cypher_string[x])
+    if parity != codeword >> 5 * base_32_length:
+        raise ReedSolomonError("Codeword invalid")
 
-            if position_in_alphabet <= -1 or position_in_alphabet > alphabet_length:
-                continue
+    return account_id
 
-            if codeword_length > 16:
-                raise ReedSolomonError("Codeword too long")
 
-            codework_index = codeword_map[codeword_length]
-            codeword[codework_index] = position_in_alphabet
-            codeword_length += 1
+def encode_many(account_ids) -> list:
+    return [encode_id(account_id) for account_id in account_ids]
 
-        if codeword_length != 17 or not self.is_codeword_valid(codeword):
-            raise ReedSolomonError("Codeword invalid")
 
-        length = base_32_length
-        cypher_string_32 = bytearray(length)
-        for x in range(length):
-            cypher_string_32[x] = codeword[length - x - 1]
+def decode_many(cypher_strings) -> list:
+    return [decode_id(cypher_string) for cypher_string in cypher_strings]
 
-        plain_string_builder = bytearray()
 
-        while length > 0:
-            new_length = 0
-            digit_10 = 0
+class ReedSolomon:
+    """ String based interface over encode_id and decode_id """
 
-            for x in range(length):
-                digit_10 = digit_10 * 32 + cypher_string_32[x]
+    gf_mul = staticmethod(gf_mul)
 
-                if digit_10 >= 10:
-                    cypher_string_32[new_length] = digit_10 // 10
-                    digit_10 %= 10
-                    new_length += 1
-                elif new_length > 0:
-                    cypher_string_32[new_length] = 0
-                    new_length += 1
+    def encode(self, plain: str) -> str:
+        """
+        :param plain: The numeric ID of the account
+        :return: The RS encoding of the ID in the form XXXX-XXXX-XXXX-XXXXX
+        """
+        if not (0 < len(plain) <= base_10_length and plain.isascii() and plain.isdigit()):
+            raise ReedSolomonError
 
-            length = new_length
-            plain_string_builder.append(digit_10 + ord("0"))
+        return encode_id(int(plain))
 
-        return plain_string_builder[::-1].decode()
+    def decode(self, cypher_string: str) -> str:
+        """
+        :param cypher_string: The RS encoded address in the form BURST-XXXX-XXXX-XXXX-XXXXX
+        :return: The numeric ID of the account
+        """
+        return str(decode_id(cypher_string))
 
     def is_codeword_valid(self, codeword: bytearray) -> bool:
         c_sum = 0
@@ -0,0 +1,68 @@
+import struct
+
+from django.test import SimpleTestCase, override_settings
+
+from burst.constants import TxSubtypeBurstMining, TxSubtypeColoredCoins, TxType
+from burst.libs.attachments import TxAttachment, asset_offset, get_tx_attachment
+from java_wallet.models import Transaction
+
+
+@override_settings(DIGITAL_GOODS_STORE_BLOCK=100)
+class TxAttachmentTest(SimpleTestCase):
+    def test_asset_offset(self):
+        self.assertEqual(asset_offset(0), 1)
+        self.assertEqual(asset_offset(99), 0)
+        self.assertEqual(asset_offset(100), 1)
+
+    def test_commitment(self):
+        attachment = TxAttachment(
+            TxType.BURST_MINING, TxSubtypeBurstMining.COMMITMENT_ADD, 200, b"\x01" + struct.pack("<Q", 5 * 10 ** 8)
+        )
+        self.assertEqual(attachment.amount, 5 * 10 ** 8)
+
+    def test_order(self):
+        attachment = TxAttachment(
+            TxType.COLORED_COINS,
+            TxSubtypeColoredCoins.BID_ORDER_PLACEMENT,
+            200,
+            b"\x01" + struct.pack("<3Q", 7, 30, 4),
+        )
+        self.assertEqual((attachment.asset_id, attachment.quantity, attachment.price), (7, 30, 4))
+        # before the fork there is no version byte
+        attachment = TxAttachment(
+            TxType.COLORED_COINS,
+            TxSubtypeColoredCoins.BID_ORDER_PLACEMENT,
+            50,
+            struct.pack("<3Q", 7, 30, 4),
+        )
+        self.assertEqual((attachment.asset_id, attachment.quantity, attachment.price), (7, 30, 4))
+
+    def test_distribution(self):
+        attachment = TxAttachment(
+            TxType.COLORED_COINS,
+            TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS,
+            200,
+            b"\x01" + struct.pack("<4Q", 7, 1, 8, 500),
+        )
+        self.assertEqual(attachment.asset_id, 7)
+        self.assertEqual((attachment.distributed_asset_id, attachment.distributed_quantity), (8, 500))
+
+    def test_multi_transfer(self):
+        attachment = TxAttachment(
+            TxType.COLORED_COINS,
+            TxSubtypeColoredCoins.ASSET_TRANSFER_MULTI,
+            200,
+            b"\x01\x02" + struct.pack("<4Q", 7, 10, 8, 20),
+        )
+        self.assertEqual(attachment.multi_size, 2)
+        self.assertEqual(attachment.multi_transfers, ((7, 10), (8, 20), (0, 0), (0, 0)))
+
+    def test_truncated(self):
+        attachment = TxAttachment(
+            TxType.COLORED_COINS, TxSubtypeColoredCoins.ASSET_MINT, 200, b"\x01" + struct.pack("<Q", 7) + b"\x05"
+        )
+        self.assertEqual((attachment.asset_id, attachment.quantity, attachment.price), (7, 5, 0))
+
+    def test_cached_on_transaction(self):
+        tx = Transaction(type=TxType.PAYMENT, subtype=0, height=200, attachment_bytes=None)
+        self.assertIs(get_tx_attachment(tx), get_tx_attachment(tx))
@@ -0,0 +1,48 @@
+from django.test import SimpleTestCase
+
+from burst.libs.reed_solomon import (
+    ReedSolomon,
+    ReedSolomonError,
+    decode_id,
+    decode_many,
+    encode_id,
+    encode_many,
+)
+
+VECTORS = {
+    0: "2222-2222-2222-22222",
+    1: "2223-2222-KB8Y-22222",
+    10: "222C-2222-VJTL-22222",
+    1234567890: "E2QL-236T-Y8KR-22222",
+    6502115112683865257: "K37B-9V85-FB95-793HN",
+    9223372036854775808: "2222-2222-YVYK-A2222",
+    18446744073709551615: "ZZZZ-ZZZZ-QY2K-HZZZZ",
+}
+
+
+class ReedSolomonTest(SimpleTestCase):
+    def test_encode(self):
+        for account_id, address in VECTORS.items():
+            self.assertEqual(encode_id(account_id), address)
+            self.assertEqual(ReedSolomon().encode(str(account_id)), address)
+        self.assertEqual(encode_many(VECTORS.keys()), list(VECTORS.values()))
+
+    def test_decode(self):
+        for account_id, address in VECTORS.items():
+            self.assertEqual(decode_id(address), account_id)
+            self.assertEqual(decode_id("BURST-" + address), account_id)
+            self.assertEqual(ReedSolomon().decode(address), str(account_id))
+        self.assertEqual(decode_many(VECTORS.values()), list(VECTORS.keys()))
+
+    def test_encode_invalid(self):
+        for value in (-1, 1 << 64):
+            with self.assertRaises(ReedSolomonError):
+                encode_id(value)
+        for value in ("", "12a", "-1", "1" * 21):
+            with self.assertRaises(ReedSolomonError):
+                ReedSolomon().encode(value)
+
+    def test_decode_invalid(self):
+        for value in ("K37B-9V85-FB95-793H", "K37B-9V85-FB95-793HI", "K37B-9V85-FB95-793HM", "k37b-9v85-fb95-793hn"):
+            with self.assertRaises(ReedSolomonError):
+                decode_id(value)
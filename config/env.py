@@ -0,0 +1,33 @@
+""" Environment of the explorer, read once at startup.
+
+Hot paths and template filters read the typed values from ENV instead of
+parsing os.environ on every call.
+"""
+
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+
+@dataclass(frozen=True)
+class Env:
+    address_prefix: str
+    coin_symbol: str
+    digital_goods_store_block: int
+    values: Mapping[str, str]
+
+    def get(self, key: str, default: str = None) -> str or None:
+        return self.values.get(key, default)
+
+
+def load_env(environ: Mapping[str, str] = os.environ) -> Env:
+    return Env(
+        address_prefix=environ.get("ADDRESS_PREFIX", "S-").strip().upper(),
+        coin_symbol=environ.get("COIN_SYMBOL", "").strip(),
+        digital_goods_store_block=int(environ.get("DIGITAL_GOODS_STORE_BLOCK") or 0),
+        values=MappingProxyType(dict(environ)),
+    )
+
+
+ENV = load_env()
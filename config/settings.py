@@ -16,6 +16,8 @@ import os
 import simplejson as json
 import urllib3
 
+from config.env import ENV
+
 urllib3.disable_warnings()
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -81,6 +83,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "scan.middleware.ReplicaReadsMiddleware",
+    "scan.middleware.RequestMemoMiddleware",
 ]
 
 if DEBUG:
@@ -135,6 +139,16 @@ DATABASES = {
     },
 }
 
+# read-only replicas of the java_wallet database for the pages, e.g. [{"HOST": "replica1"}],
+# the missing keys are taken from java_wallet. Replicas more than JAVA_WALLET_REPLICA_MAX_LAG
+# blocks behind are skipped, checked every JAVA_WALLET_REPLICA_CHECK_INTERVAL seconds by watch_replicas
+JAVA_WALLET_REPLICAS = []
+for i, replica in enumerate(json.loads(os.environ.get("DB_JAVA_WALLET_REPLICAS", "[]")), 1):
+    JAVA_WALLET_REPLICAS.append(f"java_wallet_replica_{i}")
+    DATABASES[JAVA_WALLET_REPLICAS[-1]] = {**DATABASES["java_wallet"], **replica, "TEST": {"MIRROR": "java_wallet"}}
+JAVA_WALLET_REPLICA_MAX_LAG = int(os.environ.get("JAVA_WALLET_REPLICA_MAX_LAG", "2"))
+JAVA_WALLET_REPLICA_CHECK_INTERVAL = int(os.environ.get("JAVA_WALLET_REPLICA_CHECK_INTERVAL", "10"))
+
 DATABASE_ROUTERS = ["java_wallet.db_router.DBRouter", "scan.db_router.DBRouter"]
 
 
@@ -266,6 +280,15 @@ BRS_P2P_VERSION = os.environ.get("BRS_P2P_VERSION", "3.7.2")
 MIN_PEER_VERSION = os.environ.get("MIN_PEER_VERSION", "3.6.0")
 
 SIGNUM_NODE = os.environ.get("SIGNUM_NODE")
+# connections kept open to the node per process, retries of failed connections,
+# and consecutive failures after which the node is not called for NODE_BREAKER_RESET_TIMEOUT seconds
+NODE_POOL_MAXSIZE = int(os.environ.get("NODE_POOL_MAXSIZE", "10"))
+NODE_RETRIES = int(os.environ.get("NODE_RETRIES", "2"))
+NODE_BREAKER_FAILURES = int(os.environ.get("NODE_BREAKER_FAILURES", "5"))
+NODE_BREAKER_RESET_TIMEOUT = int(os.environ.get("NODE_BREAKER_RESET_TIMEOUT", "30"))
+# "fast" only checks the presence and type of the required keys of node responses,
+# "full" validates them against the whole JSON schema of the query
+NODE_RESPONSE_VALIDATION = os.environ.get("NODE_RESPONSE_VALIDATION", "full" if DEBUG else "fast")
 
 BLOCK_REWARD_LIMIT_HEIGHT = 972000
 BLOCK_REWARD_LIMIT_AMOUNT = 100
@@ -281,8 +304,17 @@ BRS_BOOTSTRAP_PEERS = json.loads(os.environ.get("BRS_BOOTSTRAP_PEERS", "[]"))
 AUTO_BOOTSTRAP_PEERS = os.environ.get("AUTO_BOOTSTRAP_PEERS", "False").lower() in ("true", "1", "on")
 
 PEERS_SCAN_DELAY = int(os.environ.get("PEERS_SCAN_DELAY", "0"))
+# requests of the peers monitor in flight at the same time, and seconds each waits for the peer
+PEERS_SCAN_CONCURRENCY = int(os.environ.get("PEERS_SCAN_CONCURRENCY", "50"))
+PEERS_SCAN_TIMEOUT = int(os.environ.get("PEERS_SCAN_TIMEOUT", "15"))
 TASKS_SCAN_DELAY = int(os.environ.get("TASKS_SCAN_DELAY", "0"))
 
+# blocks applied per transaction by the block indexer (watch_new_block)
+BLOCK_INDEXER_BATCH = int(os.environ.get("BLOCK_INDEXER_BATCH", "500"))
+
+# seconds between mempool snapshots published by watch_pending_txs
+PENDING_TXS_REFRESH_INTERVAL = int(os.environ.get("PENDING_TXS_REFRESH_INTERVAL", "5"))
+
 SITE_HOSTING = os.environ.get("SITE_HOSTING", " ")
 
 # for fork solving
@@ -293,4 +325,8 @@ TEST_NET = os.environ.get("TEST_NET")
 # for syncing peer SNR status
 SNR_MASTER_EXPLORER = os.environ.get("SNR_MASTER_EXPLORER")
 
-ADDRESS_PREFIX = os.environ.get("ADDRESS_PREFIX", "S-")
+ADDRESS_PREFIX = ENV.address_prefix
+COIN_SYMBOL = ENV.coin_symbol
+
+# height of the Digital Goods Store fork, attachments below it have no version byte
+DIGITAL_GOODS_STORE_BLOCK = ENV.digital_goods_store_block
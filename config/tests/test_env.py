@@ -0,0 +1,25 @@
+from django.test import SimpleTestCase
+
+from config.env import load_env
+
+
+class LoadEnvTest(SimpleTestCase):
+    def test_typed_values(self):
+        env = load_env({"ADDRESS_PREFIX": " ts- ", "COIN_SYMBOL": "TSIGNA", "DIGITAL_GOODS_STORE_BLOCK": "11800"})
+        self.assertEqual(env.address_prefix, "TS-")
+        self.assertEqual(env.coin_symbol, "TSIGNA")
+        self.assertEqual(env.digital_goods_store_block, 11800)
+        self.assertEqual(env.get("COIN_SYMBOL"), "TSIGNA")
+        self.assertIsNone(env.get("SITE_TITLE"))
+
+    def test_defaults(self):
+        env = load_env({"DIGITAL_GOODS_STORE_BLOCK": ""})
+        self.assertEqual(env.address_prefix, "S-")
+        self.assertEqual(env.digital_goods_store_block, 0)
+
+    def test_frozen(self):
+        env = load_env({})
+        with self.assertRaises(AttributeError):
+            env.address_prefix = "X-"
+        with self.assertRaises(TypeError):
+            env.values["COIN_SYMBOL"] = "X"
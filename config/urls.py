@@ -2,6 +2,7 @@ from django.conf import settings
 from django.urls import include, path
 from django.views.decorators.cache import cache_page
 
+from scan.helpers.conditional import conditional_page, settled_block, settled_tx
 from scan.views.accounts import AccountsListView, AddressDetailView
 from scan.views.aliases import AliasListView
 from scan.views.assets import (
@@ -39,34 +40,34 @@ from scan.views.transactions import TxDetailView, TxListView, tx_export_csv
 
 urlpatterns = [
     path("", index, name="index"),
-    path("distribution/", DistributionListView.as_view(), name="distribution"),
-    path("cbs/", CBListView.as_view(), name="cbs"),
-    path("blocks/", BlockListView.as_view(), name="blocks"),
-    path("block/<str:height>", BlockDetailView.as_view(), name="block-detail"),
+    path("distribution/", conditional_page()(DistributionListView.as_view()), name="distribution"),
+    path("cbs/", conditional_page()(CBListView.as_view()), name="cbs"),
+    path("blocks/", conditional_page()(BlockListView.as_view()), name="blocks"),
+    path("block/<str:height>", conditional_page(settled_block)(BlockDetailView.as_view()), name="block-detail"),
     path("txsPending/", pending_transactions, name="txs-pending"),
-    path("txs/", TxListView.as_view(), name="txs"),
-    path("tx/<str:id>", TxDetailView.as_view(), name="tx-detail"),
+    path("txs/", conditional_page()(TxListView.as_view()), name="txs"),
+    path("tx/<str:id>", conditional_page(settled_tx)(TxDetailView.as_view()), name="tx-detail"),
     path("accounts/", cache_page(3600)(AccountsListView.as_view()), name="accounts"),
     path("address/<str:id>", AddressDetailView.as_view(), name="address-detail"),
     path("csv/<str:id>", tx_export_csv, name="account-csv"),
-    path("asset/trades", AssetTradesListView.as_view(), name="asset-trades"),
-    path("asset/transfers", AssetTransfersListView.as_view(), name="asset-transfers"),
-    path("asset/holders", AssetHoldersListView.as_view(), name="asset-holders"),
-    path("asset/mintings", AssetMintingDetailView.as_view(), name="asset-mintings"),
-    path("asset/distributions", AssetDistributionDetailView.as_view(), name="asset-distributions"),
-    path("assets/", AssetListView.as_view(), name="assets"),
-    path("asset/<str:id>", AssetDetailView.as_view(), name="asset-detail"),
-    path("mps/purchases", MarketPlacePurchasesListView.as_view(), name="mps-purchases"),
-    path("mps/", MarketPlaceListView.as_view(), name="mps"),
-    path("mp/<str:id>", MarketPlaceDetailView.as_view(), name="mp-detail"),
-    path("ats/", AtListView.as_view(), name="ats"),
-    path("at/<str:id>", AtDetailView.as_view(), name="at-detail"),
+    path("asset/trades", conditional_page()(AssetTradesListView.as_view()), name="asset-trades"),
+    path("asset/transfers", conditional_page()(AssetTransfersListView.as_view()), name="asset-transfers"),
+    path("asset/holders", conditional_page()(AssetHoldersListView.as_view()), name="asset-holders"),
+    path("asset/mintings", conditional_page()(AssetMintingDetailView.as_view()), name="asset-mintings"),
+    path("asset/distributions", conditional_page()(AssetDistributionDetailView.as_view()), name="asset-distributions"),
+    path("assets/", conditional_page()(AssetListView.as_view()), name="assets"),
+    path("asset/<str:id>", conditional_page()(AssetDetailView.as_view()), name="asset-detail"),
+    path("mps/purchases", conditional_page()(MarketPlacePurchasesListView.as_view()), name="mps-purchases"),
+    path("mps/", conditional_page()(MarketPlaceListView.as_view()), name="mps"),
+    path("mp/<str:id>", conditional_page()(MarketPlaceDetailView.as_view()), name="mp-detail"),
+    path("ats/", conditional_page()(AtListView.as_view()), name="ats"),
+    path("at/<str:id>", conditional_page()(AtDetailView.as_view()), name="at-detail"),
     path("search/", search_view, name="search"),
     path("peers/", PeerMonitorListView.as_view(), name="peers"),
     path("peers-charts/", peers_charts_view, name="peers-charts"),
     path("peer/<str:address>", PeerMonitorDetailView.as_view(), name="peer-detail"),
-    path("alias/", AliasListView.as_view(), name="alias"),
-    path("sub/", SubscriptionListView.as_view(), name="subscription"),
+    path("alias/", conditional_page()(AliasListView.as_view()), name="alias"),
+    path("sub/", conditional_page()(SubscriptionListView.as_view()), name="subscription"),
     path("SNRinfo/", getSNRjson, name="snr-info"),
     path("json/SNRinfo/", getSNRjson, name="snr-info"),
     path("json/snrinfo/", getSNRjson, name="snr-info"),
@@ -76,8 +77,8 @@ urlpatterns = [
     path("json/accounts/", TopAccountsJson, name="json-account"),
     path("json/accounts/<int:results>", TopAccountsJson),
     path("pools/", cache_page(240)(PoolListView.as_view()), name="pools"),
-    path("miner/", MinerListView.as_view(), name="miner"),
-    path("forged-blocks/", ForgedBlocksListView.as_view(), name="forged-blocks"),
+    path("miner/", conditional_page()(MinerListView.as_view()), name="miner"),
+    path("forged-blocks/", conditional_page()(ForgedBlocksListView.as_view()), name="forged-blocks"),
     # path("admin/", admin.site.urls),
 ]
 
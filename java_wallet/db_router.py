@@ -1,14 +1,170 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "java_wallet"
+
+HEALTHY_REPLICAS_KEY = "java_wallet:healthy_replicas"
+# how long a process trusts the healthy replicas it read last
+HEALTHY_REPLICAS_POLL = 1
+
+# alias the java_wallet reads of the current request go to, see use_replica
+_read_alias = ContextVar("java_wallet_read_alias", default=PRIMARY)
+
+
+class ReplicaMonitor:
+    """ The replicas that answer and are at most ``max_lag`` blocks behind the
+    primary. ``watch_replicas`` checks them every ``interval`` seconds and
+    publishes the result to the cache; requests only read it. The result
+    expires after a few intervals, so without the watcher every read goes to
+    the primary.
+    """
+
+    def __init__(self, replicas: list, max_lag: int, interval: float) -> None:
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.interval = interval
+        self._healthy = []
+        self._read_at = None
+
+    @staticmethod
+    def get_height(alias: str) -> int:
+        from java_wallet.models import Block
+
+        return Block.objects.using(alias).order_by("-height").values_list("height", flat=True).first() or 0
+
+    def _get_height(self, alias: str) -> int or None:
+        try:
+            return self.get_height(alias)
+        except DatabaseError as e:
+            logger.warning("java_wallet database %s is not available: %r", alias, e)
+            connections[alias].close()
+            return None
+
+    def check(self) -> list:
+        primary_height = self._get_height(PRIMARY)
+        healthy = []
+        if primary_height is not None:
+            for alias in self.replicas:
+                height = self._get_height(alias)
+                if height is None:
+                    continue
+                if primary_height - height > self.max_lag:
+                    logger.warning("java_wallet replica %s is %d blocks behind", alias, primary_height - height)
+                    continue
+                healthy.append(alias)
+        return healthy
+
+    def publish(self) -> list:
+        healthy = self.check()
+        cache.set(HEALTHY_REPLICAS_KEY, healthy, self.interval * 3)
+        self._healthy, self._read_at = healthy, time.monotonic()
+        return healthy
+
+    def healthy(self) -> list:
+        if not self.replicas:
+            return []
+        now = time.monotonic()
+        if self._read_at is None or now - self._read_at >= HEALTHY_REPLICAS_POLL:
+            healthy = cache.get(HEALTHY_REPLICAS_KEY) or []
+            # a replica removed from the settings since the last check is not used
+            self._healthy = [alias for alias in healthy if alias in self.replicas]
+            self._read_at = now
+        return self._healthy
+
+    def pick(self) -> str:
+        """ A healthy replica, or the primary if there is none """
+        healthy = self.healthy()
+        return random.choice(healthy) if healthy else PRIMARY
+
+
+_monitor = None
+
+
+def get_replica_monitor() -> ReplicaMonitor:
+    global _monitor
+    if _monitor is None:
+        _monitor = ReplicaMonitor(
+            settings.JAVA_WALLET_REPLICAS,
+            settings.JAVA_WALLET_REPLICA_MAX_LAG,
+            settings.JAVA_WALLET_REPLICA_CHECK_INTERVAL,
+        )
+    return _monitor
+
+
+def get_read_db() -> str:
+    """ Alias the routed java_wallet reads go to now """
+    return _read_alias.get()
+
+
+@contextmanager
+def _use_alias(alias: str):
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+@contextmanager
+def use_replica(monitor: ReplicaMonitor = None):
+    """ Routed java_wallet reads go to one healthy replica until the block
+    exits, the whole block sees the same replica. Outside of it they go to
+    the primary.
+    """
+    with _use_alias((monitor or get_replica_monitor()).pick()):
+        yield
+
+
+@contextmanager
+def use_primary():
+    """ Routed java_wallet reads go to the primary until the block exits,
+    for reads that need the freshest tip
+    """
+    with _use_alias(PRIMARY):
+        yield
+
+
+def iter_on_replica(iterable, monitor: ReplicaMonitor = None):
+    """ ``iterable`` with its routed java_wallet reads on one healthy replica,
+    for streamed responses, which are produced after the view and its
+    use_replica() block have returned. Only the steps of ``iterable`` run on
+    the replica, the server code between them keeps its own routing.
+    """
+    alias = (monitor or get_replica_monitor()).pick()
+    iterator = iter(iterable)
+    while True:
+        with _use_alias(alias):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
 class DBRouter:
+    """ Writes, and reads that name the java_wallet database with ``using``,
+    go to the primary. Other reads go to the replica picked by use_replica.
+    """
+
     @staticmethod
     def db_for_read(model, **hints):
         if model._meta.app_label == "java_wallet":
-            return "java_wallet"
+            return get_read_db()
         return None
 
     @staticmethod
     def db_for_write(model, **hints):
         if model._meta.app_label == "java_wallet":
-            return "java_wallet"
+            return PRIMARY
         return None
 
     @staticmethod
@@ -22,6 +178,8 @@ class DBRouter:
 
     @staticmethod
     def allow_migrate(db, app_label, model_name=None, **hints):
+        if db in settings.JAVA_WALLET_REPLICAS:
+            return False
         if app_label == "java_wallet":
-            return db == "java_wallet"
+            return db == PRIMARY
         return None
@@ -37,8 +37,19 @@ class PositiveBigIntegerField(BigIntegerField):
 
 
 class TimestampField(DateTimeField):
+    """ Seconds since the genesis block in an int column, as in the node schema """
+
+    def get_internal_type(self):
+        return "IntegerField"
+
     def get_prep_value(self, value):
-        return datetime.timestamp(value) - BLOCK_CHAIN_START_AT
+        if value is None:
+            return value
+        return int(datetime.timestamp(value) - BLOCK_CHAIN_START_AT)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        # no datetime adaptation by the backend, the value is already an int
+        return value if prepared else self.get_prep_value(value)
 
     @staticmethod
     def from_db_value(value, expression, connection):
@@ -0,0 +1,160 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from java_wallet.db_router import (
+    PRIMARY,
+    DBRouter,
+    ReplicaMonitor,
+    get_read_db,
+    iter_on_replica,
+    use_primary,
+    use_replica,
+)
+from java_wallet.models import Block
+from scan.helpers.decorators import bump_chain_version, single_flight_memoize
+from scan.middleware import ReplicaReadsMiddleware
+from scan.models import PeerMonitor
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+HEIGHTS = {PRIMARY: 1000, "replica_1": 999, "replica_2": 990, "replica_3": DatabaseError("down")}
+
+
+def get_height(alias):
+    height = HEIGHTS[alias]
+    if isinstance(height, Exception):
+        raise height
+    return height
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@mock.patch("java_wallet.db_router.connections", mock.MagicMock())
+@mock.patch.object(ReplicaMonitor, "get_height", side_effect=get_height)
+class ReplicaMonitorTest(SimpleTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_healthy(self, _):
+        monitor = ReplicaMonitor(["replica_1", "replica_2", "replica_3"], max_lag=2, interval=10)
+        self.assertEqual(monitor.publish(), ["replica_1"])
+        self.assertEqual(monitor.healthy(), ["replica_1"])
+        self.assertEqual(monitor.pick(), "replica_1")
+
+    def test_published(self, get_height):
+        # requests only read what watch_replicas published
+        ReplicaMonitor(["replica_1"], max_lag=2, interval=10).publish()
+        get_height.reset_mock()
+        monitor = ReplicaMonitor(["replica_1"], max_lag=2, interval=10)
+        self.assertEqual(monitor.pick(), "replica_1")
+        get_height.assert_not_called()
+
+        with mock.patch.dict(HEIGHTS, {"replica_1": 900}):
+            ReplicaMonitor(["replica_1"], max_lag=2, interval=10).publish()
+        self.assertEqual(monitor.pick(), "replica_1")
+        with mock.patch("java_wallet.db_router.time.monotonic", return_value=10 ** 9):
+            self.assertEqual(monitor.pick(), PRIMARY)
+
+    def test_not_published(self, get_height):
+        monitor = ReplicaMonitor(["replica_1"], max_lag=2, interval=10)
+        self.assertEqual(monitor.healthy(), [])
+        self.assertEqual(monitor.pick(), PRIMARY)
+        get_height.assert_not_called()
+
+    def test_primary_down(self, _):
+        monitor = ReplicaMonitor(["replica_1"], max_lag=2, interval=10)
+        with mock.patch.dict(HEIGHTS, {PRIMARY: DatabaseError("down")}):
+            self.assertEqual(monitor.publish(), [])
+
+    def test_no_replicas(self, get_height):
+        self.assertEqual(ReplicaMonitor([], max_lag=2, interval=10).pick(), PRIMARY)
+        get_height.assert_not_called()
+
+
+@override_settings(JAVA_WALLET_REPLICAS=["replica_1"])
+class DBRouterTest(SimpleTestCase):
+    def setUp(self) -> None:
+        self.monitor = mock.Mock(pick=mock.Mock(return_value="replica_1"))
+
+    def test_routing(self):
+        router = DBRouter()
+        self.assertEqual(router.db_for_read(Block), PRIMARY)
+        with use_replica(self.monitor):
+            self.assertEqual(router.db_for_read(Block), "replica_1")
+            self.assertEqual(router.db_for_write(Block), PRIMARY)
+            self.assertIsNone(router.db_for_read(PeerMonitor))
+            with use_primary():
+                self.assertEqual(router.db_for_read(Block), PRIMARY)
+            self.assertEqual(router.db_for_read(Block), "replica_1")
+        self.assertEqual(router.db_for_read(Block), PRIMARY)
+
+        self.assertEqual(Block.objects.filter(height=1).db, PRIMARY)
+        self.assertEqual(Block.objects.using(PRIMARY).filter(height=1).db, PRIMARY)
+
+    def test_allow_migrate(self):
+        router = DBRouter()
+        self.assertTrue(router.allow_migrate(PRIMARY, "java_wallet"))
+        self.assertFalse(router.allow_migrate("replica_1", "java_wallet"))
+        self.assertFalse(router.allow_migrate("replica_1", "scan"))
+
+    def test_middleware(self):
+        def view(request):
+            return get_read_db()
+
+        middleware = ReplicaReadsMiddleware(view)
+        with mock.patch("java_wallet.db_router.get_replica_monitor", return_value=self.monitor):
+            self.assertEqual(middleware(RequestFactory().get("/")), "replica_1")
+            self.assertEqual(middleware(RequestFactory().post("/")), PRIMARY)
+
+    def test_iter_on_replica(self):
+        def rows():
+            for _ in range(2):
+                yield get_read_db()
+
+        rows = iter_on_replica(rows(), self.monitor)
+        self.assertEqual(next(rows), "replica_1")
+        # between the steps the routing of the caller applies
+        self.assertEqual(get_read_db(), PRIMARY)
+        self.assertEqual(list(rows), ["replica_1"])
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch.object(ReplicaMonitor, "get_height", return_value=10)
+    def test_per_block_on_replica(self, get_height):
+        cache.clear()
+        calls = []
+
+        @single_flight_memoize(100, per_block=True)
+        def per_block():
+            calls.append(get_read_db())
+            return get_read_db()
+
+        bump_chain_version(10)
+        with use_replica(self.monitor):
+            self.assertEqual(per_block(), "replica_1")
+            self.assertEqual(cache.get(per_block.get_cache_key())[2], 10)
+            get_height.assert_called_once_with("replica_1")
+
+            # the replica does not have block 11 yet: recomputed until it has
+            bump_chain_version(11)
+            self.assertEqual(per_block(), "replica_1")
+            self.assertEqual(cache.get(per_block.get_cache_key())[2], 10)
+            get_height.return_value = 11
+            per_block()
+            self.assertEqual(cache.get(per_block.get_cache_key())[2], 11)
+            per_block()
+            self.assertEqual(len(calls), 3)
+
+            per_block.invalidate()
+            self.assertEqual(per_block.get_many([()], lambda calls: {call: get_read_db() for call in calls}),
+                             {(): "replica_1"})
+            self.assertEqual(cache.get(per_block.get_cache_key())[2], 11)
+
+        # the primary has every published block
+        per_block.invalidate()
+        get_height.reset_mock()
+        self.assertEqual(per_block(), PRIMARY)
+        get_height.assert_not_called()
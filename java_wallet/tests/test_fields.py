@@ -61,6 +61,13 @@ class TimestampFieldTest(TestCase):
         self.assertEqual(
             self.field.get_prep_value(datetime.fromtimestamp(1407722400)), 0
         )
+        self.assertEqual(self.field.get_prep_value(None), None)
+
+    def test_get_db_prep_value(self):
+        self.assertEqual(
+            self.field.get_db_prep_value(datetime.fromtimestamp(1407722640), None), 240
+        )
+        self.assertEqual(self.field.get_db_prep_value(240, None, prepared=True), 240)
 
 
 class GetTxDescByTypes(TestCase):
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from django.conf import settings
+
+from burst.api.brs.v1.api import BrsApi
+from burst.constants import BLOCK_CHAIN_START_AT
+from java_wallet.fields import get_desc_tx_type
+from java_wallet.models import Account
+from scan.caching_data.base import CachingDataBase
+from scan.helpers.queries import get_account_names
+
+
+class CachingPendingTxs(CachingDataBase):
+    """Snapshot of the node mempool, published by ``watch_pending_txs``.
+
+    Pages only read the snapshot, they never call the node. The snapshot
+    expires if the refresher stops, so a dead refresher shows an empty
+    mempool instead of stale transactions.
+    """
+
+    _cache_key = "pending_txs"
+    _cache_expiring = 60
+    live_if_empty = False
+    default_data_if_empty = []
+
+    def _get_live_data(self):
+        txs_pending = BrsApi(settings.SIGNUM_NODE).get_unconfirmed_transactions()
+
+        recipient_ids = {int(t["recipient"]) for t in txs_pending if "recipient" in t}
+        existing = set(
+            Account.objects.using("java_wallet")
+            .filter(id__in=recipient_ids)
+            .values_list("id", flat=True)
+            .distinct()
+        ) if recipient_ids else set()
+        names = get_account_names(
+            [int(t["sender"]) for t in txs_pending] + list(existing)
+        )
+
+        for t in txs_pending:
+            t["timestamp"] = datetime.fromtimestamp(
+                t["timestamp"] + BLOCK_CHAIN_START_AT
+            )
+            t["amountNQT"] = int(t["amountNQT"])
+            t["feeNQT"] = int(t["feeNQT"])
+            t["sender_name"] = names.get(int(t["sender"]))
+            t["has_message"] = False
+            t["has_encrypted_message"] = False
+
+            if "recipient" in t:
+                t["recipient_exists"] = int(t["recipient"]) in existing
+                if t["recipient_exists"]:
+                    t["recipient_name"] = names.get(int(t["recipient"]))
+
+            t["attachment_bytes"] = None
+            if "attachmentBytes" in t:
+                t["attachment_bytes"] = bytes.fromhex(t["attachmentBytes"])
+            attachment = t.get("attachment", {})
+            if "recipients" in attachment:
+                t["multiout"] = len(attachment["recipients"])
+            if "message" in attachment and "messageIsText" in attachment:
+                t["message_pend"] = attachment["message"]
+                t["has_message"] = True
+            if "encryptedMessage" in attachment:
+                t["has_encrypted_message"] = True
+
+            t["tx_name"] = get_desc_tx_type(t["type"], t["subtype"])
+
+        txs_pending.sort(key=lambda _x: _x["feeNQT"], reverse=True)
+
+        return txs_pending
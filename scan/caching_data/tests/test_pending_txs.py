@@ -1,12 +1,96 @@
+from unittest import mock
+
 import pytest
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
+from java_wallet.models import Account
 from scan.caching_data.pending_txs import CachingPendingTxs
 
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
 
-@pytest.mark.django_db
+@pytest.mark.django_db(databases=["default", "java_wallet"])
 @pytest.mark.vcr
 def test_caching_data():
+    CachingPendingTxs().update_live_data()
     txs = CachingPendingTxs().cached_data
     assert len(txs) == 15
     assert txs[14]["multiout"] == 2
     assert txs[0]["multiout"] == 6
+
+
+def pending_tx(tx_id, sender, fee, recipient=None, attachment=None):
+    tx = {
+        "transaction": str(tx_id),
+        "type": 0,
+        "subtype": 0,
+        "timestamp": 0,
+        "deadline": 1440,
+        "sender": str(sender),
+        "amountNQT": "100",
+        "feeNQT": str(fee),
+    }
+    if recipient is not None:
+        tx["recipient"] = str(recipient)
+    if attachment is not None:
+        tx["attachment"] = attachment
+    return tx
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PendingTxsSnapshotTest(TestCase):
+    databases = {"default", "java_wallet"}
+
+    def setUp(self):
+        cache.clear()
+        Account.objects.using("java_wallet").create(
+            id=1, creation_height=0, name="alice", height=1, latest=True
+        )
+        Account.objects.using("java_wallet").create(
+            id=2, creation_height=0, name="bob", height=1, latest=True
+        )
+
+    def node_returns(self, txs):
+        api = mock.patch("scan.caching_data.pending_txs.BrsApi").start()
+        api.return_value.get_unconfirmed_transactions.return_value = txs
+        self.addCleanup(mock.patch.stopall)
+
+    def test_enriched_in_bulk(self):
+        self.node_returns(
+            [
+                pending_tx(10 + i, sender=1, fee=i, recipient=2 if i % 2 else 3)
+                for i in range(20)
+            ]
+            + [pending_tx(99, sender=2, fee=1000, attachment={"recipients": [[1, 1], [2, 1]]})]
+        )
+        # one existence query and one name query, whatever the mempool size
+        with self.assertNumQueries(2, using="java_wallet"):
+            CachingPendingTxs().update_live_data()
+
+        txs = CachingPendingTxs().cached_data
+        self.assertEqual(len(txs), 21)
+        self.assertEqual(txs[0]["transaction"], "99")
+        self.assertEqual(txs[0]["multiout"], 2)
+        self.assertEqual(txs[0]["sender_name"], "bob")
+        self.assertEqual([t["feeNQT"] for t in txs[1:]], list(range(19, -1, -1)))
+
+        known, unknown = txs[1], txs[2]
+        self.assertTrue(known["recipient_exists"])
+        self.assertEqual(known["recipient_name"], "bob")
+        self.assertEqual(known["sender_name"], "alice")
+        self.assertFalse(unknown["recipient_exists"])
+        self.assertNotIn("recipient_name", unknown)
+
+    def test_pages_never_call_node(self):
+        self.node_returns([pending_tx(10, sender=1, fee=1)])
+        self.assertEqual(CachingPendingTxs().cached_data, [])
+
+        CachingPendingTxs().update_live_data()
+        with mock.patch("scan.caching_data.pending_txs.BrsApi") as api:
+            self.assertEqual(len(CachingPendingTxs().cached_data), 1)
+            response = self.client.get("/txsPending/")
+        api.assert_not_called()
+        self.assertContains(response, "10")
@@ -1,5 +1,7 @@
 from java_wallet.models import Transaction
 from scan.caching_data.base import CachingDataBase
+from scan.helpers.queries import get_index_counter
+from scan.models import IndexCounter
 
 
 class CachingTotalTxsCount(CachingDataBase):
@@ -9,4 +11,7 @@ class CachingTotalTxsCount(CachingDataBase):
     default_data_if_empty = 0
 
     def _get_live_data(self):
+        total_txs = get_index_counter(IndexCounter.Kind.TOTAL_TXS)
+        if total_txs is not None:
+            return total_txs
         return Transaction.objects.using("java_wallet").count()
@@ -1,6 +1,12 @@
-from django.core.cache import cache
 from django.core.paginator import Paginator
 
+from scan.helpers.decorators import single_flight_memoize
+
+
+@single_flight_memoize(3600, args_rewrite=lambda object_list: [object_list.query])
+def _get_list_count(object_list):
+    return object_list.count()
+
 
 class CachingPaginator(Paginator):
     def _get_count(self):
@@ -8,11 +14,7 @@ class CachingPaginator(Paginator):
             self._count = None
 
         if self._count is None:
-            key = f"paginator:{hash(self.object_list.query.__str__())}:count"
-            self._count = cache.get(key, -1)
-            if self._count == -1:
-                self._count = super().count
-                cache.set(key, self._count, 3600)
+            self._count = _get_list_count(self.object_list)
 
         return self._count
 
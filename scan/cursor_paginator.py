@@ -0,0 +1,113 @@
+from collections.abc import Sequence
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.http import Http404
+
+from scan.caching_paginator import CachingPaginator
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, paginator, previous_cursor=None, next_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.previous_cursor = previous_cursor
+        self.next_cursor = next_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+
+class CursorPaginator(CachingPaginator):
+    """ Keyset pagination, newest first, over the integer fields of `fields`
+        (unique together). A page continues right after the row of its cursor
+        instead of skipping OFFSET rows, so deep pages cost the same as the
+        first one. count stays available, cached as in CachingPaginator.
+    """
+
+    def __init__(self, object_list, per_page, fields=("height", "db_id"), **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.fields = fields
+
+    def _get_cursor(self, row) -> str:
+        if isinstance(row, dict):
+            values = [row[field] for field in self.fields]
+        else:
+            values = [getattr(row, field) for field in self.fields]
+        return "_".join(str(value) for value in values)
+
+    def _parse_cursor(self, cursor: str) -> list:
+        try:
+            values = [int(value) for value in cursor.split("_")]
+        except ValueError:
+            raise InvalidPage("Invalid cursor")
+        if len(values) != len(self.fields):
+            raise InvalidPage("Invalid cursor")
+        return values
+
+    def _keyset_filter(self, values: list, lookup: str) -> Q:
+        """ (fields) < values for lookup "lt", (fields) > values for "gt" """
+        q = Q()
+        for i, field in enumerate(self.fields):
+            q |= Q(**dict(zip(self.fields[:i], values[:i])), **{f"{field}__{lookup}": values[i]})
+        return q
+
+    def cursor_page(self, after: str = None, before: str = None) -> CursorPage:
+        descending = [f"-{field}" for field in self.fields]
+        if before:
+            rows = list(
+                self.object_list
+                .filter(self._keyset_filter(self._parse_cursor(before), "gt"))
+                .order_by(*self.fields)[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            qs = self.object_list
+            if after:
+                qs = qs.filter(self._keyset_filter(self._parse_cursor(after), "lt"))
+            rows = list(qs.order_by(*descending)[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = bool(after)
+
+        if not rows:
+            return CursorPage(rows, self)
+        return CursorPage(
+            rows,
+            self,
+            previous_cursor=self._get_cursor(rows[0]) if has_previous else None,
+            next_cursor=self._get_cursor(rows[-1]) if has_next else None,
+        )
+
+
+class CursorPaginationMixin:
+    """ Opt-in keyset pagination for ListView, the page is given by
+        ?after=<cursor> (older rows) or ?before=<cursor> (newer rows).
+        Templates include "cursor_paginator.html".
+    """
+    cursor_fields = ("height", "db_id")
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size, fields=self.cursor_fields)
+        try:
+            page = paginator.cursor_page(
+                after=self.request.GET.get("after"),
+                before=self.request.GET.get("before"),
+            )
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
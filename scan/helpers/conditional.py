@@ -0,0 +1,116 @@
+""" ETag / Last-Modified / Cache-Control for the pages, answered from the
+cache before the view runs. Pages change when a block arrives, pages of
+settled blocks and transactions (see ``is_settled``) never do, apart from
+relative times and USD prices, which are allowed to be an hour old.
+"""
+import time
+from calendar import timegm
+from functools import wraps
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from java_wallet.models import Block, Transaction
+from scan.helpers.decorators import single_flight_memoize
+from scan.helpers.fragments import get_template_version, is_settled
+
+# pages that change with every block
+TIP_MAX_AGE = 30
+# pages of settled objects
+SETTLED_MAX_AGE = 3600
+
+
+@single_flight_memoize(5, per_block=True)
+def get_tip_block() -> (int, int) or None:
+    """ Height and unix time of the last block, None before the genesis block """
+    row = (
+        Block.objects.using("java_wallet")
+        .order_by("-height")
+        .values_list("height", "timestamp")
+        .first()
+    )
+    if row is None:
+        return None
+    height, timestamp = row
+    return height, timegm(timestamp.utctimetuple())
+
+
+def _settled(key, queryset):
+    """ (height, unix time) of a settled block or transaction, stored for good """
+    entry = cache.get(key)
+    if entry is None:
+        row = queryset.first()
+        if not row or not is_settled(row[0]):
+            return None
+        entry = row[0], timegm(row[1].utctimetuple())
+        cache.set(key, entry, None)
+    return entry
+
+
+def settled_block(height, **kwargs):
+    if not str(height).isdigit() or not is_settled(int(height)):
+        return None
+    return _settled(
+        f"settled_block:{height}",
+        Block.objects.filter(height=height).values_list("height", "timestamp"),
+    )
+
+
+def settled_tx(id, **kwargs):
+    if not str(id).isdigit():
+        return None
+    return _settled(
+        f"settled_tx:{id}",
+        Transaction.objects.filter(id=id).values_list("height", "block_timestamp"),
+    )
+
+
+def conditional_page(get_settled=None):
+    """ Validators of the page: the last block, or for a settled object (found
+    by ``get_settled(**url_kwargs)``) the object itself, renewed every
+    ``SETTLED_MAX_AGE`` so prices shown on the page get refreshed. A matching
+    ``If-None-Match`` / ``If-Modified-Since`` gets a 304 without running the
+    view. """
+
+    def decorator(view):
+        view_class = getattr(view, "view_class", None)
+        template_name = getattr(view_class, "template_name", None)
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            settled = get_settled(**kwargs) if get_settled else None
+            if settled:
+                height, last_modified = settled
+                renewed = int(time.time() // SETTLED_MAX_AGE)
+                version = f"s{height}-{renewed}"
+                last_modified = max(last_modified, renewed * SETTLED_MAX_AGE)
+                max_age = SETTLED_MAX_AGE
+            else:
+                tip = get_tip_block()
+                if tip is None:
+                    # the node has not stored a block yet, no validators
+                    return view(request, *args, **kwargs)
+                height, last_modified = tip
+                version = f"t{height}"
+                max_age = TIP_MAX_AGE
+            if template_name:
+                version = f"{get_template_version(template_name)}-{version}"
+            etag = f'W/"{version}"'
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                response.headers.setdefault("ETag", etag)
+                response.headers.setdefault("Last-Modified", http_date(last_modified))
+            patch_cache_control(response, public=True, max_age=max_age)
+            return response
+
+        return inner
+
+    return decorator
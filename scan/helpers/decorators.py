@@ -1,19 +1,388 @@
+import hashlib
+import random
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
+from urllib.parse import quote
 
 from django.core.cache import cache
+from redis.exceptions import LockError
 
+from java_wallet.db_router import PRIMARY, ReplicaMonitor, get_read_db
+
+
+class _ProcessLock:
+    """Stand-in for ``cache.lock`` on cache backends without locks (locmem),
+    whose data is process-local anyway. Every key has its own lock, dropped
+    once no _ProcessLock of the key is left.
+    """
+
+    # a threading.Lock cannot be weakly referenced, a BoundedSemaphore(1) can
+    _locks = weakref.WeakValueDictionary()
+    _locks_lock = threading.Lock()
+
+    def __init__(self, key, blocking_timeout=None):
+        with self._locks_lock:
+            self._lock = self._locks.get(key)
+            if self._lock is None:
+                self._lock = self._locks[key] = threading.BoundedSemaphore(1)
+        self._blocking_timeout = blocking_timeout
+
+    def acquire(self, blocking=True):
+        if not blocking:
+            return self._lock.acquire(False)
+        if self._blocking_timeout is None:
+            return self._lock.acquire()
+        return self._lock.acquire(timeout=self._blocking_timeout)
+
+    def release(self):
+        self._lock.release()
+
+
+def get_lock(key, expire=None, blocking_timeout=None):
+    lock_key = f"lock_decorator:{key}"
+    if hasattr(cache, "lock"):
+        return cache.lock(lock_key, timeout=expire, blocking_timeout=blocking_timeout)
+    return _ProcessLock(lock_key, blocking_timeout)
+
+
+def _release(lock):
+    try:
+        lock.release()
+    except LockError:
+        # expired while we were working, somebody else may hold it now
+        pass
+
+
+MISSING = object()
+
+_request_memo = ContextVar("request_memo", default=None)
+
+
+@contextmanager
+def request_memo():
+    """Scope in which memoized helpers answer repeated calls from a local dict
+    instead of the cache; ``RequestMemoMiddleware`` opens one per request.
+    """
+    token = _request_memo.set({})
+    try:
+        yield
+    finally:
+        _request_memo.reset(token)
+
+
+def request_memoize(func):
+    """Dedupe identical calls of ``func`` inside a ``request_memo()`` scope,
+    e.g. in front of a ``cache_memoize`` helper.
+    """
+
+    @wraps(func)
+    def inner(*args, **kwargs):
+        memo = _request_memo.get()
+        if memo is None:
+            return func(*args, **kwargs)
+        key = (inner, args, tuple(sorted((k, v) for k, v in kwargs.items() if k != "_refresh")))
+        if key not in memo or kwargs.get("_refresh"):
+            memo[key] = func(*args, **kwargs)
+        return memo[key]
+
+    return inner
+
+
+class LocalLRU:
+    """Small thread-safe per-process LRU for values that never change."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+CHAIN_VERSION_KEY = "single_flight:chain_version"
+# how long a process trusts the chain version it read last
+CHAIN_VERSION_POLL = 1
+# watch_new_block republishes the version every second, it is gone soon after it stops
+CHAIN_VERSION_TIMEOUT = 60
+# TTL of the per_block entries while a chain version is published, the version expires them
+PER_BLOCK_TIMEOUT = 3600
+
+_chain_version = {"value": None, "read_at": 0.0}
+
+
+def get_chain_version():
+    """Height of the chain tip published by ``watch_new_block``, None if it is
+    not running."""
+    now = time.monotonic()
+    if now - _chain_version["read_at"] >= CHAIN_VERSION_POLL:
+        _chain_version["value"] = cache.get(CHAIN_VERSION_KEY)
+        _chain_version["read_at"] = now
+    return _chain_version["value"]
+
+
+def bump_chain_version(height):
+    """Expire the entries of the ``per_block`` memoized helpers computed
+    before ``height``; publishing the same height again only keeps it alive."""
+    cache.set(CHAIN_VERSION_KEY, height, CHAIN_VERSION_TIMEOUT)
+    _chain_version.update(value=height, read_at=time.monotonic())
 
-def lock_decorator(key=None, expire=None, ident=None, auto_renewal=False):
-    def decorator(func):
-        def _make_lock_key():
-            return f"lock_decorator:{key or func.__name__}"
 
+def get_read_version():
+    """Chain version of the data the java_wallet reads see now. A replica
+    may not have the last published block yet, then it is its own height."""
+    version = get_chain_version()
+    alias = get_read_db()
+    if version is None or alias == PRIMARY:
+        return version
+    return min(version, ReplicaMonitor.get_height(alias))
+
+
+def lock_decorator(key=None, expire=None, blocking_timeout=None):
+    def decorator(func):
         @wraps(func)
         def inner(*args, **kwargs):
-            lock_key = _make_lock_key()
-            with cache.lock(lock_key, expire, ident, auto_renewal):
+            lock = get_lock(key or func.__name__, expire, blocking_timeout)
+            if not lock.acquire():
+                raise LockError(f"Could not acquire lock {key or func.__name__}")
+            try:
                 return func(*args, **kwargs)
+            finally:
+                _release(lock)
+
+        return inner
+
+    return decorator
+
+
+def single_flight_memoize(
+    timeout,
+    stale_timeout=None,
+    jitter=0.1,
+    lock_expire=60,
+    prefix=None,
+    args_rewrite=None,
+    per_block=False,
+    local_size=1024,
+):
+    """Like ``cache_memoize`` for expensive queries, without the dogpile on expiry.
+
+    * the TTL of every entry is ``timeout`` randomized by +-``jitter``, so
+      helpers cached at the same moment do not all expire together;
+    * an entry past its TTL stays stored ``stale_timeout`` more seconds
+      (default ``timeout``) and keeps being served while the single caller
+      holding the lock recomputes it;
+    * on a cold miss only the lock holder computes, the others wait for the
+      lock (up to ``lock_expire`` seconds) and read its result.
+
+    With ``per_block`` every entry records the chain version it was computed
+    at; once ``watch_new_block`` publishes a new block the entry counts as
+    expired, so height-dependent helpers are recomputed (by one caller, the
+    others keep the previous value meanwhile) at most once per block. Such
+    entries are kept ``PER_BLOCK_TIMEOUT``; ``timeout`` only bounds their
+    staleness while no chain version is published. They are computed on the
+    java_wallet database of the caller; a replica behind the published block
+    records its own height, so its result is replaced once it catches up.
+    Helpers of immutable history use ``timeout=None``; up to ``local_size`` of
+    their results are also kept in a per-process LRU.
+
+    Inside ``request_memo()`` repeated calls are answered without going to
+    the cache.
+
+    ``_refresh=True``, ``.invalidate()`` and ``.get_cache_key()`` work as in
+    ``cache_memoize``; ``.get_many()`` serves a batch of calls at once.
+    """
+    if stale_timeout is None:
+        stale_timeout = timeout or 0
+
+    def decorator(func):
+        prefix_ = prefix or f"{func.__module__}.{func.__qualname__}"
+        local = LocalLRU(local_size) if timeout is None and local_size else None
+
+        def get_cache_key(*args, **kwargs):
+            kwargs.pop("_refresh", None)
+            if args_rewrite:
+                args = args_rewrite(*args)
+            key = ":".join(
+                [quote(str(x)) for x in args]
+                + [f"{quote(k)}={quote(str(v))}" for k, v in sorted(kwargs.items())]
+            )
+            return "single_flight:" + hashlib.md5(f"{prefix_}:{key}".encode()).hexdigest()
+
+        def compute(cache_key, args, kwargs):
+            version = get_read_version() if per_block else None
+            result = func(*args, **kwargs)
+            store(cache_key, result, version)
+            return result
+
+        def store(cache_key, result, version=None):
+            if timeout is None:
+                cache.set(cache_key, (None, result, None), None)
+                if local is not None:
+                    local.set(cache_key, result)
+            else:
+                ttl = PER_BLOCK_TIMEOUT if per_block and version is not None else timeout
+                ttl *= random.uniform(1 - jitter, 1 + jitter)
+                cache.set(cache_key, (time.time() + ttl, result, version), int(ttl + stale_timeout) + 1)
+
+        def is_fresh(entry, now):
+            fresh_until, _, version = entry
+            if fresh_until is None:
+                return True
+            return now < fresh_until and (not per_block or version == get_chain_version())
+
+        def lookup(cache_key, refresh, args, kwargs):
+            if local is not None and not refresh:
+                result = local.get(cache_key, MISSING)
+                if result is not MISSING:
+                    return result
+
+            entry = None if refresh else cache.get(cache_key)
+            if entry is not None:
+                result = entry[1]
+                if entry[0] is None:
+                    if local is not None:
+                        local.set(cache_key, result)
+                    return result
+                if is_fresh(entry, time.time()):
+                    return result
+                lock = get_lock(cache_key, lock_expire)
+                if not lock.acquire(blocking=False):
+                    return result
+                try:
+                    return compute(cache_key, args, kwargs)
+                finally:
+                    _release(lock)
+
+            lock = get_lock(cache_key, lock_expire, blocking_timeout=lock_expire)
+            acquired = lock.acquire()
+            try:
+                if acquired and not refresh:
+                    entry = cache.get(cache_key)
+                    if entry is not None:
+                        return entry[1]
+                return compute(cache_key, args, kwargs)
+            finally:
+                if acquired:
+                    _release(lock)
+
+        @wraps(func)
+        def inner(*args, **kwargs):
+            refresh = kwargs.pop("_refresh", False)
+            cache_key = get_cache_key(*args, **kwargs)
+
+            memo = _request_memo.get()
+            if memo is None:
+                return lookup(cache_key, refresh, args, kwargs)
+            if refresh or cache_key not in memo:
+                memo[cache_key] = lookup(cache_key, refresh, args, kwargs)
+            return memo[cache_key]
+
+        def get_many(calls, compute_many):
+            """Results of several calls (tuples of args) read in one cache round
+            trip; the missing or expired ones come from ``compute_many(calls)``,
+            which returns a dict of call -> result, and are stored as if computed
+            one by one. Calls it has no result for are left out.
+
+            As for single calls, only the holder of the lock of the batch
+            computes: expired results are served meanwhile, and callers missing
+            results wait for it and read what it stored.
+            """
+            keys = {call: get_cache_key(*call) for call in calls}
+            memo = _request_memo.get()
+            results = {}
+            for call, cache_key in keys.items():
+                result = MISSING if memo is None else memo.get(cache_key, MISSING)
+                if result is MISSING and local is not None:
+                    result = local.get(cache_key, MISSING)
+                if result is not MISSING:
+                    results[call] = result
+
+            entries = cache.get_many([keys[call] for call in keys if call not in results])
+            now = time.time()
+            missing = []
+            expired = []
+            for call, cache_key in keys.items():
+                if call in results:
+                    continue
+                entry = entries.get(cache_key)
+                if entry is None:
+                    missing.append(call)
+                    continue
+                results[call] = entry[1]
+                if not is_fresh(entry, now):
+                    expired.append(call)
+
+            def compute_batch(batch):
+                version = get_read_version() if per_block else None
+                for call, result in compute_many(batch).items():
+                    store(keys[call], result, version)
+                    results[call] = result
+
+            if missing or expired:
+                batch_key = hashlib.md5(":".join(sorted(keys[call] for call in missing + expired)).encode()).hexdigest()
+                if not missing:
+                    lock = get_lock(f"single_flight_batch:{batch_key}", lock_expire)
+                    if lock.acquire(blocking=False):
+                        try:
+                            compute_batch(expired)
+                        finally:
+                            _release(lock)
+                else:
+                    lock = get_lock(f"single_flight_batch:{batch_key}", lock_expire, blocking_timeout=lock_expire)
+                    acquired = lock.acquire()
+                    try:
+                        pending = missing
+                        if acquired:
+                            # skip what the holder we waited for has computed
+                            stored = cache.get_many([keys[call] for call in missing + expired])
+                            now = time.time()
+                            pending = []
+                            for call in missing + expired:
+                                entry = stored.get(keys[call])
+                                if entry is not None and is_fresh(entry, now):
+                                    results[call] = entry[1]
+                                else:
+                                    pending.append(call)
+                        if pending:
+                            compute_batch(pending)
+                    finally:
+                        if acquired:
+                            _release(lock)
+
+            if memo is not None:
+                memo.update((keys[call], result) for call, result in results.items())
+            return results
+
+        def invalidate(*args, **kwargs):
+            cache_key = get_cache_key(*args, **kwargs)
+            cache.delete(cache_key)
+            if local is not None:
+                local.delete(cache_key)
 
+        inner.invalidate = invalidate
+        inner.get_cache_key = get_cache_key
+        inner.get_many = get_many
         return inner
 
     return decorator
@@ -0,0 +1,52 @@
+""" Rendered HTML of objects buried deeper than any reorg, see the
+``fragment`` tag in ``fragment_tags``.
+"""
+import hashlib
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.core.cache import cache
+from django.template.loader import get_template
+
+from burst.constants import MAX_ROLLBACK
+from scan.caching_data.last_height import CachingLastHeight
+from scan.helpers.decorators import get_chain_version, request_memoize
+
+# account names inside the fragments are cached as long, see get_account_name
+FRAGMENT_TIMEOUT = 3600
+
+
+def get_tip_height() -> int:
+    return get_chain_version() or CachingLastHeight().cached_data or 0
+
+
+def is_settled(height) -> bool:
+    """ The object at ``height`` can no longer be rolled back. Height 0 is
+    also used by pending transactions, so it never counts as settled. """
+    return bool(height) and get_tip_height() - height > MAX_ROLLBACK
+
+
+@lru_cache(maxsize=None)
+def get_template_version(template_name: str) -> str:
+    source = get_template(template_name).template.source
+    return hashlib.md5(source.encode()).hexdigest()[:8]
+
+
+def fragment_key(template_name: str, name: str, *vary_on) -> str:
+    key = ":".join([template_name, name, get_template_version(template_name)] + [quote(str(x)) for x in vary_on])
+    return "fragment:" + hashlib.md5(key.encode()).hexdigest()
+
+
+@request_memoize
+def get_fragment(key: str) -> list or None:
+    return cache.get(key)
+
+
+def set_fragment(key: str, value: list):
+    cache.set(key, value, FRAGMENT_TIMEOUT)
+
+
+def has_fragment(height, template_name: str, name: str, *vary_on) -> bool:
+    """ The view can skip loading what only the cached fragment shows; inside
+    ``request_memo()`` the tag then gets the same answer. """
+    return is_settled(height) and get_fragment(fragment_key(template_name, name, *vary_on)) is not None
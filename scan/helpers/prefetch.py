@@ -0,0 +1,160 @@
+""" Bulk lookups run by the views before rendering. Every row gets the data
+its template filters would otherwise fetch one by one (database queries or
+node calls), so rendering does no I/O.
+"""
+from django.db.models import OuterRef, Subquery
+
+from burst.constants import TxSubtypeColoredCoins, TxType
+from java_wallet.models import Alias, Asset, IndirectIncoming, Trade, Transaction
+from scan.helpers.queries import get_account_names, get_assets_from_node
+
+
+def prefetch_indirect_incoming(txs, account_id):
+    """ tx.indirect_incomings[account_id]: what a distribution paid the account,
+    read by tx_amount and tx_quantity """
+    try:
+        account_id = int(account_id)
+    except (TypeError, ValueError):
+        return
+    txs = [
+        tx
+        for tx in txs
+        if tx.type == TxType.COLORED_COINS
+        and tx.subtype == TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS
+        and tx.sender_id != account_id
+    ]
+    if not txs:
+        return
+
+    indirects = {}
+    for indirect in (
+        IndirectIncoming.objects
+        .filter(account_id=account_id, transaction_id__in=[tx.id for tx in txs])
+        .order_by("height")
+    ):
+        # the latest one wins, as in the filters
+        indirects[indirect.transaction_id] = indirect
+
+    for tx in txs:
+        if not hasattr(tx, "indirect_incomings"):
+            tx.indirect_incomings = {}
+        tx.indirect_incomings[account_id] = indirects.get(tx.id)
+
+
+def prefetch_asset_node_data(assets, id_attr="id"):
+    """ asset.circulating, asset.issuer_id and asset.current_owner_id from the
+    node, in one getAssets call for the assets not cached yet """
+    assets = list(assets)
+    node_assets = get_assets_from_node(getattr(asset, id_attr) for asset in assets)
+    for asset in assets:
+        data = node_assets.get(getattr(asset, id_attr))
+        if data is None:
+            continue
+        asset.circulating = int(data["quantityCirculatingQNT"])
+        asset.issuer_id = int(data["issuer"])
+        asset.current_owner_id = int(data["account"])
+
+
+def prefetch_asset_prices(assets):
+    """ asset.price: price of the latest trade, 0 without trades """
+    assets = list(assets)
+    if not assets:
+        return
+    latest_price = (
+        Trade.objects
+        .filter(asset_id=OuterRef("id"))
+        .order_by("-height")
+        .values("price")[:1]
+    )
+    prices = dict(
+        Asset.objects
+        .filter(id__in={asset.id for asset in assets})
+        .annotate(latest_price=Subquery(latest_price))
+        .values_list("id", "latest_price")
+    )
+    for asset in assets:
+        asset.price = prices.get(asset.id) or 0
+
+
+def prefetch_asset_treasury(holdings):
+    """ holding.is_treasury for AccountAsset rows: the account was added as a
+    treasury account of the asset, read by is_asset_treasury """
+    holdings = list(holdings)
+    if not holdings:
+        return
+    full_hashes = dict(
+        Transaction.objects
+        .filter(id__in={h.asset_id for h in holdings})
+        .values_list("id", "full_hash")
+    )
+    treasuries = set(
+        Transaction.objects
+        .filter(
+            type=TxType.COLORED_COINS,
+            subtype=TxSubtypeColoredCoins.ADD_TREASURY_ACCOUNT,
+            referenced_transaction_fullhash__in=set(full_hashes.values()),
+            recipient_id__in={h.account_id for h in holdings},
+        )
+        .values_list("referenced_transaction_fullhash", "recipient_id")
+    )
+    for h in holdings:
+        h.is_treasury = (full_hashes.get(h.asset_id), h.account_id) in treasuries
+
+
+def prefetch_holdings(holdings):
+    """ Treasury flag of every holding, circulating quantity for the others """
+    holdings = list(holdings)
+    prefetch_asset_treasury(holdings)
+    prefetch_asset_node_data(
+        [h for h in holdings if h.account_id != 0 and not h.is_treasury], "asset_id"
+    )
+
+
+def _get_aliases(alias_ids) -> dict:
+    alias_ids = {x for x in alias_ids if x is not None}
+    if not alias_ids:
+        return {}
+    return {
+        alias.id: alias
+        for alias in Alias.objects.filter(id__in=alias_ids, latest=True)
+    }
+
+
+def prefetch_aliases(aliases):
+    """ alias.tld_name and alias.account_name """
+    aliases = list(aliases)
+    tlds = _get_aliases(alias.tld for alias in aliases)
+    names = get_account_names(alias.account_id for alias in aliases)
+    for alias in aliases:
+        tld = tlds.get(alias.tld)
+        alias.tld_name = tld.alias_name if tld else None
+        alias.account_name = names.get(alias.account_id)
+
+
+def prefetch_subscriptions(subscriptions):
+    """ subscription.payee_id (the owner of the TLD for alias subscriptions,
+    like subscription_recipient_aliascheck), subscription.description (like
+    subscription_attachment) and the sender and payee names """
+    subscriptions = list(subscriptions)
+    aliases = _get_aliases(sub.id for sub in subscriptions)
+    tlds = _get_aliases(alias.tld for alias in aliases.values())
+
+    for sub in subscriptions:
+        sub.payee_id = sub.recipient_id
+        sub.description = ""
+        alias = aliases.get(sub.id)
+        tld = tlds.get(alias.tld) if alias else None
+        if tld:
+            sub.payee_id = tld.account_id
+        if sub.payee_id != sub.recipient_id:
+            if tld.alias_name == "signum":
+                sub.description = "Quarterly Payment for Alias: " + alias.alias_name
+            else:
+                sub.description = "Quarterly Payment for Alias: " + alias.alias_name + "." + tld.alias_name
+
+    names = get_account_names(
+        account_id for sub in subscriptions for account_id in (sub.sender_id, sub.payee_id)
+    )
+    for sub in subscriptions:
+        sub.sender_name = names.get(sub.sender_id)
+        sub.payee_name = names.get(sub.payee_id)
@@ -6,40 +6,86 @@ from ctypes import c_ulonglong, c_longlong
 from datetime import datetime
 from MySQLdb import Timestamp
 from django.conf import settings
+from django.core.cache import cache
 
 from django.db.models import F, OuterRef, Q, Sum
 
 from cache_memoize import cache_memoize
 from burst.api.brs.v1.api import BrsApi
-from burst.constants import BLOCK_CHAIN_START_AT, TxSubtypeBurstMining, TxSubtypeColoredCoins, TxType
-from java_wallet.fields import get_desc_tx_type
+from burst.constants import TxSubtypeBurstMining, TxSubtypeColoredCoins, TxType
 
 from java_wallet.models import Account, AccountBalance, Alias, Asset, At, AtState, Block, RewardRecipAssign, Trade, Transaction,IndirectIncoming, Subscription
+from scan.helpers.decorators import request_memoize, single_flight_memoize
+from scan.indexer.block_pools import BlockPoolsIndexer
+from scan.models import AccountActivity, BlockPool, IndexBackfill, IndexCounter, IndexedBlock
 
 
+@request_memoize
 @cache_memoize(3600)
 def get_account_name(account_id: int) -> str:
     if account_id == 0:
         return "Burn Address"
     account_name = (
-        Account.objects.using("java_wallet")
+        Account.objects
         .filter(id=account_id, latest=True)
         .values_list("name", flat=True)
         .first()
     )
     if not account_name:
         account_name = (
-            At.objects.using("java_wallet")
+            At.objects
             .filter(id=account_id, latest=True)
             .values_list("name", flat=True)
             .first()
         )
     return account_name
 
-@cache_memoize(240)
+
+def get_account_names(account_ids) -> dict:
+    """Bulk version of get_account_name: one cache MGET for all ids and at most
+    one Account and one At query for the cache misses. Results share the cache
+    entries of get_account_name.
+    """
+    account_ids = {int(x) for x in account_ids if x is not None}
+    if not account_ids:
+        return {}
+
+    keys = {get_account_name.get_cache_key(x): x for x in account_ids}
+    names = {keys[k]: v for k, v in cache.get_many(list(keys)).items()}
+
+    missing = account_ids - names.keys()
+    if missing:
+        found = dict(
+            Account.objects
+            .filter(id__in=missing, latest=True)
+            .values_list("id", "name")
+        )
+        if 0 in missing:
+            found[0] = "Burn Address"
+
+        without_name = [x for x in missing if not found.get(x)]
+        if without_name:
+            at_names = dict(
+                At.objects
+                .filter(id__in=without_name, latest=True)
+                .values_list("id", "name")
+            )
+            for x in without_name:
+                found[x] = at_names.get(x)
+
+        # same timeout as get_account_name
+        cache.set_many(
+            {get_account_name.get_cache_key(x): found.get(x) for x in missing}, 3600
+        )
+        names.update({x: found.get(x) for x in missing})
+
+    return names
+
+
+@single_flight_memoize(240, per_block=True)
 def get_account_balance(account_id: int) -> str:
     account_balance = (
-        AccountBalance.objects.using("java_wallet")
+        AccountBalance.objects
         .filter(id=account_id, latest=True)
         .values_list("balance", flat=True)
         .first()
@@ -49,37 +95,37 @@ def get_account_balance(account_id: int) -> str:
     else :
         return 0
     
-@cache_memoize(240)
+@single_flight_memoize(240, per_block=True)
 def get_registered_tld_name(tld_id: int) -> str:
     tld_name= (
-        Alias.objects.using("java_wallet")
+        Alias.objects
         .filter(id=tld_id, latest=True)
         .first()
     )
     return tld_name.alias_name
 
-@cache_memoize(240)
+@single_flight_memoize(240, per_block=True)
 def get_tld_reciever_id(sub_id: int) -> str:
-    check_sub = Subscription.objects.using("java_wallet").filter(id=sub_id, latest=True).first()
-    check_alias = Alias.objects.using("java_wallet").filter(id = check_sub.id, latest=True).first()
+    check_sub = Subscription.objects.filter(id=sub_id, latest=True).first()
+    check_alias = Alias.objects.filter(id = check_sub.id, latest=True).first()
     if check_alias:
-        check_tld = Alias.objects.using("java_wallet").filter(id = check_alias.tld, latest=True).first()
+        check_tld = Alias.objects.filter(id = check_alias.tld, latest=True).first()
         return check_tld.account_id
     return check_sub.recipient_id
 
-@cache_memoize(240)
+@single_flight_memoize(240, per_block=True)
 def get_subscription_recipient_id(sub_id:int):
-    check_sub = Subscription.objects.using("java_wallet").filter(id=sub_id, latest=True).first()
+    check_sub = Subscription.objects.filter(id=sub_id, latest=True).first()
     return check_sub.recipient_id
 
 def get_subscription_alias(sub_id:int):
-    check_alias = Alias.objects.using("java_wallet").filter(id = sub_id, latest=True).first()
+    check_alias = Alias.objects.filter(id = sub_id, latest=True).first()
     return check_alias.alias_name,check_alias.tld
 
-@cache_memoize(200)
+@single_flight_memoize(200, per_block=True)
 def get_account_unconfirmed_balance(account_id: int) -> str:
     account_balance = (
-        AccountBalance.objects.using("java_wallet")
+        AccountBalance.objects
         .filter(id=account_id, latest=True)
         .values_list("unconfirmed_balance", flat=True)
         .first()
@@ -89,31 +135,10 @@ def get_account_unconfirmed_balance(account_id: int) -> str:
     else:
         return 0
 
-@cache_memoize(3600)
-def get_details_by_tx(transaction_id:int) -> ( int, int,int):
-    # Value = Sender, Reciepent,Timestamp
-    transactions_data = (
-        Transaction.objects.using("java_wallet")
-        .filter(id =transaction_id )
-        .values_list("recipient_id","sender_id","timestamp")
-        .first()
-    )
-    return transactions_data
-
-@cache_memoize(3600)
-def get_single_tx_class(transaction_id:int):
-    # Value = Sender, Reciepent,Timestamp
-    transactions_data = (
-        Transaction.objects.using("java_wallet")
-        .filter(id =transaction_id )
-        .first()
-    )
-    return transactions_data
-
 # @cache_memoize(None)
 def get_ap_code(ap_code_hash_id: int) -> bytearray:
     ap_code = (
-        At.objects.using("java_wallet")
+        At.objects
         .filter(ap_code_hash_id=ap_code_hash_id, ap_code__isnull=False)
         .values_list("ap_code", flat=True)
         .first()
@@ -122,32 +147,32 @@ def get_ap_code(ap_code_hash_id: int) -> bytearray:
 
 def get_at_state(id: int) -> (bytearray, int):
     return (        
-        AtState.objects.using("java_wallet")
+        AtState.objects
         .filter(at_id=id, latest=True)
         .values_list("state", "min_activate_amount")
         .first()
         )
 
-@cache_memoize(None)
+# not permanent: an id can be looked up before its contract is created, and forks undo contracts
+@single_flight_memoize(240, per_block=True)
 def check_is_contract(account_id: int) -> bool:
     at_id = (
-            At.objects.using("java_wallet")
+            At.objects
             .filter(id=account_id, latest=True)
             .values_list("id", flat=True)
             .first()
         )
     return at_id != None
 
-@cache_memoize(None)
-
+@single_flight_memoize(None)
 def query_asset_fullhash(asset) ->(str):
-    full_hash = (Transaction.objects.using("java_wallet")
+    full_hash = (Transaction.objects
         .values_list('full_hash', flat=True)
         .filter(id=asset.asset_id).first()
     )
     return full_hash
 def query_asset_treasury_acc(asset, account_id) -> (str):
-    add_treasury = (Transaction.objects.using("java_wallet")
+    add_treasury = (Transaction.objects
         .values_list('referenced_transaction_fullhash', flat=True)
         .filter(type=TxType.COLORED_COINS,
             subtype=TxSubtypeColoredCoins.ADD_TREASURY_ACCOUNT,
@@ -155,42 +180,34 @@ def query_asset_treasury_acc(asset, account_id) -> (str):
     )
     return add_treasury
 
-@cache_memoize(None)
+@single_flight_memoize(3600, per_block=True)
 def get_asset_details(asset_id: int) -> (str, int, int, bool):
     asset_details = (
-        Asset.objects.using("java_wallet")
+        Asset.objects
         .filter(id=asset_id)
         .values_list("name", "decimals", "quantity", "mintable")
         .first()
         )
     return asset_details
 
-@cache_memoize(None)
+@single_flight_memoize(3600, per_block=True)
 def get_asset_details_owner(asset_id: int) -> (str, int, int, bool, int):
     asset_details = (
-        Asset.objects.using("java_wallet")
+        Asset.objects
         .filter(id=asset_id)
         .values_list("name", "decimals", "quantity", "mintable", "account_id")
         .first()
         )
     return asset_details
 
-@cache_memoize(None)
+@single_flight_memoize(None)
 def get_txs_count_in_block(block_id: int) -> int:
-    return Transaction.objects.using("java_wallet").filter(block_id=block_id).count()
-
-
-def get_pool_id_for_block(block: Block) -> int:
-    elapsed = datetime.now() - block.timestamp
+    return Transaction.objects.filter(block_id=block_id).count()
 
-    # For the more recent blocks we do not use the cache, since we could have short lived forks
-    if elapsed.total_seconds() < 240*4:
-        return get_pool_id_for_block_db(block)
-    return get_pool_id_for_block_cached(block)
 
 def get_pool_id_for_block_db(block: Block) -> int:
     return (
-        Transaction.objects.using("java_wallet")
+        Transaction.objects
         .filter(type=TxType.BURST_MINING, subtype=TxSubtypeBurstMining.REWARD_RECIPIENT_ASSIGNMENT,
             height__lte=block.height, sender_id=block.generator_id)
         .values_list("recipient_id", flat=True)
@@ -198,29 +215,126 @@ def get_pool_id_for_block_db(block: Block) -> int:
         .first()
     )
 
-@cache_memoize(240)
+def get_pool_ids_for_blocks(blocks) -> dict:
+    """Bulk version of get_pool_id_for_block_db: maps the height of every block
+    to its pool id with one query for the reward assignments of all generators.
+    """
+    blocks = list(blocks)
+    if not blocks:
+        return {}
+    assignments = {}
+    for sender_id, height, recipient_id in (
+        Transaction.objects
+        .filter(type=TxType.BURST_MINING, subtype=TxSubtypeBurstMining.REWARD_RECIPIENT_ASSIGNMENT,
+            height__lte=max(b.height for b in blocks), sender_id__in={b.generator_id for b in blocks})
+        .values_list("sender_id", "height", "recipient_id")
+        .order_by("height")
+    ):
+        assignments.setdefault(sender_id, []).append((height, recipient_id))
+
+    pool_ids = {}
+    for block in blocks:
+        pool_id = None
+        for height, recipient_id in assignments.get(block.generator_id, []):
+            if height > block.height:
+                break
+            pool_id = recipient_id
+        pool_ids[block.height] = pool_id
+    return pool_ids
+
+def get_block_pool_ids(blocks) -> dict:
+    """Same as get_pool_ids_for_blocks, read from the attribution table of the
+    block indexer. Blocks it has not indexed yet, or indexed on another fork,
+    are resolved from the node database.
+    """
+    blocks = list(blocks)
+    indexed = {
+        (height, generator_id): pool_id
+        for height, generator_id, pool_id in BlockPool.objects.filter(
+            height__in=[block.height for block in blocks]
+        ).values_list("height", "generator_id", "pool_id")
+    }
+    pool_ids = {}
+    missing = []
+    for block in blocks:
+        key = (block.height, block.generator_id)
+        if key in indexed:
+            pool_ids[block.height] = indexed[key]
+        else:
+            missing.append(block)
+    pool_ids.update(get_pool_ids_for_blocks(missing))
+    return pool_ids
+
+# blocks the indexer may lag behind the node before its counters are ignored
+BLOCK_INDEX_MAX_LAG = 10
+
+@cache_memoize(10)
+def is_block_index_ready() -> bool:
+    if not IndexedBlock.objects.filter(height=0).exists():
+        return False
+    indexed_height = IndexedBlock.objects.order_by("-height").values_list("height", flat=True).first()
+    last_height = Block.objects.using("java_wallet").order_by("-height").values_list("height", flat=True).first()
+    return last_height - indexed_height <= BLOCK_INDEX_MAX_LAG
+
+@cache_memoize(10)
+def is_index_ready(name: str) -> bool:
+    """The index table of the handler ``name`` covers the whole chain: the
+    block index has caught up and the table was filled from the genesis block"""
+    return is_block_index_ready() and IndexBackfill.objects.filter(name=name).exists()
+
+def get_index_counter(kind: int, key: int = 0) -> int or None:
+    """Counter maintained by the block indexer, None until the whole chain is indexed"""
+    if not is_block_index_ready():
+        return None
+    return (
+        IndexCounter.objects
+        .filter(kind=kind, key=key)
+        .values_list("value", flat=True)
+        .first()
+    ) or 0
+
+def get_transactions_in_order(tx_ids) -> list:
+    """Transactions by id in the order of tx_ids, skipping unknown ids"""
+    tx_ids = list(tx_ids)
+    txs = Transaction.objects.in_bulk(tx_ids, field_name="id")
+    return [txs[tx_id] for tx_id in tx_ids if tx_id in txs]
+
+def iter_account_activity(account_id: int, chunk_size: int = 1000):
+    """Yields the AccountActivity rows of an account newest first, chunk by chunk.
+    Every chunk continues after the last row of the previous one (keyset
+    pagination), so deep chunks cost the same as the first one.
+    """
+    activities = AccountActivity.objects.filter(account_id=account_id).order_by("-height", "-tx_id")
+    chunk = list(activities[:chunk_size])
+    while chunk:
+        yield chunk
+        last = chunk[-1]
+        chunk = list(
+            activities.filter(Q(height__lt=last.height) | Q(height=last.height, tx_id__lt=last.tx_id))[:chunk_size]
+        )
+
+@single_flight_memoize(240, per_block=True)
 def get_total_circulating():
     return (
-        AccountBalance.objects.using("java_wallet")
+        AccountBalance.objects
         .filter(latest=True)
         .exclude(id=0)
         .aggregate(Sum("balance"))["balance__sum"] 
     )  
 
-@cache_memoize(3600)
+@single_flight_memoize(3600, per_block=True)
 def get_total_accounts_count():
     return (
-        Account.objects.using("java_wallet")
+        Account.objects
         .filter(latest=True)
         .exclude(id=0)
         .count()
     )
 
-@cache_memoize(300)
+@single_flight_memoize(300, per_block=True)
 def get_asset_price(asset_id : int) -> float:
     latest_trade = assets_trades = (
-        Trade.objects.using("java_wallet")
-        .using("java_wallet")
+        Trade.objects
         .filter(asset_id=asset_id)
         .order_by("-height").first()
     )
@@ -228,14 +342,35 @@ def get_asset_price(asset_id : int) -> float:
         return latest_trade.price
     return 0
 
-@cache_memoize(None)
-def get_pool_id_for_block_cached(block: Block) -> int:
-    return get_pool_id_for_block_db(block)
+@single_flight_memoize(240, per_block=True)
+def get_asset_from_node(asset_id: int) -> dict:
+    # circulating quantity (without treasury accounts), issuer and current owner
+    return BrsApi(settings.SIGNUM_NODE).get_asset(asset_id)
 
-@cache_memoize(3600)
+# assets asked to the node in one getAssets call
+NODE_ASSETS_BATCH = 100
+
+
+def get_assets_from_node(asset_ids) -> dict:
+    """ get_asset_from_node of several assets, the uncached ones fetched with
+    getAssets. Assets the node does not know are left out. """
+
+    def fetch(calls):
+        api = BrsApi(settings.SIGNUM_NODE)
+        ids = [asset_id for asset_id, in calls]
+        fetched = {}
+        for i in range(0, len(ids), NODE_ASSETS_BATCH):
+            for asset in api.get_assets(ids[i:i + NODE_ASSETS_BATCH]):
+                fetched[(int(asset["asset"]),)] = asset
+        return fetched
+
+    results = get_asset_from_node.get_many([(int(asset_id),) for asset_id in set(asset_ids)], fetch)
+    return {asset_id: asset for (asset_id,), asset in results.items()}
+
+@single_flight_memoize(3600, per_block=True)
 def get_pool_id_for_account(address_id: int) -> int:
     return (
-        RewardRecipAssign.objects.using("java_wallet")
+        RewardRecipAssign.objects
         .filter(account_id=address_id)
         .values_list("recip_id", flat=True)
         .order_by("-height")
@@ -243,50 +378,10 @@ def get_pool_id_for_account(address_id: int) -> int:
     )
 
 
-@cache_memoize(10)
-def get_unconfirmed_transactions():
-    txs_pending = BrsApi(settings.SIGNUM_NODE).get_unconfirmed_transactions()
-
-    for t in txs_pending:
-        t["timestamp"] = datetime.fromtimestamp(
-            t["timestamp"] + BLOCK_CHAIN_START_AT
-        )
-        t["amountNQT"] = int(t["amountNQT"])
-        t["feeNQT"] = int(t["feeNQT"])
-        t["sender_name"] = get_account_name(int(t["sender"]))
-        t["has_message"] = False
-        t["has_encrypted_message"] = False
-
-        if "recipient" in t:
-            t["recipient_exists"] = (
-                Account.objects.using("java_wallet")
-                .filter(id=t["recipient"])
-                .exists()
-            )
-            if t["recipient_exists"]:
-                t["recipient_name"] = get_account_name(int(t["recipient"]))
-
-        t["attachment_bytes"] = None
-        if "attachmentBytes" in t:
-            t["attachment_bytes"] =  bytes.fromhex(t["attachmentBytes"])
-        if "attachment" in t and "recipients" in t["attachment"]:
-            t["multiout"] = len(t["attachment"]["recipients"])
-        if "attachment" in t and "message" in t["attachment"] and "messageIsText" in t["attachment"]:
-            t["message_pend"] = t["attachment"]["message"]
-            t["has_message"] = True
-        if "attachment" in t and "encryptedMessage" in t["attachment"]:
-            t["has_encrypted_message"] = True    
-
-        t["tx_name"] = get_desc_tx_type(t["type"], t["subtype"])
-
-    txs_pending.sort(key=lambda _x: _x["feeNQT"], reverse=True)
-
-    return txs_pending
-
-@cache_memoize(120)
+@single_flight_memoize(120, per_block=True)
 def get_description_url(pool_id: int) -> str:
     description = (
-        Account.objects.using("java_wallet")
+        Account.objects
         .filter(id=pool_id)
         .values_list("description", flat=True)
         .filter(latest=1)
@@ -297,10 +392,10 @@ def get_description_url(pool_id: int) -> str:
     except (json.JSONDecodeError, TypeError, KeyError):
         return ''
         
-@cache_memoize(120)
+@single_flight_memoize(120, per_block=True)
 def get_description_banner(pool_id: int) -> str:
     description = (
-        Account.objects.using("java_wallet")
+        Account.objects
         .filter(id=pool_id)
         .values_list("description", flat=True)
         .filter(latest=1)
@@ -317,35 +412,46 @@ def get_description_banner(pool_id: int) -> str:
     except (json.JSONDecodeError, TypeError, KeyError):
         return ''
 
-@cache_memoize(120)
+@single_flight_memoize(120, per_block=True)
 def get_count_of_miners(pool_id: int) -> int:
     return (
-        RewardRecipAssign.objects.using("java_wallet")
+        RewardRecipAssign.objects
         .filter(recip_id=pool_id)
         .filter(latest=1)
     ).count()
 
-@cache_memoize(120)
+@single_flight_memoize(120, per_block=True)
 def get_timestamp_of_block(height: int) -> datetime:
     return (
-        Block.objects.using("java_wallet")
+        Block.objects
         .filter(height=height)
         .values_list("timestamp", flat=True)
         .first()
     )
 
-@cache_memoize(120)
+@single_flight_memoize(120, per_block=True)
 def get_forged_blocks_of_pool(pool_id):
+    # evaluated here, on the database the version is read from
+    if is_index_ready(BlockPoolsIndexer.name):
+        return list(
+            BlockPool.objects
+            .filter(pool_id=pool_id)
+            .exclude(generator_id=pool_id)
+            .annotate(block=F("height"))
+            .order_by("-block")
+            .values("generator_id", "block")
+        )
+
     miners = (
-        RewardRecipAssign.objects.using("java_wallet")
+        RewardRecipAssign.objects
         .filter(~Q(recip_id=F('account_id')))
         .filter(height__lte=OuterRef("height"))
         .filter(recip_id=pool_id)
         .filter(latest=1)
         .values_list("account_id", flat=True)
     )
-    return (
-        Block.objects.using("java_wallet")
+    return list(
+        Block.objects
         .filter(generator_id__in=miners)
         .annotate(block=F("height"))
         .order_by("-block")
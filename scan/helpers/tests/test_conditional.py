@@ -0,0 +1,109 @@
+from calendar import timegm
+from datetime import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from burst.constants import MAX_ROLLBACK
+from java_wallet.models import Block
+from scan.helpers.conditional import SETTLED_MAX_AGE, TIP_MAX_AGE, conditional_page, settled_block
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ConditionalPageTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+        def view(request, **kwargs):
+            self.calls += 1
+            return HttpResponse("page")
+
+        self.view = view
+
+    @mock.patch("scan.helpers.conditional.get_tip_block")
+    def test_tip(self, tip):
+        view = conditional_page()(self.view)
+        tip.return_value = (10, 1000)
+
+        response = view(RequestFactory().get("/"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], 'W/"t10"')
+        self.assertEqual(response["Last-Modified"], "Thu, 01 Jan 1970 00:16:40 GMT")
+        self.assertIn(f"max-age={TIP_MAX_AGE}", response["Cache-Control"])
+
+        response = view(RequestFactory().get("/", HTTP_IF_NONE_MATCH='W/"t10"'))
+        self.assertEqual(response.status_code, 304)
+        response = view(RequestFactory().get("/", HTTP_IF_MODIFIED_SINCE="Thu, 01 Jan 1970 00:16:40 GMT"))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.calls, 1)
+
+        tip.return_value = (11, 1240)
+        response = view(RequestFactory().get("/", HTTP_IF_NONE_MATCH='W/"t10"'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.calls, 2)
+
+    @mock.patch("scan.helpers.conditional.Block.objects")
+    def test_no_blocks(self, objects):
+        objects.using.return_value.order_by.return_value.values_list.return_value.first.return_value = None
+        view = conditional_page()(self.view)
+        response = view(RequestFactory().get("/", HTTP_IF_NONE_MATCH='W/"t10"'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        self.assertEqual(self.calls, 1)
+
+    def test_settled(self):
+        view = conditional_page(lambda **kwargs: (5, 1000))(self.view)
+        with mock.patch("scan.helpers.conditional.time.time", return_value=SETTLED_MAX_AGE * 7 + 1):
+            response = view(RequestFactory().get("/"))
+            self.assertEqual(response["ETag"], 'W/"s5-7"')
+            self.assertIn(f"max-age={SETTLED_MAX_AGE}", response["Cache-Control"])
+            response = view(RequestFactory().get("/", HTTP_IF_NONE_MATCH='W/"s5-7"'))
+            self.assertEqual(response.status_code, 304)
+
+        # renewed every SETTLED_MAX_AGE
+        with mock.patch("scan.helpers.conditional.time.time", return_value=SETTLED_MAX_AGE * 8 + 1):
+            response = view(RequestFactory().get("/", HTTP_IF_NONE_MATCH='W/"s5-7"'))
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.calls, 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SettledTest(TestCase):
+    databases = {"default", "java_wallet"}
+
+    def setUp(self):
+        cache.clear()
+        Block.objects.using("java_wallet").create(
+            id=1,
+            timestamp=datetime(2023, 1, 1),
+            total_amount=0,
+            total_fee=0,
+            payload_length=0,
+            generator_public_key=b"",
+            cumulative_difficulty=b"",
+            base_target=0,
+            height=1,
+            generation_signature=b"",
+            block_signature=b"",
+            payload_hash=b"",
+            generator_id=1,
+            nonce=0,
+        )
+
+    def test_settled_block(self):
+        with mock.patch("scan.helpers.fragments.get_tip_height", return_value=MAX_ROLLBACK):
+            self.assertIsNone(settled_block("1"))
+        self.assertIsNone(settled_block("x"))
+
+        with mock.patch("scan.helpers.fragments.get_tip_height", return_value=MAX_ROLLBACK + 2):
+            expected = (1, timegm(datetime(2023, 1, 1).utctimetuple()))
+            self.assertEqual(settled_block("1"), expected)
+            with self.assertNumQueries(0, using="java_wallet"):
+                self.assertEqual(settled_block("1"), expected)
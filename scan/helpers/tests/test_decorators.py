@@ -0,0 +1,303 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from cache_memoize import cache_memoize
+
+from scan.helpers.decorators import (
+    PER_BLOCK_TIMEOUT,
+    LocalLRU,
+    _ProcessLock,
+    bump_chain_version,
+    get_lock,
+    request_memo,
+    request_memoize,
+    single_flight_memoize,
+)
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SingleFlightMemoizeTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+
+        @single_flight_memoize(100, jitter=0.1)
+        def heavy(x):
+            self.calls.append(x)
+            return x * 2
+
+        self.heavy = heavy
+
+    def expire(self, *args):
+        key = self.heavy.get_cache_key(*args)
+        fresh_until, result, version = cache.get(key)
+        cache.set(key, (time.time() - 1, result, version))
+
+    def test_memoized(self):
+        self.assertEqual(self.heavy(2), 4)
+        self.assertEqual(self.heavy(2), 4)
+        self.assertEqual(self.heavy(3), 6)
+        self.assertEqual(self.calls, [2, 3])
+
+        self.heavy(2, _refresh=True)
+        self.heavy.invalidate(3)
+        self.heavy(3)
+        self.assertEqual(self.calls, [2, 3, 2, 3])
+
+    def test_jittered_ttl(self):
+        now = time.time()
+        with mock.patch("scan.helpers.decorators.random.uniform", return_value=0.95) as uniform:
+            self.heavy(2)
+        uniform.assert_called_once_with(0.9, 1.1)
+        fresh_until, _, _ = cache.get(self.heavy.get_cache_key(2))
+        self.assertAlmostEqual(fresh_until - now, 95, delta=1)
+
+    def test_stale_served_while_refreshing(self):
+        self.heavy(2)
+        self.expire(2)
+
+        # somebody else is refreshing: keep serving the stale value
+        lock = get_lock(self.heavy.get_cache_key(2))
+        self.assertTrue(lock.acquire(blocking=False))
+        try:
+            self.assertEqual(self.heavy(2), 4)
+            self.assertEqual(self.calls, [2])
+        finally:
+            lock.release()
+
+        # nobody is: this caller refreshes
+        self.assertEqual(self.heavy(2), 4)
+        self.assertEqual(self.calls, [2, 2])
+        self.heavy(2)
+        self.assertEqual(self.calls, [2, 2])
+
+    def test_cold_miss_computed_once(self):
+        started = threading.Event()
+
+        @single_flight_memoize(100)
+        def slow():
+            self.calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return 42
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(slow())) for _ in range(5)]
+        threads[0].start()
+        started.wait()
+        for t in threads[1:]:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, [42] * 5)
+        self.assertEqual(self.calls, [1])
+
+    def test_process_locks_dropped(self):
+        for i in range(1000):
+            get_lock(f"key:{i}")
+        self.assertNotIn("lock_decorator:key:1", _ProcessLock._locks)
+
+        lock = get_lock("key:1")
+        self.assertTrue(lock.acquire(blocking=False))
+        try:
+            self.assertFalse(get_lock("key:1").acquire(blocking=False))
+            # another key is not held up
+            self.assertTrue(get_lock("key:2").acquire(blocking=False))
+        finally:
+            lock.release()
+
+    def test_none_cached(self):
+        @single_flight_memoize(100)
+        def nothing():
+            self.calls.append(1)
+
+        self.assertIsNone(nothing())
+        self.assertIsNone(nothing())
+        self.assertEqual(self.calls, [1])
+
+    def test_get_many(self):
+        batches = []
+
+        def double_many(calls):
+            batches.append(calls)
+            return {call: call[0] * 2 for call in calls if call[0] != 5}
+
+        self.heavy(1)
+        self.assertEqual(self.heavy.get_many([(1,), (2,), (5,)], double_many), {(1,): 2, (2,): 4})
+        self.assertEqual(batches, [[(2,), (5,)]])
+        # stored like computed ones
+        self.assertEqual(self.heavy(2), 4)
+        self.assertEqual(self.calls, [1])
+
+        self.expire(2)
+        self.heavy.get_many([(1,), (2,)], double_many)
+        self.assertEqual(batches, [[(2,), (5,)], [(2,)]])
+
+    def test_get_many_single_flight(self):
+        started, release = threading.Event(), threading.Event()
+        batches = []
+
+        def slow_many(calls):
+            batches.append(calls)
+            started.set()
+            release.wait(5)
+            return {call: call[0] * 3 for call in calls}
+
+        def get_many(results):
+            results.append(self.heavy.get_many([(1,), (2,)], slow_many))
+
+        # cold: one batch computes, the other callers wait for its results
+        results = []
+        threads = [threading.Thread(target=get_many, args=(results,)) for _ in range(3)]
+        threads[0].start()
+        started.wait(5)
+        for t in threads[1:]:
+            t.start()
+        release.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, [{(1,): 3, (2,): 6}] * 3)
+        self.assertEqual(batches, [[(1,), (2,)]])
+
+        # expired: served while the holder recomputes
+        self.expire(1)
+        self.expire(2)
+        started.clear()
+        release.clear()
+        refresher = threading.Thread(target=get_many, args=([],))
+        refresher.start()
+        started.wait(5)
+        self.assertEqual(self.heavy.get_many([(1,), (2,)], slow_many), {(1,): 3, (2,): 6})
+        release.set()
+        refresher.join()
+        self.assertEqual(len(batches), 2)
+
+    def test_per_block(self):
+        @single_flight_memoize(100, per_block=True)
+        def balance(x):
+            self.calls.append(x)
+            return x
+
+        bump_chain_version(10)
+        balance(1)
+        balance(1)
+        self.assertEqual(self.calls, [1])
+
+        bump_chain_version(11)
+        balance(1)
+        balance(1)
+        self.assertEqual(self.calls, [1, 1])
+        self.assertEqual(cache.get(balance.get_cache_key(1))[2], 11)
+
+    def test_per_block_ttl(self):
+        @single_flight_memoize(100, per_block=True, jitter=0)
+        def balance(x):
+            return x
+
+        # the chain version expires the entry, the timeout only without watch_new_block
+        now = time.time()
+        bump_chain_version(10)
+        balance(1)
+        self.assertAlmostEqual(cache.get(balance.get_cache_key(1))[0] - now, PER_BLOCK_TIMEOUT, delta=1)
+
+        with mock.patch("scan.helpers.decorators.get_chain_version", return_value=None):
+            balance(2)
+        self.assertAlmostEqual(cache.get(balance.get_cache_key(2))[0] - now, 100, delta=1)
+
+    def test_per_block_stale_while_recomputing(self):
+        @single_flight_memoize(100, per_block=True)
+        def balance(x):
+            self.calls.append(x)
+            return len(self.calls)
+
+        bump_chain_version(10)
+        self.assertEqual(balance(1), 1)
+
+        # one key for every block: the holder of its lock recomputes, the others keep the previous value
+        bump_chain_version(11)
+        lock = get_lock(balance.get_cache_key(1))
+        self.assertTrue(lock.acquire(blocking=False))
+        try:
+            self.assertEqual(balance(1), 1)
+        finally:
+            lock.release()
+        self.assertEqual(balance(1), 2)
+        self.assertEqual(balance(1), 2)
+        self.assertEqual(self.calls, [1, 1])
+
+    def test_immutable(self):
+        @single_flight_memoize(None)
+        def old_tx(x):
+            self.calls.append(x)
+            return x
+
+        old_tx(1)
+        bump_chain_version(12)
+        with mock.patch("scan.helpers.decorators.time.time", return_value=time.time() + 10**6):
+            old_tx(1)
+        self.assertEqual(self.calls, [1])
+
+    def test_immutable_kept_in_process(self):
+        @single_flight_memoize(None, local_size=2)
+        def old_tx(x):
+            self.calls.append(x)
+            return x
+
+        old_tx(1)
+        with mock.patch("scan.helpers.decorators.cache") as redis:
+            self.assertEqual(old_tx(1), 1)
+        redis.get.assert_not_called()
+
+        old_tx.invalidate(1)
+        old_tx(1)
+        self.assertEqual(self.calls, [1, 1])
+
+    def test_request_memo(self):
+        with request_memo():
+            self.heavy(2)
+            with mock.patch("scan.helpers.decorators.cache") as redis:
+                self.assertEqual(self.heavy(2), 4)
+                self.assertEqual(self.heavy(2), 4)
+            redis.get.assert_not_called()
+            self.heavy(2, _refresh=True)
+        self.assertEqual(self.calls, [2, 2])
+
+        with request_memo(), mock.patch("scan.helpers.decorators.cache") as redis:
+            redis.get.return_value = None
+            self.heavy(3)
+            self.heavy(3)
+        self.assertEqual(redis.get.call_count, 2)  # miss, then re-check under the lock
+
+    def test_request_memoize(self):
+        @request_memoize
+        @cache_memoize(100)
+        def name(x):
+            self.calls.append(x)
+            return str(x)
+
+        with request_memo(), mock.patch("django.core.cache.backends.locmem.LocMemCache.get") as get:
+            get.return_value = "1"
+            self.assertEqual(name(1), "1")
+            self.assertEqual(name(1), "1")
+        self.assertEqual(get.call_count, 1)
+        self.assertTrue(name.get_cache_key(1))
+
+
+class LocalLRUTest(SimpleTestCase):
+    def test_bounded(self):
+        lru = LocalLRU(2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        self.assertEqual(lru.get("a"), 1)
+        lru.set("c", 3)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual((lru.get("a"), lru.get("c")), (1, 3))
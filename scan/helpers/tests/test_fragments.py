@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.test import SimpleTestCase, override_settings
+
+from burst.constants import MAX_ROLLBACK
+from scan.helpers.decorators import request_memo
+from scan.helpers.fragments import get_template_version, has_fragment
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+ROW = (
+    "{% load fragment_tags %}"
+    '{% fragment "row" obj.height obj.id %}'
+    "[{{ obj.name }}|{% volatile %}{{ obj.age }}{% endvolatile %}]"
+    "{% endfragment %}"
+)
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "OPTIONS": {
+            "loaders": [("django.template.loaders.locmem.Loader", {"row.html": ROW})],
+        },
+    }
+]
+
+TIP = 10000
+
+
+class Obj:
+    def __init__(self, height, name, age):
+        self.id = 1
+        self.height = height
+        self.name = name
+        self.age = age
+
+
+@override_settings(CACHES=LOCMEM_CACHES, TEMPLATES=TEMPLATES)
+@mock.patch("scan.helpers.fragments.get_chain_version", return_value=TIP)
+class FragmentTagTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        get_template_version.cache_clear()
+
+    def render(self, obj):
+        return get_template("row.html").render({"obj": obj})
+
+    def test_settled_cached(self, _):
+        height = TIP - MAX_ROLLBACK - 1
+        self.assertEqual(self.render(Obj(height, "a", 1)), "[a|1]")
+        # only the volatile part is rendered again
+        self.assertEqual(self.render(Obj(height, "b", 2)), "[a|2]")
+        self.assertTrue(has_fragment(height, "row.html", "row", 1))
+        self.assertFalse(has_fragment(height, "row.html", "row", 2))
+
+    def test_markers_in_content(self, _):
+        height = TIP - MAX_ROLLBACK - 1
+        name = "msg\x00volatile:7\x00\x00volatile:0\x00"
+        self.assertEqual(self.render(Obj(height, name, 1)), f"[{name}|1]")
+        self.assertEqual(self.render(Obj(height, "b", 2)), f"[{name}|2]")
+
+    def test_reorg_window_not_cached(self, _):
+        for height in (TIP - MAX_ROLLBACK, 0):
+            self.assertEqual(self.render(Obj(height, "a", 1)), "[a|1]")
+            self.assertEqual(self.render(Obj(height, "b", 2)), "[b|2]")
+            self.assertFalse(has_fragment(height, "row.html", "row", 1))
+
+    def test_request_memo(self, _):
+        height = TIP - MAX_ROLLBACK - 1
+        with request_memo():
+            # the view saw no fragment, so the tag must not find one either
+            self.assertFalse(has_fragment(height, "row.html", "row", 1))
+            with mock.patch("scan.helpers.fragments.cache.get") as get:
+                self.assertEqual(self.render(Obj(height, "a", 1)), "[a|1]")
+            get.assert_not_called()
+        self.assertEqual(self.render(Obj(height, "b", 1)), "[a|1]")
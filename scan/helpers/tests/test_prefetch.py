@@ -0,0 +1,194 @@
+from datetime import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from burst.constants import TxSubtypeColoredCoins, TxType
+from java_wallet.models import AccountAsset, Alias, Asset, Block, IndirectIncoming, Subscription, Trade, Transaction
+from scan.helpers.prefetch import (
+    prefetch_aliases,
+    prefetch_asset_node_data,
+    prefetch_asset_prices,
+    prefetch_holdings,
+    prefetch_indirect_incoming,
+    prefetch_subscriptions,
+)
+from scan.templatetags.burst_tags import is_asset_treasury, tx_amount
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+def create_tx(tx_id, sender_id=1, recipient_id=None, tx_type=0, subtype=0, full_hash=None, referenced=None, attachment=None):
+    return Transaction.objects.using("java_wallet").create(
+        id=tx_id,
+        deadline=1440,
+        sender_public_key=b"",
+        recipient_id=recipient_id,
+        amount=100,
+        fee=1,
+        height=1,
+        block_id=1,
+        timestamp=datetime(2023, 1, 1),
+        type=tx_type,
+        subtype=subtype,
+        sender_id=sender_id,
+        block_timestamp=datetime(2023, 1, 1),
+        full_hash=full_hash or f"hash{tx_id}",
+        referenced_transaction_fullhash=referenced,
+        attachment_bytes=attachment,
+        version=1,
+        has_message=0,
+        has_encrypted_message=0,
+        has_public_key_announcement=0,
+        has_encrypttoself_message=0,
+    )
+
+
+def create_alias(alias_id, name, account_id=1, tld=None):
+    return Alias.objects.using("java_wallet").create(
+        id=alias_id,
+        account_id=account_id,
+        alias_name=name,
+        alias_name_lower=name,
+        alias_uri="",
+        timestamp=datetime(2023, 1, 1),
+        height=1,
+        latest=1,
+        tld=tld,
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PrefetchTest(TestCase):
+    databases = {"default", "java_wallet"}
+
+    def setUp(self):
+        cache.clear()
+        Block.objects.using("java_wallet").create(
+            id=1,
+            timestamp=datetime(2023, 1, 1),
+            total_amount=0,
+            total_fee=0,
+            payload_length=0,
+            generator_public_key=b"",
+            cumulative_difficulty=b"",
+            base_target=0,
+            height=1,
+            generation_signature=b"",
+            block_signature=b"",
+            payload_hash=b"",
+            generator_id=1,
+            nonce=0,
+        )
+
+    def test_indirect_incoming(self):
+        distributions = [
+            create_tx(
+                10 + i,
+                sender_id=1,
+                tx_type=TxType.COLORED_COINS,
+                subtype=TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS,
+                attachment=b"\x01",
+            )
+            for i in range(3)
+        ]
+        payment = create_tx(20, sender_id=1, recipient_id=2)
+        for height, amount in ((1, 5), (2, 7)):
+            IndirectIncoming.objects.using("java_wallet").create(
+                account_id=2, transaction_id=10, height=height, amount=amount, quantity=0
+            )
+
+        txs = distributions + [payment]
+        with self.assertNumQueries(1, using="java_wallet"):
+            prefetch_indirect_incoming(txs, "2")
+
+        with self.assertNumQueries(0, using="java_wallet"):
+            self.assertEqual(tx_amount(txs[0], "2"), 7e-08)
+            self.assertEqual(tx_amount(txs[1], "2"), 1e-06)
+        self.assertFalse(hasattr(payment, "indirect_incomings"))
+
+        # not prefetched for this account
+        with self.assertNumQueries(1, using="java_wallet"):
+            tx_amount(txs[0], "3")
+
+    def test_holdings(self):
+        create_tx(100, sender_id=1, full_hash="asset100")
+        create_tx(101, sender_id=1, tx_type=TxType.COLORED_COINS,
+                  subtype=TxSubtypeColoredCoins.ADD_TREASURY_ACCOUNT, recipient_id=2, referenced="asset100")
+        holdings = [
+            AccountAsset(account_id=account_id, asset_id=100, quantity=10, unconfirmed_quantity=10, height=1, latest=1)
+            for account_id in (2, 3, 0)
+        ]
+
+        with mock.patch("scan.helpers.queries.BrsApi") as api:
+            api.return_value.get_assets.return_value = [
+                {"asset": "100", "quantityCirculatingQNT": "40", "issuer": "1", "account": "1"},
+            ]
+            with self.assertNumQueries(2, using="java_wallet"):
+                prefetch_holdings(holdings)
+        api.return_value.get_assets.assert_called_once_with([100])
+
+        self.assertEqual([h.is_treasury for h in holdings], [True, False, False])
+        self.assertEqual(holdings[1].circulating, 40)
+        self.assertFalse(hasattr(holdings[0], "circulating"))
+        with self.assertNumQueries(0, using="java_wallet"):
+            self.assertTrue(is_asset_treasury(holdings[0], 2))
+            self.assertFalse(is_asset_treasury(holdings[1], 3))
+
+    def test_asset_node_data(self):
+        assets = [Asset(id=asset_id) for asset_id in (1, 2, 3, 1)]
+        with mock.patch("scan.helpers.queries.BrsApi") as api:
+            api.return_value.get_assets.side_effect = lambda ids: [
+                {"asset": str(asset_id), "quantityCirculatingQNT": "5", "issuer": "7", "account": "8"}
+                for asset_id in ids
+                if asset_id != 3
+            ]
+            prefetch_asset_node_data(assets[:1])
+            prefetch_asset_node_data(assets)
+            prefetch_asset_node_data(assets)
+        # one call for the first asset, one for the others, then all cached
+        self.assertEqual(
+            [sorted(c.args[0]) for c in api.return_value.get_assets.call_args_list], [[1], [2, 3], [3]]
+        )
+        self.assertEqual([a.circulating for a in assets[:2]], [5, 5])
+        self.assertEqual((assets[0].issuer_id, assets[0].current_owner_id), (7, 8))
+        self.assertFalse(hasattr(assets[2], "circulating"))
+
+    def test_asset_prices(self):
+        for asset_id in (1, 2):
+            Asset.objects.using("java_wallet").create(
+                id=asset_id, account_id=1, name=f"A{asset_id}", quantity=1, decimals=0, height=1
+            )
+        for height, price in ((1, 10), (3, 30), (2, 20)):
+            Trade.objects.using("java_wallet").create(
+                asset_id=1, block_id=1, ask_order_id=height, bid_order_id=height, ask_order_height=1, bid_order_height=1,
+                seller_id=1, buyer_id=2, quantity=1, price=price, timestamp=datetime(2023, 1, 1), height=height,
+            )
+        assets = list(Asset.objects.using("java_wallet").order_by("id"))
+        with self.assertNumQueries(1, using="java_wallet"):
+            prefetch_asset_prices(assets)
+        self.assertEqual([a.price for a in assets], [30, 0])
+
+    def test_aliases_and_subscriptions(self):
+        create_alias(1, "signum", account_id=7)
+        create_alias(2, "coin", account_id=8)
+        aliases = [create_alias(10, "alice", tld=1), create_alias(11, "bob", tld=2)]
+        subscriptions = [
+            Subscription(id=10, sender_id=3, recipient_id=10, amount=1, frequency=1, time_next=1, height=1, latest=1),
+            Subscription(id=11, sender_id=3, recipient_id=11, amount=1, frequency=1, time_next=1, height=1, latest=1),
+            Subscription(id=12, sender_id=3, recipient_id=4, amount=1, frequency=1, time_next=1, height=1, latest=1),
+        ]
+
+        with self.assertNumQueries(3, using="java_wallet"):  # tlds, account and AT names
+            prefetch_aliases(aliases)
+        self.assertEqual([a.tld_name for a in aliases], ["signum", "coin"])
+
+        prefetch_subscriptions(subscriptions)
+        self.assertEqual([s.payee_id for s in subscriptions], [7, 8, 4])
+        self.assertEqual(
+            [s.description for s in subscriptions],
+            ["Quarterly Payment for Alias: alice", "Quarterly Payment for Alias: bob.coin", ""],
+        )
@@ -0,0 +1,71 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from java_wallet.models import Account, At
+from scan.helpers.decorators import bump_chain_version
+from scan.helpers.queries import check_is_contract, get_account_name, get_account_names
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GetAccountNamesTest(TestCase):
+    databases = {"default", "java_wallet"}
+
+    def setUp(self) -> None:
+        cache.clear()
+        Account.objects.using("java_wallet").create(
+            id=1, creation_height=0, name="alice", height=1, latest=True
+        )
+        Account.objects.using("java_wallet").create(
+            id=2, creation_height=0, name=None, height=1, latest=True
+        )
+        self.create_at(2)
+
+    @staticmethod
+    def create_at(at_id):
+        At.objects.using("java_wallet").create(
+            id=at_id,
+            creator_id=1,
+            name="contract",
+            version=1,
+            csize=0,
+            dsize=0,
+            c_user_stack_bytes=0,
+            c_call_stack_bytes=0,
+            creation_height=1,
+            ap_code=b"",
+            height=1,
+            latest=True,
+        )
+
+    def test_same_as_single(self):
+        ids = [0, 1, 2, 3]
+        names = get_account_names(ids)
+        self.assertEqual(names, {x: get_account_name(x) for x in ids})
+        self.assertEqual(names[0], "Burn Address")
+        self.assertEqual(names[2], "contract")
+        self.assertIsNone(names[3])
+
+    def test_constant_queries(self):
+        with self.assertNumQueries(2, using="java_wallet"):
+            get_account_names(range(100))
+
+        with self.assertNumQueries(0, using="java_wallet"):
+            self.assertEqual(get_account_names([1, 2, None])[1], "alice")
+            self.assertEqual(get_account_name(1), "alice")
+
+    def test_empty(self):
+        self.assertEqual(get_account_names([]), {})
+        self.assertEqual(get_account_names([None]), {})
+
+    def test_contract_created_later(self):
+        bump_chain_version(1)
+        self.assertTrue(check_is_contract(2))
+        self.assertFalse(check_is_contract(3))
+
+        self.create_at(3)
+        bump_chain_version(2)
+        self.assertTrue(check_is_contract(3))
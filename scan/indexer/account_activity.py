@@ -0,0 +1,34 @@
+from scan.indexer.base import IndexerHandlerBase
+from scan.models import AccountActivity
+
+
+class AccountActivityIndexer(IndexerHandlerBase):
+    name = "account_activity"
+
+    @staticmethod
+    def _tx_activity(data, tx) -> list:
+        directions = {account_id: AccountActivity.Direction.INDIRECT for account_id in data.indirects.get(tx.id, ())}
+        if tx.recipient_id is not None:
+            directions[tx.recipient_id] = AccountActivity.Direction.IN
+        directions[tx.sender_id] = AccountActivity.Direction.OUT
+        return [
+            AccountActivity(account_id=account_id, height=tx.height, tx_id=tx.id, direction=direction)
+            for account_id, direction in directions.items()
+        ]
+
+    def index(self, blocks: list):
+        AccountActivity.objects.bulk_create(
+            [
+                activity
+                for data in blocks
+                for tx in data.txs
+                for activity in self._tx_activity(data, tx)
+            ],
+            batch_size=1000,
+        )
+
+    def rollback(self, height: int):
+        AccountActivity.objects.filter(height__gte=height).delete()
+
+    def reset(self):
+        AccountActivity.objects.all().delete()
@@ -0,0 +1,77 @@
+import sys
+
+from burst.constants import TxSubtypeColoredCoins, TxType
+from java_wallet.models import Transaction
+from scan.indexer.base import IndexerHandlerBase
+from scan.models import AssetOperation, IndexBackfill
+
+ASSET_OPERATION_SUBTYPES = (
+    TxSubtypeColoredCoins.ASSET_MINT,
+    TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS,
+)
+
+
+def is_asset_operation(tx: Transaction) -> bool:
+    return tx.type == TxType.COLORED_COINS and tx.subtype in ASSET_OPERATION_SUBTYPES
+
+
+def decode_asset_operation(tx: Transaction) -> AssetOperation:
+    # both attachments start with a version byte and the asset id,
+    # distributions then carry min quantity and distributed asset id
+    if tx.subtype == TxSubtypeColoredCoins.ASSET_MINT:
+        quantity_offset = 9
+    else:
+        quantity_offset = 25
+    return AssetOperation(
+        tx_id=tx.id,
+        asset_id=int.from_bytes(tx.attachment_bytes[1:9], byteorder=sys.byteorder),
+        subtype=tx.subtype,
+        height=tx.height,
+        quantity=int.from_bytes(tx.attachment_bytes[quantity_offset:quantity_offset + 8], byteorder=sys.byteorder),
+    )
+
+
+def backfill_asset_operations(batch_size: int = 10000) -> int:
+    """ Decodes every mint and distribution already on the node. Safe to run
+        while the block indexer is running, returns the number of transactions read.
+        Once done the asset pages read the index, see is_index_ready.
+    """
+    last_db_id = 0
+    total = 0
+    while True:
+        txs = list(
+            Transaction.objects.using("java_wallet")
+            .filter(type=TxType.COLORED_COINS, subtype__in=ASSET_OPERATION_SUBTYPES, db_id__gt=last_db_id)
+            .only("db_id", "id", "height", "type", "subtype", "attachment_bytes")
+            .order_by("db_id")[:batch_size]
+        )
+        if not txs:
+            IndexBackfill.objects.get_or_create(name=AssetOperationsIndexer.name)
+            return total
+        AssetOperation.objects.bulk_create(
+            [decode_asset_operation(tx) for tx in txs],
+            ignore_conflicts=True,
+        )
+        last_db_id = txs[-1].db_id
+        total += len(txs)
+
+
+class AssetOperationsIndexer(IndexerHandlerBase):
+    name = "asset_operations"
+
+    def index(self, blocks: list):
+        AssetOperation.objects.bulk_create(
+            [
+                decode_asset_operation(tx)
+                for data in blocks
+                for tx in data.txs
+                if is_asset_operation(tx)
+            ],
+            ignore_conflicts=True,
+        )
+
+    def rollback(self, height: int):
+        AssetOperation.objects.filter(height__gte=height).delete()
+
+    def reset(self):
+        AssetOperation.objects.all().delete()
@@ -0,0 +1,56 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Optional
+
+from java_wallet.models import Block, Transaction
+
+
+@dataclass
+class BlockData:
+    block: Block
+    txs: list = field(default_factory=list)
+    # transaction id -> account ids credited indirectly (multi-out, distributions)
+    indirects: dict = field(default_factory=dict)
+    pool_id: Optional[int] = None
+
+    @property
+    def height(self) -> int:
+        return self.block.height
+
+    @property
+    def forging_pool_id(self) -> Optional[int]:
+        # solo miners assign the reward to themselves
+        if self.pool_id and self.pool_id != self.block.generator_id:
+            return self.pool_id
+        return None
+
+    def tx_accounts(self, tx: Transaction) -> set:
+        accounts = {tx.sender_id, tx.recipient_id, *self.indirects.get(tx.id, ())}
+        accounts.discard(None)
+        return accounts
+
+
+class IndexerHandlerBase(ABC):
+    """ One explorer-side table maintained by the block indexer. All methods run
+        inside the transaction that records the indexed blocks, in the order of
+        BlockIndexer.handler_classes, so a handler may read what the previous
+        ones wrote or rolled back.
+    """
+
+    # IndexBackfill name of the table
+    name = None
+
+    @abstractmethod
+    def index(self, blocks: list):
+        """ Apply consecutive blocks (list of BlockData) in ascending height """
+
+    @abstractmethod
+    def rollback(self, height: int):
+        """ Undo everything applied for blocks at or above height """
+
+    @abstractmethod
+    def reset(self):
+        """ Drop everything to index again from the genesis block """
+
+    def prune(self, height: int):
+        """ Drop the rollback journal for blocks below height """
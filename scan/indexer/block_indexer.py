@@ -0,0 +1,183 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from burst.constants import MAX_ROLLBACK
+from java_wallet.models import Block, IndirectIncoming, Transaction
+from scan.helpers.queries import get_pool_ids_for_blocks
+from scan.indexer.account_activity import AccountActivityIndexer
+from scan.indexer.asset_operations import AssetOperationsIndexer
+from scan.indexer.base import BlockData
+from scan.indexer.block_pools import BlockPoolsIndexer
+from scan.indexer.counters import CountersIndexer
+from scan.indexer.pool_summary import PoolSummaryIndexer
+from scan.models import IndexBackfill, IndexedBlock
+
+logger = logging.getLogger(__name__)
+
+
+class IndexerForkError(Exception):
+    pass
+
+
+class BlockIndexer:
+    """ Applies the java_wallet blocks to the explorer-side tables of the
+        handlers, in height order. Every indexed block is journaled in
+        IndexedBlock; a block id that no longer matches the node's chain
+        triggers a rollback of the handlers down to the common ancestor.
+        Only one indexer may run at a time.
+    """
+
+    handler_classes = [
+        CountersIndexer,
+        AssetOperationsIndexer,
+        AccountActivityIndexer,
+        BlockPoolsIndexer,
+        PoolSummaryIndexer,
+    ]
+
+    def __init__(self, batch_size: int = None):
+        self.batch_size = batch_size or settings.BLOCK_INDEXER_BATCH
+        self.handlers = [handler_class() for handler_class in self.handler_classes]
+
+    @staticmethod
+    def indexed_tip() -> IndexedBlock or None:
+        return IndexedBlock.objects.order_by("-height").first()
+
+    @staticmethod
+    def find_fork_height(tip: IndexedBlock) -> int or None:
+        """ Lowest indexed height which is not on the node's chain anymore """
+        chain_id = (
+            Block.objects.using("java_wallet")
+            .filter(height=tip.height)
+            .values_list("id", flat=True)
+            .first()
+        )
+        if chain_id == tip.block_id:
+            return None
+
+        start = max(tip.height - MAX_ROLLBACK, 0)
+        indexed = dict(
+            IndexedBlock.objects.filter(height__gte=start).values_list("height", "block_id")
+        )
+        chain = dict(
+            Block.objects.using("java_wallet")
+            .filter(height__gte=start, height__lte=tip.height)
+            .values_list("height", "id")
+        )
+        for height in range(tip.height, start - 1, -1):
+            if height in chain and indexed.get(height) == chain[height]:
+                return height + 1
+        if start == 0:
+            return 0
+        raise IndexerForkError(
+            f"No common block with the node in the last {MAX_ROLLBACK} blocks, "
+            f"run 'manage.py index_blocks --reset'"
+        )
+
+    def rollback(self, height: int):
+        logger.warning(f"Block indexer: rolling back to height {height}")
+        with transaction.atomic():
+            for handler in self.handlers:
+                handler.rollback(height)
+            IndexedBlock.objects.filter(height__gte=height).delete()
+
+    def reset(self):
+        with transaction.atomic():
+            for handler in self.handlers:
+                handler.reset()
+            IndexedBlock.objects.all().delete()
+            IndexBackfill.objects.all().delete()
+
+    def _get_next_blocks(self, tip: IndexedBlock or None, limit: int) -> list:
+        next_height = tip.height + 1 if tip else 0
+        blocks = list(
+            Block.objects.using("java_wallet")
+            .filter(height__gte=next_height)
+            .only("id", "height", "generator_id", "previous_block")
+            .order_by("height")[:limit]
+        )
+        # keep only a consecutive chain on top of the tip, the node may be
+        # switching forks while we read
+        previous_id = tip.block_id if tip else None
+        for i, block in enumerate(blocks):
+            if block.height != next_height + i:
+                return blocks[:i]
+            if previous_id is not None and block.previous_block_id != previous_id:
+                return blocks[:i]
+            previous_id = block.id
+        return blocks
+
+    @staticmethod
+    def _get_blocks_data(blocks: list) -> list:
+        data = {
+            block.id: BlockData(block=block)
+            for block in blocks
+        }
+        txs = (
+            Transaction.objects.using("java_wallet")
+            .filter(block_id__in=data.keys())
+            .only("id", "block_id", "height", "type", "subtype", "sender_id", "recipient_id", "amount",
+                  "attachment_bytes")
+            .order_by("height", "db_id")
+        )
+        tx_ids = set()
+        for tx in txs:
+            data[tx.block_id].txs.append(tx)
+            tx_ids.add(tx.id)
+
+        by_height = {block.height: data[block.id] for block in blocks}
+        indirects = (
+            IndirectIncoming.objects.using("java_wallet")
+            .filter(height__gte=blocks[0].height, height__lte=blocks[-1].height)
+            .values_list("height", "transaction_id", "account_id")
+        )
+        for height, tx_id, account_id in indirects:
+            if tx_id in tx_ids:
+                by_height[height].indirects.setdefault(tx_id, []).append(account_id)
+
+        for height, pool_id in get_pool_ids_for_blocks(blocks).items():
+            by_height[height].pool_id = pool_id
+
+        return [data[block.id] for block in blocks]
+
+    def index_blocks(self, blocks: list):
+        blocks_data = self._get_blocks_data(blocks)
+        with transaction.atomic():
+            for handler in self.handlers:
+                handler.index(blocks_data)
+            IndexedBlock.objects.bulk_create(
+                [IndexedBlock(height=block.height, block_id=block.id) for block in blocks]
+            )
+            if blocks[0].height == 0:
+                # every table starts from the genesis block with the others
+                IndexBackfill.objects.bulk_create(
+                    [IndexBackfill(name=handler.name) for handler in self.handlers],
+                    ignore_conflicts=True,
+                )
+            for handler in self.handlers:
+                handler.prune(blocks[-1].height - MAX_ROLLBACK)
+
+    def run(self, max_blocks: int = None) -> int:
+        """ Rolls back a fork if any, then indexes up to max_blocks new blocks.
+            Returns the number of blocks indexed.
+        """
+        tip = self.indexed_tip()
+        if tip:
+            fork_height = self.find_fork_height(tip)
+            if fork_height is not None:
+                self.rollback(fork_height)
+                tip = self.indexed_tip()
+
+        indexed = 0
+        while max_blocks is None or indexed < max_blocks:
+            limit = self.batch_size if max_blocks is None else min(self.batch_size, max_blocks - indexed)
+            blocks = self._get_next_blocks(tip, limit)
+            if not blocks:
+                break
+            self.index_blocks(blocks)
+            indexed += len(blocks)
+            tip = IndexedBlock(height=blocks[-1].height, block_id=blocks[-1].id)
+            logger.info(f"Block indexer: indexed up to height {tip.height}")
+        return indexed
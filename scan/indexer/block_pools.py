@@ -0,0 +1,21 @@
+from scan.indexer.base import IndexerHandlerBase
+from scan.models import BlockPool
+
+
+class BlockPoolsIndexer(IndexerHandlerBase):
+    name = "block_pools"
+
+    def index(self, blocks: list):
+        BlockPool.objects.bulk_create(
+            [
+                BlockPool(height=data.height, generator_id=data.block.generator_id, pool_id=data.pool_id)
+                for data in blocks
+            ],
+            batch_size=1000,
+        )
+
+    def rollback(self, height: int):
+        BlockPool.objects.filter(height__gte=height).delete()
+
+    def reset(self):
+        BlockPool.objects.all().delete()
@@ -0,0 +1,95 @@
+from collections import Counter
+
+from scan.indexer.base import IndexerHandlerBase
+from scan.models import IndexCounter, IndexCounterDelta
+
+
+class CountersIndexer(IndexerHandlerBase):
+    """ Maintains IndexCounter: total txs, txs per account (sent, received or
+        credited indirectly), blocks forged per pool and the height of the last
+        one. Any value is kept as a sum of per block deltas, so a rollback
+        restores it exactly.
+    """
+
+    name = "counters"
+
+    @staticmethod
+    def _block_deltas(data) -> Counter:
+        deltas = Counter()
+        deltas[(IndexCounter.Kind.TOTAL_TXS, 0)] += len(data.txs)
+        for tx in data.txs:
+            for account_id in data.tx_accounts(tx):
+                deltas[(IndexCounter.Kind.ACCOUNT_TXS, account_id)] += 1
+        if data.forging_pool_id:
+            deltas[(IndexCounter.Kind.POOL_FORGED_BLOCKS, data.forging_pool_id)] += 1
+        return +deltas
+
+    @staticmethod
+    def _get_counters(kind: int, keys) -> dict:
+        keys = list(keys)
+        counters = {}
+        for i in range(0, len(keys), 1000):
+            counters.update(
+                (counter.key, counter)
+                for counter in IndexCounter.objects.filter(kind=kind, key__in=keys[i:i + 1000])
+            )
+        return counters
+
+    def _apply(self, deltas: Counter):
+        by_kind = {}
+        for (kind, key), delta in deltas.items():
+            if delta:
+                by_kind.setdefault(kind, {})[key] = delta
+
+        for kind, changes in by_kind.items():
+            existing = self._get_counters(kind, changes)
+            for key, counter in existing.items():
+                counter.value += changes[key]
+            IndexCounter.objects.bulk_update(existing.values(), ["value"], batch_size=1000)
+            IndexCounter.objects.bulk_create(
+                [
+                    IndexCounter(kind=kind, key=key, value=delta)
+                    for key, delta in changes.items()
+                    if key not in existing
+                ],
+                batch_size=1000,
+            )
+
+    def index(self, blocks: list):
+        last_forged = {
+            key: counter.value
+            for key, counter in self._get_counters(
+                IndexCounter.Kind.POOL_LAST_FORGED_HEIGHT,
+                {data.forging_pool_id for data in blocks if data.forging_pool_id},
+            ).items()
+        }
+        total = Counter()
+        journal = []
+        for data in blocks:
+            deltas = self._block_deltas(data)
+            if data.forging_pool_id:
+                pool_id = data.forging_pool_id
+                deltas[(IndexCounter.Kind.POOL_LAST_FORGED_HEIGHT, pool_id)] += data.height - last_forged.get(pool_id, 0)
+                last_forged[pool_id] = data.height
+            total.update(deltas)
+            journal.extend(
+                IndexCounterDelta(height=data.height, kind=kind, key=key, delta=delta)
+                for (kind, key), delta in deltas.items()
+            )
+        IndexCounterDelta.objects.bulk_create(journal, batch_size=1000)
+        self._apply(total)
+
+    def rollback(self, height: int):
+        journal = IndexCounterDelta.objects.filter(height__gte=height)
+        total = Counter()
+        for kind, key, delta in journal.values_list("kind", "key", "delta"):
+            total[(kind, key)] -= delta
+        self._apply(total)
+        journal.delete()
+
+    def reset(self):
+        IndexCounterDelta.objects.all().delete()
+        IndexCounter.objects.all().delete()
+
+    def prune(self, height: int):
+        IndexCounterDelta.objects.filter(height__lt=height).delete()
@@ -0,0 +1,116 @@
+from django.db.models import Count
+
+from burst.constants import TxSubtypeBurstMining, TxSubtypeMessaging, TxType
+from java_wallet.models import Block, RewardRecipAssign
+from scan.helpers.queries import get_description_banner, get_description_url
+from scan.indexer.base import IndexerHandlerBase
+from scan.models import IndexCounter, PoolSummary
+
+
+def count_miners(pool_ids=None) -> dict:
+    """ Same count as get_count_of_miners, for many pools in one query """
+    assignments = RewardRecipAssign.objects.using("java_wallet").filter(latest=1)
+    if pool_ids is not None:
+        assignments = assignments.filter(recip_id__in=pool_ids)
+    return dict(
+        assignments
+        .values("recip_id")
+        .annotate(miners_cnt=Count("account_id"))
+        .values_list("recip_id", "miners_cnt")
+    )
+
+
+class PoolSummaryIndexer(IndexerHandlerBase):
+    """ Maintains PoolSummary from the pool counters, so it has to come after
+        CountersIndexer.
+    """
+
+    name = "pool_summary"
+
+    @staticmethod
+    def refresh_pools(pool_ids: set):
+        """ Forged blocks of the pools from the counters, new pools also get
+            their miners count and profile.
+        """
+        counters = {
+            (kind, key): value
+            for kind, key, value in IndexCounter.objects.filter(
+                kind__in=[IndexCounter.Kind.POOL_FORGED_BLOCKS, IndexCounter.Kind.POOL_LAST_FORGED_HEIGHT],
+                key__in=pool_ids,
+            ).values_list("kind", "key", "value")
+        }
+        heights = {
+            pool_id: counters.get((IndexCounter.Kind.POOL_LAST_FORGED_HEIGHT, pool_id), 0)
+            for pool_id in pool_ids
+        }
+        timestamps = dict(
+            Block.objects.using("java_wallet")
+            .filter(height__in=set(heights.values()))
+            .values_list("height", "timestamp")
+        )
+        summaries = PoolSummary.objects.in_bulk(pool_ids)
+
+        gone = {pool_id for pool_id in pool_ids if not counters.get((IndexCounter.Kind.POOL_FORGED_BLOCKS, pool_id))}
+        PoolSummary.objects.filter(pool_id__in=gone).delete()
+
+        new = pool_ids - gone - summaries.keys()
+        miners = count_miners(new)
+        for pool_id in new:
+            summaries[pool_id] = PoolSummary(
+                pool_id=pool_id,
+                miners_cnt=miners.get(pool_id, 0),
+                url=get_description_url(pool_id, _refresh=True) or "",
+                banner=get_description_banner(pool_id, _refresh=True) or "",
+            )
+
+        for pool_id in pool_ids - gone:
+            summary = summaries[pool_id]
+            summary.forged_cnt = counters[(IndexCounter.Kind.POOL_FORGED_BLOCKS, pool_id)]
+            summary.last_forged_height = heights[pool_id]
+            summary.last_forged_at = timestamps[heights[pool_id]]
+            summary.save()
+
+    @staticmethod
+    def refresh_profiles(pool_ids: set):
+        for summary in PoolSummary.objects.filter(pool_id__in=pool_ids):
+            summary.url = get_description_url(summary.pool_id, _refresh=True) or ""
+            summary.banner = get_description_banner(summary.pool_id, _refresh=True) or ""
+            summary.save(update_fields=["url", "banner", "modified_at"])
+
+    @staticmethod
+    def refresh_miners():
+        miners = count_miners()
+        summaries = list(PoolSummary.objects.all())
+        for summary in summaries:
+            summary.miners_cnt = miners.get(summary.pool_id, 0)
+        PoolSummary.objects.bulk_update(summaries, ["miners_cnt"], batch_size=1000)
+
+    def index(self, blocks: list):
+        txs = [tx for data in blocks for tx in data.txs]
+        forging_pools = {data.forging_pool_id for data in blocks if data.forging_pool_id}
+        if forging_pools:
+            self.refresh_pools(forging_pools)
+
+        profile_updates = {
+            tx.sender_id for tx in txs
+            if tx.type == TxType.MESSAGING and tx.subtype == TxSubtypeMessaging.ACCOUNT_INFO
+        } - forging_pools
+        if profile_updates:
+            self.refresh_profiles(profile_updates)
+
+        if any(
+            tx.type == TxType.BURST_MINING and tx.subtype == TxSubtypeBurstMining.REWARD_RECIPIENT_ASSIGNMENT
+            for tx in txs
+        ):
+            self.refresh_miners()
+
+    def rollback(self, height: int):
+        pool_ids = set(
+            PoolSummary.objects.filter(last_forged_height__gte=height).values_list("pool_id", flat=True)
+        )
+        if pool_ids:
+            self.refresh_pools(pool_ids)
+        self.refresh_miners()
+
+    def reset(self):
+        PoolSummary.objects.all().delete()
@@ -0,0 +1,52 @@
+from django.test import TestCase
+
+from java_wallet.models import Block, Transaction
+from scan.helpers.queries import iter_account_activity
+from scan.indexer.account_activity import AccountActivityIndexer
+from scan.indexer.base import BlockData
+from scan.models import AccountActivity
+
+
+class AccountActivityIndexerTest(TestCase):
+    def setUp(self) -> None:
+        self.indexer = AccountActivityIndexer()
+        self.indexer.index([
+            BlockData(
+                block=Block(id=11, height=1),
+                txs=[
+                    Transaction(id=1, height=1, sender_id=1, recipient_id=2),
+                    # multi-out, also paying the sender back
+                    Transaction(id=2, height=1, sender_id=1, recipient_id=None),
+                ],
+                indirects={2: [1, 3]},
+            ),
+            BlockData(
+                block=Block(id=12, height=2),
+                txs=[Transaction(id=3, height=2, sender_id=2, recipient_id=1)],
+            ),
+        ])
+
+    def test_index(self):
+        self.assertEqual(
+            set(AccountActivity.objects.values_list("account_id", "tx_id", "direction")),
+            {
+                (1, 1, AccountActivity.Direction.OUT),
+                (2, 1, AccountActivity.Direction.IN),
+                (1, 2, AccountActivity.Direction.OUT),
+                (3, 2, AccountActivity.Direction.INDIRECT),
+                (2, 3, AccountActivity.Direction.OUT),
+                (1, 3, AccountActivity.Direction.IN),
+            },
+        )
+
+    def test_iter_account_activity(self):
+        chunks = [
+            [activity.tx_id for activity in chunk]
+            for chunk in iter_account_activity(1, chunk_size=2)
+        ]
+        self.assertEqual(chunks, [[3, 2], [1]])
+
+    def test_rollback(self):
+        self.indexer.rollback(2)
+        self.assertFalse(AccountActivity.objects.filter(height=2).exists())
+        self.assertEqual(AccountActivity.objects.count(), 4)
@@ -0,0 +1,112 @@
+import sys
+from datetime import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+
+from burst.constants import TxSubtypeColoredCoins, TxType
+from java_wallet.models import Block, Transaction
+from scan.indexer.asset_operations import AssetOperationsIndexer, backfill_asset_operations, decode_asset_operation
+from scan.indexer.base import BlockData
+from scan.indexer.block_indexer import BlockIndexer
+from scan.models import AssetOperation, IndexBackfill, IndexedBlock
+from scan.views.assets import count_asset_operations, get_asset_operations
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+def to_bytes(*values) -> bytes:
+    return b"\x01" + b"".join(value.to_bytes(8, byteorder=sys.byteorder) for value in values)
+
+
+def colored_coins_tx(tx_id, height, subtype, attachment_bytes):
+    return Transaction(
+        id=tx_id,
+        height=height,
+        sender_id=1,
+        type=TxType.COLORED_COINS,
+        subtype=subtype,
+        attachment_bytes=attachment_bytes,
+    )
+
+
+class AssetOperationsIndexerTest(TestCase):
+    def setUp(self) -> None:
+        self.mint = colored_coins_tx(1, 5, TxSubtypeColoredCoins.ASSET_MINT, to_bytes(77, 500))
+        # holders of asset 77 with at least 10 receive 300 of asset 88
+        self.distribution = colored_coins_tx(
+            2, 6, TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS, to_bytes(77, 10, 88, 300) + b"\x00" * 8
+        )
+        self.transfer = colored_coins_tx(3, 6, TxSubtypeColoredCoins.ASSET_TRANSFER, to_bytes(77, 1))
+
+    def test_decode(self):
+        mint = decode_asset_operation(self.mint)
+        self.assertEqual((mint.asset_id, mint.quantity, mint.height), (77, 500, 5))
+        distribution = decode_asset_operation(self.distribution)
+        self.assertEqual((distribution.asset_id, distribution.quantity), (77, 300))
+
+    def test_index_and_rollback(self):
+        indexer = AssetOperationsIndexer()
+        indexer.index([
+            BlockData(block=Block(id=15, height=5), txs=[self.mint]),
+            BlockData(block=Block(id=16, height=6), txs=[self.distribution, self.transfer]),
+        ])
+        # indexing twice, e.g. after a backfill, keeps one row per transaction
+        indexer.index([BlockData(block=Block(id=16, height=6), txs=[self.distribution])])
+        self.assertEqual(
+            list(AssetOperation.objects.order_by("tx_id").values_list("tx_id", "subtype")),
+            [(1, TxSubtypeColoredCoins.ASSET_MINT), (2, TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS)],
+        )
+
+        indexer.rollback(6)
+        self.assertEqual(list(AssetOperation.objects.values_list("tx_id", flat=True)), [1])
+
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AssetOperationsBackfillTest(TestCase):
+    databases = {"default", "java_wallet"}
+
+    def setUp(self) -> None:
+        cache.clear()
+        Block.objects.using("java_wallet").create(
+            id=1, timestamp=datetime(2023, 1, 1), total_amount=0, total_fee=0, payload_length=0,
+            generator_public_key=b"", cumulative_difficulty=b"", base_target=0, height=1,
+            generation_signature=b"", block_signature=b"", payload_hash=b"", generator_id=1, nonce=0,
+        )
+        # the block index is up to date, but the table was added after genesis was indexed
+        IndexedBlock.objects.bulk_create([IndexedBlock(height=0, block_id=0), IndexedBlock(height=1, block_id=1)])
+        AssetOperation.objects.create(tx_id=1, asset_id=77, subtype=TxSubtypeColoredCoins.ASSET_MINT, height=1, quantity=5)
+        self.txs = [
+            colored_coins_tx(2, 1, TxSubtypeColoredCoins.ASSET_MINT, to_bytes(78, 500)),
+            colored_coins_tx(1, 1, TxSubtypeColoredCoins.ASSET_MINT, to_bytes(77, 500)),
+        ]
+
+    def test_fallback_until_backfilled(self):
+        with mock.patch("scan.views.assets.Transaction.objects") as objects:
+            objects.filter.return_value.only.return_value.order_by.return_value.iterator.return_value = self.txs
+            operations = get_asset_operations(77, TxSubtypeColoredCoins.ASSET_MINT)
+        self.assertIsInstance(operations, list)
+        self.assertEqual([(operation.tx_id, operation.quantity) for operation in operations], [(1, 500)])
+        self.assertEqual(count_asset_operations(operations), 1)
+
+        # no mint or distribution on the node
+        self.assertEqual(backfill_asset_operations(), 0)
+        cache.clear()
+        operations = get_asset_operations(77, TxSubtypeColoredCoins.ASSET_MINT)
+        self.assertIsInstance(operations, QuerySet)
+        self.assertEqual(count_asset_operations(operations), 1)
+
+    def test_indexed_from_genesis(self):
+        IndexedBlock.objects.all().delete()
+        BlockIndexer().index_blocks([Block.objects.using("java_wallet").get(height=1)])
+        self.assertFalse(IndexBackfill.objects.exists())
+
+        IndexedBlock.objects.all().delete()
+        BlockIndexer().index_blocks([Block(id=0, height=0, generator_id=1)])
+        self.assertEqual(set(IndexBackfill.objects.values_list("name", flat=True)),
+                         {handler.name for handler in BlockIndexer().handlers})
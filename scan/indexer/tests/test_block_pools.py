@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from java_wallet.models import Block
+from scan.helpers.queries import get_block_pool_ids, is_index_ready
+from scan.indexer.base import BlockData
+from scan.indexer.block_pools import BlockPoolsIndexer
+from scan.models import BlockPool, IndexBackfill
+from scan.views.forged_blocks import ForgedBlocksListView
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+class BlockPoolsIndexerTest(TestCase):
+    databases = {"default", "java_wallet"}
+
+    def setUp(self) -> None:
+        self.indexer = BlockPoolsIndexer()
+        self.indexer.index([
+            BlockData(block=Block(id=10, height=0, generator_id=1)),
+            BlockData(block=Block(id=11, height=1, generator_id=2), pool_id=20),
+        ])
+
+    def test_index(self):
+        self.assertEqual(
+            set(BlockPool.objects.values_list("height", "generator_id", "pool_id")),
+            {(0, 1, None), (1, 2, 20)},
+        )
+
+    def test_get_block_pool_ids(self):
+        blocks = [Block(height=0, generator_id=1), Block(height=1, generator_id=2)]
+        with self.assertNumQueries(1):
+            self.assertEqual(get_block_pool_ids(blocks), {0: None, 1: 20})
+
+    def test_other_fork_not_used(self):
+        # indexed block 1 was forged by another generator
+        self.assertEqual(get_block_pool_ids([Block(height=1, generator_id=3)]), {1: None})
+
+    def test_rollback(self):
+        self.indexer.rollback(1)
+        self.assertEqual(list(BlockPool.objects.values_list("height", flat=True)), [0])
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch("scan.helpers.queries.is_block_index_ready", return_value=True)
+    def test_backfill_marker(self, _):
+        # the block index caught up before the table was added
+        cache.clear()
+        view = ForgedBlocksListView(request=RequestFactory().get("/"))
+        self.assertFalse(is_index_ready(BlockPoolsIndexer.name))
+        self.assertIsNot(view.get_queryset().model, BlockPool)
+
+        IndexBackfill.objects.create(name=BlockPoolsIndexer.name)
+        cache.clear()
+        self.assertIs(view.get_queryset().model, BlockPool)
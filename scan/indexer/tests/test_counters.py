@@ -0,0 +1,72 @@
+from django.test import TestCase
+
+from burst.constants import TxType
+from java_wallet.models import Block, Transaction
+from scan.indexer.base import BlockData
+from scan.indexer.counters import CountersIndexer
+from scan.models import IndexCounter, IndexCounterDelta
+
+
+def block_data(height, txs=(), indirects=None, generator_id=10, pool_id=None):
+    return BlockData(
+        block=Block(id=1000 + height, height=height, generator_id=generator_id),
+        txs=list(txs),
+        indirects=indirects or {},
+        pool_id=pool_id,
+    )
+
+
+def tx(tx_id, sender_id, recipient_id=None, type=TxType.PAYMENT, subtype=0, attachment_bytes=None):
+    return Transaction(
+        id=tx_id,
+        sender_id=sender_id,
+        recipient_id=recipient_id,
+        type=type,
+        subtype=subtype,
+        attachment_bytes=attachment_bytes,
+    )
+
+
+class CountersIndexerTest(TestCase):
+    def setUp(self) -> None:
+        self.indexer = CountersIndexer()
+        self.indexer.index([
+            block_data(0, [tx(1, 1, 2), tx(2, 2, 1)]),
+            block_data(1, [tx(3, 1), tx(4, 3)], indirects={3: [2, 3, 1]}, pool_id=20),
+        ])
+
+    def counters(self):
+        return {
+            (kind, key): value
+            for kind, key, value in IndexCounter.objects.filter(value__gt=0).values_list("kind", "key", "value")
+        }
+
+    def test_index(self):
+        self.assertEqual(self.counters(), {
+            (IndexCounter.Kind.TOTAL_TXS, 0): 4,
+            (IndexCounter.Kind.ACCOUNT_TXS, 1): 3,
+            (IndexCounter.Kind.ACCOUNT_TXS, 2): 3,
+            (IndexCounter.Kind.ACCOUNT_TXS, 3): 2,
+            (IndexCounter.Kind.POOL_FORGED_BLOCKS, 20): 1,
+            (IndexCounter.Kind.POOL_LAST_FORGED_HEIGHT, 20): 1,
+        })
+
+    def test_solo_mining_not_counted(self):
+        self.indexer.index([block_data(2, pool_id=10)])
+        self.assertEqual(self.counters()[(IndexCounter.Kind.POOL_FORGED_BLOCKS, 20)], 1)
+        self.assertNotIn((IndexCounter.Kind.POOL_FORGED_BLOCKS, 10), self.counters())
+
+    def test_rollback(self):
+        before = self.counters()
+        self.indexer.index([block_data(2, [tx(5, 1, 4)], pool_id=20)])
+        self.assertEqual(self.counters()[(IndexCounter.Kind.POOL_LAST_FORGED_HEIGHT, 20)], 2)
+        self.indexer.rollback(2)
+        self.assertEqual(self.counters(), before)
+        self.assertFalse(IndexCounterDelta.objects.filter(height=2).exists())
+
+        self.indexer.rollback(0)
+        self.assertEqual(self.counters(), {})
+
+    def test_prune(self):
+        self.indexer.prune(1)
+        self.assertEqual(set(IndexCounterDelta.objects.values_list("height", flat=True)), {1})
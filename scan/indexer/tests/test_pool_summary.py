@@ -0,0 +1,90 @@
+from datetime import datetime
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from burst.constants import TxSubtypeBurstMining, TxType
+from java_wallet.models import Account, Block, RewardRecipAssign, Transaction
+from scan.indexer.base import BlockData
+from scan.indexer.counters import CountersIndexer
+from scan.indexer.pool_summary import PoolSummaryIndexer
+from scan.models import PoolSummary
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+def create_block(height, generator_id=10):
+    return Block.objects.using("java_wallet").create(
+        id=1000 + height,
+        timestamp=datetime(2023, 1, 1, 0, height),
+        total_amount=0,
+        total_fee=0,
+        payload_length=0,
+        generator_public_key=b"",
+        cumulative_difficulty=b"",
+        base_target=0,
+        height=height,
+        generation_signature=b"",
+        block_signature=b"",
+        payload_hash=b"",
+        generator_id=generator_id,
+        nonce=0,
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PoolSummaryIndexerTest(TestCase):
+    databases = {"default", "java_wallet"}
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.handlers = [CountersIndexer(), PoolSummaryIndexer()]
+        Account.objects.using("java_wallet").create(
+            id=20, creation_height=0, description='{"hp": "https://pool"}', height=0, latest=1
+        )
+        for account_id in (10, 11):
+            RewardRecipAssign.objects.using("java_wallet").create(
+                account_id=account_id, prev_recip_id=account_id, recip_id=20, from_height=0, height=0, latest=1
+            )
+        self.index(*[create_block(height) for height in range(3)])
+
+    def index(self, *blocks, txs=()):
+        data = [BlockData(block=block, txs=list(txs), pool_id=20) for block in blocks]
+        for handler in self.handlers:
+            handler.index(data)
+
+    def rollback(self, height):
+        for handler in self.handlers:
+            handler.rollback(height)
+
+    def test_index(self):
+        summary = PoolSummary.objects.get()
+        self.assertEqual(summary.pool_id, 20)
+        self.assertEqual(summary.forged_cnt, 3)
+        self.assertEqual(summary.last_forged_height, 2)
+        self.assertEqual(summary.last_forged_at, datetime(2023, 1, 1, 0, 2))
+        self.assertEqual(summary.miners_cnt, 2)
+        self.assertEqual(summary.url, "https://pool")
+
+    def test_reward_assignment_refreshes_miners(self):
+        RewardRecipAssign.objects.using("java_wallet").filter(account_id=11).update(recip_id=11)
+        assignment = Transaction(
+            id=1,
+            sender_id=11,
+            type=TxType.BURST_MINING,
+            subtype=TxSubtypeBurstMining.REWARD_RECIPIENT_ASSIGNMENT,
+        )
+        self.index(create_block(3, generator_id=30), txs=[assignment])
+        self.assertEqual(PoolSummary.objects.get().miners_cnt, 1)
+
+    def test_rollback(self):
+        self.rollback(2)
+        summary = PoolSummary.objects.get()
+        self.assertEqual(summary.forged_cnt, 2)
+        self.assertEqual(summary.last_forged_height, 1)
+        self.assertEqual(summary.last_forged_at, datetime(2023, 1, 1, 0, 1))
+
+        self.rollback(0)
+        self.assertFalse(PoolSummary.objects.exists())
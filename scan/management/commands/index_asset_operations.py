@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+
+from scan.indexer.asset_operations import backfill_asset_operations
+
+
+class Command(BaseCommand):
+    help = "Backfill the asset mints and distributions index from the node database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        total = backfill_asset_operations(options["batch_size"])
+        print(f"Decoded {total} asset mints and distributions")
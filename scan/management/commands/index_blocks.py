@@ -0,0 +1,19 @@
+from django.core.management import BaseCommand
+
+from scan.indexer.block_indexer import BlockIndexer
+
+
+class Command(BaseCommand):
+    help = "Index all blocks not indexed yet, stop watch_new_block while running"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Drop the index and start from the genesis block")
+        parser.add_argument("--batch-size", type=int, default=None, help="Blocks per transaction")
+
+    def handle(self, *args, **options):
+        indexer = BlockIndexer(batch_size=options["batch_size"])
+        if options["reset"]:
+            indexer.reset()
+        indexed = indexer.run()
+        tip = indexer.indexed_tip()
+        print(f"Indexed {indexed} blocks, index height: {tip.height if tip else None}")
@@ -3,17 +3,36 @@ from time import sleep
 from django.core.management import BaseCommand
 
 from scan.caching_data.last_height import CachingLastHeight
+from scan.caching_data.pending_txs import CachingPendingTxs
+from scan.caching_data.total_txs_count import CachingTotalTxsCount
+from scan.helpers.decorators import bump_chain_version
+from scan.indexer.block_indexer import BlockIndexer
 
 
 class Command(BaseCommand):
-    help = "Watch new block"
+    help = "Watch new block and index it"
 
     def handle(self, *args, **options):
+        indexer = BlockIndexer()
         last_height = 0
         while True:
             height = CachingLastHeight().live_data
+            # every loop, so the version expires soon after this command stops
+            bump_chain_version(height)
             if last_height != height:
                 last_height = height
                 print(f"New block: {height}")
                 CachingLastHeight().update_data(height)
+                # height-dependent caches and the mempool snapshot start over
+                try:
+                    CachingPendingTxs().update_live_data()
+                except Exception as e:
+                    print(f"Pending txs refresh failed: {e}")
+
+            indexed = indexer.run(max_blocks=indexer.batch_size)
+            if indexed:
+                CachingTotalTxsCount().update_live_data()
+            # still catching up with the node
+            if indexed == indexer.batch_size:
+                continue
             sleep(1)
@@ -0,0 +1,23 @@
+import logging
+from time import sleep
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from scan.caching_data.pending_txs import CachingPendingTxs
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Poll the node mempool and publish the pending transactions snapshot"
+
+    def handle(self, *args, **options):
+        pending_txs = CachingPendingTxs()
+        while True:
+            try:
+                pending_txs.update_live_data()
+            except Exception as e:
+                # keep the last snapshot, it expires on its own
+                logger.warning("Pending txs refresh failed: %s", e)
+            sleep(settings.PENDING_TXS_REFRESH_INTERVAL)
@@ -0,0 +1,25 @@
+import logging
+from time import sleep
+
+from django.core.management import BaseCommand
+
+from java_wallet.db_router import get_replica_monitor
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Check the java_wallet replicas and publish the healthy ones for the pages"
+
+    def handle(self, *args, **options):
+        monitor = get_replica_monitor()
+        if not monitor.replicas:
+            logger.warning("No java_wallet replicas configured, see DB_JAVA_WALLET_REPLICAS")
+            return
+        while True:
+            try:
+                monitor.publish()
+            except Exception as e:
+                # the published list expires on its own, the pages then read the primary
+                logger.warning("Replicas check failed: %s", e)
+            sleep(monitor.interval)
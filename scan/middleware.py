@@ -0,0 +1,30 @@
+from java_wallet.db_router import use_replica
+from scan.helpers.decorators import request_memo
+
+
+class ReplicaReadsMiddleware:
+    """GET and HEAD requests read the node database from one of its replicas,
+    see java_wallet.db_router.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in ("GET", "HEAD"):
+            return self.get_response(request)
+        with use_replica():
+            return self.get_response(request)
+
+
+class RequestMemoMiddleware:
+    """Memoized helpers called repeatedly while rendering one page only hit the
+    cache once per distinct call.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_memo():
+            return self.get_response(request)
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:40
+
+from django.db import migrations, models
+import java_wallet.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scan', '0002_delete_multiout_alter_peermonitor_reward_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexCounterDelta',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('height', models.PositiveIntegerField(db_index=True)),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, 'total transactions'), (2, 'account transactions'), (3, 'pool forged blocks')])),
+                ('key', java_wallet.fields.PositiveBigIntegerField(default=0)),
+                ('delta', models.BigIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IndexedBlock',
+            fields=[
+                ('height', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('block_id', java_wallet.fields.PositiveBigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IndexCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, 'total transactions'), (2, 'account transactions'), (3, 'pool forged blocks')])),
+                ('key', java_wallet.fields.PositiveBigIntegerField(default=0)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('kind', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:42
+
+from django.db import migrations, models
+import java_wallet.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scan', '0003_indexcounterdelta_indexedblock_indexcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetOperation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tx_id', java_wallet.fields.PositiveBigIntegerField(unique=True)),
+                ('asset_id', java_wallet.fields.PositiveBigIntegerField()),
+                ('subtype', models.PositiveSmallIntegerField()),
+                ('height', models.PositiveIntegerField(db_index=True)),
+                ('quantity', java_wallet.fields.PositiveBigIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['asset_id', 'subtype', '-height'], name='scan_asseto_asset_i_9f746d_idx')],
+            },
+        ),
+    ]
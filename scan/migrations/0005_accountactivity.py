@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:44
+
+from django.db import migrations, models
+import java_wallet.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scan', '0004_assetoperation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_id', java_wallet.fields.PositiveBigIntegerField()),
+                ('height', models.PositiveIntegerField(db_index=True)),
+                ('tx_id', java_wallet.fields.PositiveBigIntegerField()),
+                ('direction', models.PositiveSmallIntegerField(choices=[(1, 'out'), (2, 'in'), (3, 'indirect')])),
+            ],
+            options={
+                'indexes': [models.Index(fields=['account_id', '-height', '-tx_id'], name='scan_accoun_account_99c4f6_idx')],
+                'unique_together': {('account_id', 'tx_id')},
+            },
+        ),
+    ]
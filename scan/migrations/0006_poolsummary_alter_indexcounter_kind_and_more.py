@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:49
+
+from django.db import migrations, models
+import java_wallet.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scan', '0005_accountactivity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PoolSummary',
+            fields=[
+                ('pool_id', java_wallet.fields.PositiveBigIntegerField(primary_key=True, serialize=False)),
+                ('last_forged_height', models.PositiveIntegerField(db_index=True)),
+                ('last_forged_at', models.DateTimeField()),
+                ('forged_cnt', models.PositiveIntegerField(default=0)),
+                ('miners_cnt', models.PositiveIntegerField(default=0)),
+                ('url', models.TextField(blank=True)),
+                ('banner', models.TextField(blank=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='indexcounter',
+            name='kind',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'total transactions'), (2, 'account transactions'), (3, 'pool forged blocks'), (4, 'pool last forged height')]),
+        ),
+        migrations.AlterField(
+            model_name='indexcounterdelta',
+            name='kind',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'total transactions'), (2, 'account transactions'), (3, 'pool forged blocks'), (4, 'pool last forged height')]),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:50
+
+from django.db import migrations, models
+import java_wallet.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scan', '0006_poolsummary_alter_indexcounter_kind_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockPool',
+            fields=[
+                ('height', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('generator_id', java_wallet.fields.PositiveBigIntegerField()),
+                ('pool_id', java_wallet.fields.PositiveBigIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['pool_id', '-height'], name='scan_blockp_pool_id_3eb542_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scan', '0007_blockpool'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexBackfill',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db.models import (
     BigAutoField,
+    Index,
+    BigIntegerField,
     CharField,
     DateTimeField,
     FloatField,
@@ -7,6 +9,7 @@ from django.db.models import (
     Model,
     PositiveIntegerField,
     PositiveSmallIntegerField,
+    TextField,
 )
 from django.utils.translation import gettext as _
 
@@ -51,3 +54,121 @@ class PeerMonitor(Model):
 
     reward_state = CharField(max_length=255, blank=True, null=True, default='none')
     reward_time = DateTimeField(blank=True, null=True)
+
+
+class IndexedBlock(Model):
+    """ Journal of the java_wallet blocks already applied by the block indexer,
+        used to detect forks by comparing block ids per height.
+    """
+    height = PositiveIntegerField(primary_key=True)
+    block_id = PositiveBigIntegerField()
+
+    created_at = DateTimeField(auto_now_add=True)
+
+
+class IndexBackfill(Model):
+    """ Index tables filled from the genesis block, by name of their handler.
+        A table added by an upgrade misses the blocks indexed before it, the
+        pages keep reading the node database until it is backfilled.
+    """
+    name = CharField(max_length=64, primary_key=True)
+
+    created_at = DateTimeField(auto_now_add=True)
+
+
+class IndexCounter(Model):
+    class Kind:
+        TOTAL_TXS = 1
+        ACCOUNT_TXS = 2
+        POOL_FORGED_BLOCKS = 3
+        POOL_LAST_FORGED_HEIGHT = 4
+
+    KIND_CHOICES = (
+        (Kind.TOTAL_TXS, _("total transactions")),
+        (Kind.ACCOUNT_TXS, _("account transactions")),
+        (Kind.POOL_FORGED_BLOCKS, _("pool forged blocks")),
+        (Kind.POOL_LAST_FORGED_HEIGHT, _("pool last forged height")),
+    )
+
+    kind = PositiveSmallIntegerField(choices=KIND_CHOICES)
+    key = PositiveBigIntegerField(default=0)
+    value = BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("kind", "key")
+
+
+class IndexCounterDelta(Model):
+    """ Per block changes of IndexCounter, kept for the last MAX_ROLLBACK
+        blocks so that a fork can be rolled back.
+    """
+    height = PositiveIntegerField(db_index=True)
+    kind = PositiveSmallIntegerField(choices=IndexCounter.KIND_CHOICES)
+    key = PositiveBigIntegerField(default=0)
+    delta = BigIntegerField()
+
+
+class AssetOperation(Model):
+    """ Asset mints and distributions to holders, decoded from the transaction
+        attachments. For distributions asset_id is the asset whose holders
+        receive and quantity the amount of the distributed asset.
+    """
+    tx_id = PositiveBigIntegerField(unique=True)
+    asset_id = PositiveBigIntegerField()
+    subtype = PositiveSmallIntegerField()
+    height = PositiveIntegerField(db_index=True)
+    quantity = PositiveBigIntegerField()
+
+    class Meta:
+        indexes = [Index(fields=["asset_id", "subtype", "-height"])]
+
+
+class AccountActivity(Model):
+    """ One row per transaction an account took part in: sent, received or
+        credited indirectly (multi-out, distributions). Sending wins when an
+        account is on both sides.
+    """
+    class Direction:
+        OUT = 1
+        IN = 2
+        INDIRECT = 3
+
+    DIRECTION_CHOICES = (
+        (Direction.OUT, _("out")),
+        (Direction.IN, _("in")),
+        (Direction.INDIRECT, _("indirect")),
+    )
+
+    account_id = PositiveBigIntegerField()
+    height = PositiveIntegerField(db_index=True)
+    tx_id = PositiveBigIntegerField()
+    direction = PositiveSmallIntegerField(choices=DIRECTION_CHOICES)
+
+    class Meta:
+        unique_together = ("account_id", "tx_id")
+        indexes = [Index(fields=["account_id", "-height", "-tx_id"])]
+
+
+class PoolSummary(Model):
+    """ Pools leaderboard, refreshed by the block indexer """
+    pool_id = PositiveBigIntegerField(primary_key=True)
+    last_forged_height = PositiveIntegerField(db_index=True)
+    last_forged_at = DateTimeField()
+    forged_cnt = PositiveIntegerField(default=0)
+    miners_cnt = PositiveIntegerField(default=0)
+    url = TextField(blank=True)
+    banner = TextField(blank=True)
+
+    modified_at = DateTimeField(auto_now=True)
+
+
+class BlockPool(Model):
+    """ Pool the generator of every block was assigned to, null when there was
+        no reward assignment. Written by the block indexer.
+    """
+    height = PositiveIntegerField(primary_key=True)
+    generator_id = PositiveBigIntegerField()
+    pool_id = PositiveBigIntegerField(blank=True, null=True)
+
+    class Meta:
+        indexes = [Index(fields=["pool_id", "-height"])]
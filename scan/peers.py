@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import random
 import socket
@@ -10,11 +11,9 @@ from time import sleep
 
 import requests
 from cache_memoize import cache_memoize
-from django import forms
 from django.conf import settings
-from django.db import transaction
-from django.db.models import DurationField, ExpressionWrapper, F
-from django.db.models.functions import Now
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
 from django.utils import timezone
 from requests.exceptions import RequestException
 
@@ -31,7 +30,7 @@ if PEERS_SCAN_DELAY > 0:
     logger.info(f"Peers sleeping for {PEERS_SCAN_DELAY} seconds...")
 sleep(PEERS_SCAN_DELAY)
 
-def get_ip_by_domain(peer: str) -> str or None:
+async def get_ip_by_domain(peer: str) -> str or None:
     # truncating port if exists
     if not peer.startswith("http"):
         peer = f"http://{peer}"
@@ -45,7 +44,8 @@ def get_ip_by_domain(peer: str) -> str or None:
         return hostname
 
     try:
-        return socket.gethostbyname(hostname)
+        addresses = await asyncio.get_running_loop().getaddrinfo(hostname, None, family=socket.AF_INET)
+        return addresses[0][4][0]
     except socket.gaierror as e:
         logger.debug("Can't resolve host: %s - %r", peer, e)
         return None
@@ -54,7 +54,7 @@ def get_ip_by_domain(peer: str) -> str or None:
 @cache_memoize(60 * 60 * 24 * 7)
 def get_country_by_ip(ip: str) -> str:
     try:
-        response = requests.get(f"https://ipwho.is/{ip}")
+        response = requests.get(f"https://ipwho.is/{ip}", timeout=10)
         response.raise_for_status()
         json_response = response.json()
         georesponse = json_response["continent"] or "??"
@@ -65,10 +65,17 @@ def get_country_by_ip(ip: str) -> str:
         return "??"
 
 
-class PeerMonitorForm(forms.ModelForm):
-    class Meta:
-        model = PeerMonitor
-        fields = ['announced_address', 'real_ip', 'platform', 'application', 'version', 'height', 'cumulative_difficulty', 'country_code', 'state', 'downtime', 'lifetime', 'availability', 'last_online_at']
+# fields of PeerMonitor taken from the scan results
+PEER_UPDATE_FIELDS = [
+    "real_ip",
+    "platform",
+    "application",
+    "version",
+    "height",
+    "cumulative_difficulty",
+    "country_code",
+    "last_online_at",
+]
 
 
 def is_good_version(version: str) -> bool:
@@ -110,77 +117,145 @@ def get_block_cumulative_difficulty(height: int) -> str:
     return str(int(cumulative_difficulty.hex(), 16))
 
 
-def explore_peer(local_difficulty: dict, address: str, updates: dict):
-    logger.info("Peer: %s", address)
-    p2p_api = P2PApi(address)
-    peer_info = p2p_api.get_info()
-    logger.info("Peerdata")
-    peer_info.update(p2p_api.get_cumulative_difficulty())
-    #logger.info(p2p_api.get_cumulative_difficulty())
-    if int(peer_info["blockchainHeight"]) -10 >  int(local_difficulty["height"]):
-        logger.info("Node: %s its block to high  %s", address,peer_info["blockchainHeight"])
-        return
-    if int(peer_info["blockchainHeight"]) +500000 <  int(local_difficulty["height"]):
-        logger.info("Node: %s its block to low %s", address,peer_info["blockchainHeight"])
-        return
-
-    if address in updates:
-        return
+class PeerCrawler:
+    """ Explores the network breadth-first, starting from the given addresses
+        and following the peers every node knows about. Each address is
+        explored once, with at most `concurrency` requests in flight, each
+        given up after `timeout` seconds without an answer.
+    """
+
+    def __init__(
+        self,
+        local_difficulty: dict,
+        concurrency: int = settings.PEERS_SCAN_CONCURRENCY,
+        timeout: float = settings.PEERS_SCAN_TIMEOUT,
+    ) -> None:
+        self.local_difficulty = local_difficulty
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.updates = {}
+        self._seen = set()
+        self._executor = None
+        self._futures = set()
+
+    @staticmethod
+    def normalize_address(address: str) -> str:
+        default_port = ":" + str(settings.DEFAULT_P2P_PORT)
+        address = address.strip()
+        if address.endswith(default_port):
+            address = address[:-len(default_port)]
+        return address
+
+    async def _call(self, func, *args):
+        # P2PApi is blocking, the requests run in the pool; a request is only
+        # ever stopped by its own timeout, a thread cannot be cancelled
+        future = self._executor.submit(func, *args)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return await asyncio.wrap_future(future)
+
+    async def explore_peer(self, address: str) -> list:
+        """ Collects the update of the peer into self.updates, returns the
+            addresses it knows about
+        """
+        logger.info("Peer: %s", address)
+        p2p_api = P2PApi(address, timeout=self.timeout)
+        peer_info, difficulty, next_block_ids, peers = await asyncio.gather(
+            self._call(p2p_api.get_info),
+            self._call(p2p_api.get_cumulative_difficulty),
+            self._call(p2p_api.get_next_block_ids, self.local_difficulty["previous_block_id"]),
+            self._call(p2p_api.get_peers),
+            return_exceptions=True,
+        )
+        if isinstance(peers, BaseException):
+            logger.debug("Could not get peers for %s", p2p_api.node_url)
+            peers = []
+        for result in (peer_info, difficulty):
+            if isinstance(result, BaseException):
+                raise result
+        peer_info.update(difficulty)
+
+        if int(peer_info["blockchainHeight"]) - 10 > int(self.local_difficulty["height"]):
+            logger.info("Node: %s its block to high  %s", address, peer_info["blockchainHeight"])
+            return peers
+        if int(peer_info["blockchainHeight"]) + 500000 < int(self.local_difficulty["height"]):
+            logger.info("Node: %s its block to low %s", address, peer_info["blockchainHeight"])
+            return peers
 
-    try:
-        # p2p_api = P2PApi(address)
-        # peer_info = p2p_api.get_info()
         if not is_good_version(peer_info["version"]):
             logger.debug("Old version: %s", peer_info["version"])
-            updates[address] = None
-            return
-        if not "announcedAddress" in peer_info:
-            peer_info["announcedAddress"] = address
-
-        default_port = ":" + str(settings.DEFAULT_P2P_PORT)
-        peer_info["announcedAddress"] = peer_info["announcedAddress"].replace(default_port,"")
-        peer_info.update(p2p_api.get_cumulative_difficulty())
-        peer_info["next_block_ids"] = []
-        try:
-            peer_info["next_block_ids"] = p2p_api.get_next_block_ids(local_difficulty["previous_block_id"])
-        except:
-            logger.debug("Could not get next block ids for " + p2p_api.node_url)
-    except BurstException as ex:
-        logger.debug("Can't connect to peer: %s", p2p_api.node_url)
-        updates[address] = None
-        return
+            self.updates[address] = None
+            return peers
+
+        if isinstance(next_block_ids, BaseException):
+            logger.debug("Could not get next block ids for %s", p2p_api.node_url)
+            next_block_ids = []
+
+        announced_address = self.normalize_address(peer_info.get("announcedAddress") or address)
+
+        ip = await get_ip_by_domain(address)
+        country_code = await self._call(get_country_by_ip, ip) if ip else "??"
+
+        self.updates[address] = {
+            "announced_address": announced_address,
+            "real_ip": ip,
+            "country_code": country_code,
+            "application": peer_info["application"],
+            "platform": peer_info["platform"],
+            "version": peer_info["version"],
+            "height": peer_info["blockchainHeight"],
+            "cumulative_difficulty": peer_info["cumulativeDifficulty"],
+            "last_online_at": timezone.now(),
+            "next_block_ids": next_block_ids,
+        }
+        return peers
+
+    async def _visit(self, address: str, semaphore: asyncio.Semaphore) -> list:
+        async with semaphore:
+            try:
+                return await self.explore_peer(address)
+            except BurstException:
+                logger.debug("Can't connect to peer: %s", address)
+                self.updates[address] = None
+                return []
+            except Exception:
+                # a malformed answer must not stop the scan of the other peers
+                logger.exception("Invalid response of peer: %s", address)
+                self.updates[address] = None
+                return []
+
+    async def crawl(self, addresses: list) -> dict:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        tasks = set()
+
+        def visit(address):
+            if not isinstance(address, str):
+                return
+            address = self.normalize_address(address)
+            if address and address not in self._seen:
+                self._seen.add(address)
+                tasks.add(asyncio.create_task(self._visit(address, semaphore)))
 
-    ip = get_ip_by_domain(address)
-    updates[address] = {
-        "announced_address": peer_info["announcedAddress"],
-        "real_ip": ip,
-        "country_code": get_country_by_ip(ip) if ip else "??",
-        "application": peer_info["application"],
-        "platform": peer_info["platform"],
-        "version": peer_info["version"],
-        "height": peer_info["blockchainHeight"],
-        "cumulative_difficulty": peer_info["cumulativeDifficulty"],
-        "last_online_at": timezone.now(),
-        "next_block_ids": peer_info["next_block_ids"],
-    }
+        for address in addresses:
+            visit(address)
 
+        try:
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for address in task.result():
+                        visit(address)
+        finally:
+            # requests of peers still queued are not sent anymore
+            for future in list(self._futures):
+                future.cancel()
+            self._executor.shutdown(wait=False)
 
-def explore_node(local_difficulty: dict, address: str, updates: dict):
-    logger.debug("Node: %s", address)
+        return self.updates
 
-    try:
-        peers = P2PApi(address).get_peers()
-        explore_peer(local_difficulty, address, updates)
-    except BurstException:
-        logger.debug("Can't connect to node: %s", address)
-        return
-
-    if settings.DEBUG:
-        for peer in peers:
-            explore_peer(local_difficulty, peer, updates)
-    else:
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            executor.map(lambda p: explore_peer(local_difficulty, p, updates), peers)
+    def run(self, addresses: list) -> dict:
+        return asyncio.run(self.crawl(addresses))
 
 
 def get_nodes_list() -> list:
@@ -241,8 +316,7 @@ def get_count_nodes_online() -> int:
     return PeerMonitor.objects.filter(state=PeerMonitor.State.ONLINE).count()
 
 
-# @lock_decorator(key="peer_monitor", auto_renewal=True) #locking up peers for some reason
-@transaction.atomic
+# @lock_decorator(key="peer_monitor") #locking up peers for some reason
 def peer_cmd():
     logger.info("Start the scan")
 
@@ -253,13 +327,11 @@ def peer_cmd():
     #logger.info("The list of peers:") #enable to troubleshoot peers list
     #logger.info(addresses)            #enable to troubleshoot peers list
     # explore every peer and collect updates
-    updates = {}
-    if settings.TEST_NET:
-        for address in addresses:
-            explore_node(local_difficulty, address, updates)
-    else:
-        with ThreadPoolExecutor(max_workers=20) as executor:
-            executor.map(lambda address: explore_node(local_difficulty, address, updates), addresses)
+    updates = PeerCrawler(local_difficulty).run(addresses)
+    apply_updates(local_difficulty, updates, addresses)
+
+
+def apply_updates(local_difficulty: dict, updates: dict, addresses: list):
     updates_with_data = tuple(filter(lambda x: x is not None, updates.values()))
     # if more than __% peers were gone offline in __min, probably network problem
     if len(updates_with_data) < get_count_nodes_online() * 0.8:
@@ -268,43 +340,62 @@ def peer_cmd():
         )
         return
 
-    # set all peers unreachable, if will no update - peer will be unreachable
-    PeerMonitor.objects.update(state=PeerMonitor.State.UNREACHABLE)
+    now = timezone.now()
+    peers = PeerMonitor.objects.in_bulk()
 
-    # calculate state and apply updates
+    # calculate state of the updated peers
+    scanned = {}
     for update in updates_with_data:
         logger.debug("Update: %r", update)
 
-        peer_obj = PeerMonitor.objects.filter(
-            announced_address=update["announced_address"]
-        ).first()
+        peer_obj = peers.get(update["announced_address"])
         if not peer_obj:
             logger.info("Found new peer: %s", update["announced_address"])
 
-        update["state"] = check_state(local_difficulty, update, peer_obj)
-
-        form = PeerMonitorForm(update, instance=peer_obj)
-
-        if form.is_valid():
-            form.save()
-        else:
-            logger.info("Not valid data: %r - %r", form.errors, update)
-
-    PeerMonitor.objects.update(lifetime=F("lifetime") + 1)
-
-    PeerMonitor.objects.filter(
-        state__in=[PeerMonitor.State.UNREACHABLE, PeerMonitor.State.STUCK, PeerMonitor.State.FORKED]
-    ).update(downtime=F("downtime") + 1)
-
-    PeerMonitor.objects.annotate(
-        duration=ExpressionWrapper(
-            Now() - F("last_online_at"), output_field=DurationField()
+        peer = PeerMonitor(
+            announced_address=update["announced_address"],
+            state=check_state(local_difficulty, update, peer_obj),
+            **{field: update[field] for field in PEER_UPDATE_FIELDS},
+        )
+        try:
+            peer.full_clean(validate_unique=False)
+        except ValidationError as e:
+            logger.info("Not valid data: %r - %r", e.message_dict, update)
+            continue
+
+        if peer_obj:
+            peer.downtime = peer_obj.downtime
+            peer.lifetime = peer_obj.lifetime
+        scanned[peer.announced_address] = peer
+
+    # peers without update are unreachable
+    for address, peer_obj in peers.items():
+        if address not in scanned:
+            peer_obj.state = PeerMonitor.State.UNREACHABLE
+            scanned[address] = peer_obj
+
+    expired = set()
+    for peer in scanned.values():
+        peer.lifetime += 1
+        if peer.state in (PeerMonitor.State.UNREACHABLE, PeerMonitor.State.STUCK, PeerMonitor.State.FORKED):
+            peer.downtime += 1
+        peer.availability = 100 - (peer.downtime / peer.lifetime * 100)
+        if now - peer.last_online_at >= timedelta(days=5):
+            expired.add(peer.announced_address)
+
+    db = router.db_for_write(PeerMonitor)
+    unique_fields = None
+    if connections[db].features.supports_update_conflicts_with_target:
+        unique_fields = ["announced_address"]
+
+    with transaction.atomic(using=db):
+        PeerMonitor.objects.filter(announced_address__in=expired).delete()
+        PeerMonitor.objects.bulk_create(
+            [peer for address, peer in scanned.items() if address not in expired],
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=PEER_UPDATE_FIELDS + ["state", "downtime", "lifetime", "availability", "modified_at"],
         )
-    ).filter(duration__gte=timedelta(days=5)).delete()
-
-    PeerMonitor.objects.update(
-        availability=100 - (F("downtime") / F("lifetime") * 100),
-        modified_at=timezone.now(),
-    )
 
     logger.info("Done")
@@ -1,26 +1,27 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from math import ceil
-import sys
 import gzip
 from cache_memoize import cache_memoize
 from django import template
 from django.conf import settings
 from burst.constants import MAX_BASE_TARGET, TxSubtypeBurstMining, TxSubtypeColoredCoins, TxSubtypePayment, TxType
+from burst.libs.attachments import get_tx_attachment
 from burst.libs.functions import calc_block_reward
 from burst.libs.multiout import MultiOutPack
-from burst.libs.reed_solomon import ReedSolomon
+from burst.libs.reed_solomon import ReedSolomonError, encode_id
 from burst.libs.transactions import get_message, get_message_sub, get_message_token
-from burst.api.brs.v1.api import BrsApi
+from config.env import ENV
 from config.settings import ADDRESS_PREFIX, BLOCKED_ASSETS, PHISHING_ASSETS
 from java_wallet.fields import get_desc_tx_type
 from java_wallet.models import Block, IndirectIncoming, IndirectRecipient, Trade, Transaction
 from scan.caching_data.exchange import CachingExchangeData
 from scan.caching_data.total_circulating import CachingTotalCirculating
 import struct
-import os
 from ctypes import c_ulonglong, c_longlong
 
 from scan.helpers.queries import get_account_name,get_asset_details, get_asset_price,  get_account_balance,get_account_unconfirmed_balance,get_total_circulating, query_asset_treasury_acc
+from scan.helpers.queries import get_asset_from_node
 from scan.helpers.queries import get_registered_tld_name,get_tld_reciever_id,get_subscription_recipient_id,get_subscription_alias,query_asset_fullhash
 register = template.Library()
 
@@ -66,21 +67,18 @@ def subscription_attachment(sub_id):
             return 'Quarterly Payment for Alias: '+alias_name+'.'+tld_name
     return ''
 
-@cache_memoize(240)
+# the views set these on the rows with prefetch_asset_node_data
 @register.filter
 def asset_circulating(asset_id: int) -> int:
-    asset_details = BrsApi(settings.SIGNUM_NODE).get_asset(asset_id)
-    return int(asset_details["quantityCirculatingQNT"])
+    return int(get_asset_from_node(asset_id)["quantityCirculatingQNT"])
 
 @register.filter
 def asset_owner(asset_id: int) -> int:
-    asset_details = BrsApi(settings.SIGNUM_NODE).get_asset(asset_id)
-    return int(asset_details["account"])
+    return int(get_asset_from_node(asset_id)["account"])
 
 @register.filter
 def asset_issuer(asset_id: int) -> int:
-    asset_details = BrsApi(settings.SIGNUM_NODE).get_asset(asset_id)
-    return int(asset_details["issuer"])
+    return int(get_asset_from_node(asset_id)["issuer"])
 
 @register.filter
 def burst_amount(value: int) -> float:
@@ -94,11 +92,11 @@ def cashback_amount(value: int) -> float:
 
 @register.filter
 def append_symbol(value: float) -> str:
-    return value + " " + os.environ.get("COIN_SYMBOL")
+    return value + " " + settings.COIN_SYMBOL
 
 @register.simple_tag()
 def coin_symbol() -> str:
-    return os.environ.get("COIN_SYMBOL")
+    return settings.COIN_SYMBOL
 
 @register.filter
 def split(str, key):
@@ -107,7 +105,7 @@ def split(str, key):
 
 @register.filter
 def env(key):
-    return os.environ.get(key, None)
+    return ENV.get(key)
 
 @cache_memoize(180)
 def get_exchange_data():
@@ -219,18 +217,14 @@ def tx_is_out(tx: Transaction, account_id : None) -> bool:
 
     return False
 
-def asset_offset(height : int) -> int:
-    start_block = 0
-    env_start_block = os.environ.get('DIGITAL_GOODS_STORE_BLOCK')
-    if env_start_block:
-        start_block = int(env_start_block)
-
-    offset = 1
-    if height > 0 and height < start_block:
-        offset = 0
-
-    return offset
-
+def _indirect_incoming(tx: Transaction, account_id: int) -> IndirectIncoming:
+    prefetched = getattr(tx, "indirect_incomings", {})  # see prefetch_indirect_incoming
+    if account_id in prefetched:
+        return prefetched[account_id]
+    return (IndirectIncoming.objects
+        .filter(account_id=account_id, transaction_id=tx.id)
+        .order_by("-height").first()
+    )
 
 @register.filter
 def tx_amount(tx: Transaction, filtered_account = None) -> float:
@@ -244,24 +238,18 @@ def tx_amount(tx: Transaction, filtered_account = None) -> float:
                 return burst_amount(r.amount)
 
     elif tx.attachment_bytes and tx.type == TxType.BURST_MINING and tx.subtype in [TxSubtypeBurstMining.COMMITMENT_ADD, TxSubtypeBurstMining.COMMITMENT_REMOVE]:
-        offset = asset_offset(tx.height)
-        return burst_amount(int.from_bytes(tx.attachment_bytes[offset:offset+8], byteorder=sys.byteorder))
+        return burst_amount(get_tx_attachment(tx).amount)
 
     elif tx.attachment_bytes and tx.type == TxType.COLORED_COINS:
-        offset = asset_offset(tx.height)
         if tx.subtype == TxSubtypeColoredCoins.ASSET_TRANSFER:
             return burst_amount(tx.amount)
 
         elif tx.subtype in [TxSubtypeColoredCoins.ASK_ORDER_PLACEMENT, TxSubtypeColoredCoins.BID_ORDER_PLACEMENT]:
-            quantity = int.from_bytes(tx.attachment_bytes[offset+8:offset+16], byteorder=sys.byteorder)
-            price = int.from_bytes(tx.attachment_bytes[offset+16:offset+24], byteorder=sys.byteorder)
-            return burst_amount(quantity*price)
+            attachment = get_tx_attachment(tx)
+            return burst_amount(attachment.quantity*attachment.price)
 
         elif tx.subtype == TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS and account_id:
-            indirect = (IndirectIncoming.objects.using("java_wallet")
-                .filter(account_id=account_id, transaction_id=tx.id)
-                .order_by("-height").first()
-            )
+            indirect = _indirect_incoming(tx, account_id)
             if indirect:
                 return burst_amount(indirect.amount)
 
@@ -270,78 +258,75 @@ def tx_amount(tx: Transaction, filtered_account = None) -> float:
 @register.filter
 def tx_quantity(tx: Transaction, filtered_account = None) -> float:
     account_id = filtered_account
-    offset = asset_offset(tx.height)
+    attachment = get_tx_attachment(tx)
     if account_id and type(account_id) is str:
         account_id = int(account_id)
     if account_id and tx.sender_id==account_id and tx.subtype == TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS:
-        asset_id = int.from_bytes(tx.attachment_bytes[offset+16:offset+24], byteorder=sys.byteorder)
-        name, decimals, total_quantity, mintable = get_asset_details(asset_id)
-        quantity = int.from_bytes(tx.attachment_bytes[offset+24:offset+32], byteorder=sys.byteorder)
-        return div_decimals(quantity, decimals)
+        name, decimals, total_quantity, mintable = get_asset_details(attachment.distributed_asset_id)
+        return div_decimals(attachment.distributed_quantity, decimals)
     elif tx.subtype == TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS and account_id:
-        asset_id = int.from_bytes(tx.attachment_bytes[offset+16:offset+24], byteorder=sys.byteorder)
-        name, decimals, total_quantity, mintable = get_asset_details(asset_id)
-        indirect = (IndirectIncoming.objects.using("java_wallet")
-                .filter(account_id=account_id, transaction_id=tx.id)
-                .order_by("-height").first()
-        )
+        name, decimals, total_quantity, mintable = get_asset_details(attachment.distributed_asset_id)
+        indirect = _indirect_incoming(tx, account_id)
         if indirect and indirect.quantity:
             return div_decimals(indirect.quantity,decimals)
     elif tx.subtype == TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS and not account_id:
         # Only checking if a token gets distributed for the sender (no filter_account)
         # needs ony quantity
-        asset_id = int.from_bytes(tx.attachment_bytes[offset+16:offset+24], byteorder=sys.byteorder)
-        if not asset_id:
+        if not attachment.distributed_asset_id:
             return 0
         else:
-            quantity = int.from_bytes(tx.attachment_bytes[offset+24:offset+32], byteorder=sys.byteorder)
-            return div_decimals(quantity,decimals)
+            name, decimals, total_quantity, mintable = get_asset_details(attachment.distributed_asset_id)
+            return div_decimals(attachment.distributed_quantity,decimals)
     elif tx.attachment_bytes and tx.type == TxType.COLORED_COINS:
-        asset_id = int.from_bytes(tx.attachment_bytes[offset:offset+8], byteorder=sys.byteorder)
         try:
-            name, decimals, total_quantity, mintable = get_asset_details(asset_id)
+            name, decimals, total_quantity, mintable = get_asset_details(attachment.asset_id)
         except:
             decimals = 1
-        quantity = int.from_bytes(tx.attachment_bytes[offset+8:offset+16], byteorder=sys.byteorder)
-        return div_decimals(quantity, decimals)
+        return div_decimals(attachment.quantity, decimals)
     else:
         return 0.0
     return 0.0
 
+def _multi_transfer(tx: Transaction, asset_number: int) -> (int, int):
+    if tx.attachment_bytes and tx.type == TxType.COLORED_COINS:
+        try:
+            return get_tx_attachment(tx).multi_transfers[asset_number-1]
+        except IndexError:
+            return 0, 0
+    return None
+
 @register.filter
 def tx_quantity_multi(tx: Transaction, asset_number = 0) -> float:
-    asset_offset=[2,18,34,50]
-    qunatity_offset= [10,26,42,58]
-    asset_id_offset = asset_offset[asset_number-1]
-    asset_quantity_offset =qunatity_offset[asset_number-1]
-    asset_id_offset2 =   asset_id_offset + 8
-    asset_quantity_offset2 = asset_quantity_offset + 8
-    if tx.attachment_bytes and tx.type == TxType.COLORED_COINS:
-        asset_id = int.from_bytes(tx.attachment_bytes[asset_id_offset:asset_id_offset2], byteorder=sys.byteorder)
+    transfer = _multi_transfer(tx, asset_number)
+    if transfer:
+        asset_id, quantity = transfer
         name, decimals, total_quantity, mintable = get_asset_details(asset_id)
-        quantity = int.from_bytes(tx.attachment_bytes[asset_quantity_offset:asset_quantity_offset2], byteorder=sys.byteorder)
         return div_decimals(quantity, decimals)
     else:
         return 0.0
 
 @register.filter
 def tx_asset_multi_size(tx: Transaction) -> float:
-    offset = asset_offset(tx.height)
     if tx.attachment_bytes and tx.type == TxType.COLORED_COINS:
-        asset_size= (int.from_bytes(tx.attachment_bytes[offset:offset+1], byteorder=sys.byteorder))
-        return asset_size
+        return get_tx_attachment(tx).multi_size
     else:
         return 0.0
 
 
+def _asset_symbol(asset_id: int) -> str:
+    name, decimals, total_quantity, mintable = get_asset_details(asset_id)
+    check_name = name.upper()
+    if check_name in BLOCKED_ASSETS or check_name in PHISHING_ASSETS:
+        return str(asset_id)[0:10]
+    return name
+
 
 @register.filter
 def tx_symbol(tx: Transaction) -> str:
     if tx.type == TxType.COLORED_COINS and tx.attachment_bytes:
-        offset = asset_offset(tx.height)
         if tx.subtype in ([TxSubtypeColoredCoins.ASSET_TRANSFER,TxSubtypeColoredCoins.ASSET_MINT,
             TxSubtypeColoredCoins.ASK_ORDER_PLACEMENT, TxSubtypeColoredCoins.BID_ORDER_PLACEMENT]):
-            asset_id = int.from_bytes(tx.attachment_bytes[offset:offset+8], byteorder=sys.byteorder)
+            asset_id = get_tx_attachment(tx).asset_id
             try:
                 name, decimals, total_quantity, mintable = get_asset_details(asset_id)
             except:
@@ -355,56 +340,28 @@ def tx_symbol(tx: Transaction) -> str:
 
 @register.filter
 def tx_symbol_multi(tx: Transaction,asset_number = 1) -> str:
-    asset_offset=[2,18,34,50]
-    asset_id_offset = asset_offset[asset_number-1]
-    asset_id_offset2 =   asset_id_offset + 8
-    if tx.type == TxType.COLORED_COINS and tx.attachment_bytes:
-        asset_id = int.from_bytes(tx.attachment_bytes[asset_id_offset:asset_id_offset2], byteorder=sys.byteorder)
-        name, decimals, total_quantity, mintable = get_asset_details(asset_id)
-        check_name = name.upper()
-        if check_name in BLOCKED_ASSETS or check_name in PHISHING_ASSETS:
-            return str(asset_id)[0:10]
-        return name
+    transfer = _multi_transfer(tx, asset_number)
+    if transfer:
+        return _asset_symbol(transfer[0])
+
 @register.filter
 def tx_assetid_multi(tx: Transaction,asset_number = 1) -> str:
-    asset_offset=[2,18,34,50]
-    asset_id_offset = asset_offset[asset_number-1]
-    asset_id_offset2 =   asset_id_offset + 8
-    if tx.type == TxType.COLORED_COINS and tx.attachment_bytes:
-        asset_id = int.from_bytes(tx.attachment_bytes[asset_id_offset:asset_id_offset2], byteorder=sys.byteorder)
-        return asset_id
+    transfer = _multi_transfer(tx, asset_number)
+    if transfer:
+        return transfer[0]
 
 @register.filter
 def tx_symbol_distribution(tx: Transaction) -> str:
     if tx.type == TxType.COLORED_COINS and tx.attachment_bytes:
-        offset = asset_offset(tx.height)
-        if tx.subtype  == TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS:
-            asset_id = int.from_bytes(tx.attachment_bytes[offset+16:offset+24], byteorder=sys.byteorder)
-            name, decimals, total_quantity, mintable = get_asset_details(asset_id)
-            check_name = name.upper()
-            if check_name in BLOCKED_ASSETS or check_name in PHISHING_ASSETS:
-                return str(asset_id)[0:10]
-            return name
-        elif tx.subtype == TxSubtypeColoredCoins.ASSET_MINT:
-            asset_id = int.from_bytes(tx.attachment_bytes[offset+16:offset+24], byteorder=sys.byteorder)
-            name, decimals, total_quantity, mintable = get_asset_details(asset_id)
-            check_name = name.upper()
-            if check_name in BLOCKED_ASSETS or check_name in PHISHING_ASSETS:
-                return str(asset_id)[0:10]
-            return name
+        if tx.subtype in [TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS, TxSubtypeColoredCoins.ASSET_MINT]:
+            return _asset_symbol(get_tx_attachment(tx).distributed_asset_id)
     return ''
 
 @register.filter
 def tx_asset_holder(tx: Transaction) -> str:
     if tx.type == TxType.COLORED_COINS and tx.attachment_bytes:
-        offset = asset_offset(tx.height)
         if tx.subtype  == TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS:
-            asset_id = int.from_bytes(tx.attachment_bytes[offset:offset+8], byteorder=sys.byteorder)
-            name, decimals, total_quantity, mintable = get_asset_details(asset_id)
-            check_name = name.upper()
-            if check_name in BLOCKED_ASSETS or check_name in PHISHING_ASSETS:
-                return str(asset_id)[0:10]
-            return name
+            return _asset_symbol(get_tx_attachment(tx).asset_id)
 
     return ''
 
@@ -412,11 +369,9 @@ def tx_asset_holder(tx: Transaction) -> str:
 @register.filter
 def tx_asset_id(tx: Transaction) -> int:
     if tx.type == TxType.COLORED_COINS and tx.attachment_bytes:
-        offset = asset_offset(tx.height)
         if tx.subtype in ([TxSubtypeColoredCoins.ASSET_TRANSFER,
             TxSubtypeColoredCoins.ASK_ORDER_PLACEMENT, TxSubtypeColoredCoins.BID_ORDER_PLACEMENT,TxSubtypeColoredCoins.ASSET_MINT]):
-            asset_id = int.from_bytes(tx.attachment_bytes[offset:offset+8], byteorder=sys.byteorder)
-            return asset_id
+            return get_tx_attachment(tx).asset_id
 
     return 0
 
@@ -465,6 +420,8 @@ def is_asset_phishing(asset) -> bool:
 def is_asset_treasury(asset, account_id) -> bool:
     if not account_id:
         return False
+    if getattr(asset, "is_treasury", None) is not None and asset.account_id == account_id:
+        return asset.is_treasury  # see prefetch_asset_treasury
     #use fullhash from asset
     fullh = query_asset_fullhash(asset)
     resultt= query_asset_treasury_acc(asset, c_longlong(account_id).value)
@@ -508,9 +465,16 @@ def tx_load_recipients(tx: Transaction) -> Transaction:
             tx.recipients = recipients
     return tx
 
+@lru_cache(maxsize=65536)
+def _num2rs(value: int) -> str:
+    return ADDRESS_PREFIX + encode_id(value)
+
 @register.filter
 def num2rs(value: str or int) -> str:
-    return ADDRESS_PREFIX + ReedSolomon().encode(str(value))
+    try:
+        return _num2rs(int(value))
+    except (TypeError, ValueError, ReedSolomonError):
+        return str(value)
 
 @register.filter
 def subNextsend(value):
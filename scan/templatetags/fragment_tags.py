@@ -0,0 +1,102 @@
+import re
+import secrets
+
+from django import template
+
+from scan.helpers.fragments import fragment_key, get_fragment, is_settled, set_fragment
+
+register = template.Library()
+
+
+class FragmentNode(template.Node):
+    def __init__(self, nodelist, template_name, name, height, vary_on):
+        self.nodelist = nodelist
+        self.template_name = template_name
+        self.name = name
+        self.height = height
+        self.vary_on = vary_on
+        self.volatiles = nodelist.get_nodes_by_type(VolatileNode)
+
+    def render(self, context):
+        height = self.height.resolve(context)
+        if not is_settled(height):
+            return self.nodelist.render(context)
+
+        key = fragment_key(self.template_name, self.name, *(v.resolve(context) for v in self.vary_on))
+        parts = get_fragment(key)
+        if not isinstance(parts, list):
+            parts = self.render_parts(context)
+            set_fragment(key, parts)
+        return "".join(
+            part if isinstance(part, str) else self.volatiles[part].nodelist.render(context)
+            for part in parts
+        )
+
+    def render_parts(self, context) -> list:
+        """ The content split into static HTML and the indexes of the volatile
+            parts in between. The markers left by the volatile parts carry a
+            token of this render only, user content cannot fake them.
+        """
+        token = secrets.token_hex(16)
+        context.render_context["volatile_fragment"] = (self, token)
+        try:
+            html = self.nodelist.render(context)
+        finally:
+            del context.render_context["volatile_fragment"]
+        parts = re.split(f"\x00{token}:(\\d+)\x00", html)
+        # odd positions hold the captured indexes
+        return [int(part) if i % 2 else part for i, part in enumerate(parts)]
+
+
+class VolatileNode(template.Node):
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        fragment = context.render_context.get("volatile_fragment")
+        if fragment is None:
+            return self.nodelist.render(context)
+        node, token = fragment
+        return f"\x00{token}:{node.volatiles.index(self)}\x00"
+
+
+@register.tag
+def fragment(parser, token):
+    """
+    Cache the rendered content of an object that can no longer be rolled back.
+
+    {% fragment "tx_row" tx.height tx.id filtered_account %}
+      ... {% volatile %}{{ tx.block_timestamp|naturaltime }}{% endvolatile %} ...
+    {% endfragment %}
+
+    The content is rendered as usual while the object at the given height is
+    within the reorg window. Past it, the content is cached by the fragment
+    name, the remaining arguments (object id and whatever else the content
+    depends on) and a hash of this template's source, so edits to the
+    template take effect immediately.
+
+    ``volatile`` parts (relative times, prices, confirmations) are rendered
+    on every request, with the context of the fragment. They must be written
+    directly in the template of the fragment, not in an included one, and not
+    inside a loop of the fragment.
+    """
+    bits = token.split_contents()
+    if len(bits) < 4:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a name, a height and at least one argument to vary on")
+    nodelist = parser.parse(("endfragment",))
+    parser.delete_first_token()
+    return FragmentNode(
+        nodelist,
+        parser.origin.template_name,
+        template.Variable(bits[1]).resolve({}),
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
+
+
+@register.tag
+def volatile(parser, token):
+    """ Part of a ``fragment`` rendered on every request """
+    nodelist = parser.parse(("endvolatile",))
+    parser.delete_first_token()
+    return VolatileNode(nodelist)
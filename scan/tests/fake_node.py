@@ -0,0 +1,236 @@
+""" Stand-in for a network of Signum nodes, served by one local HTTP server,
+for the tests and benchmarks/peer_crawl.py.
+
+Every peer has its own loopback address (127.0.1.1, 127.0.1.2, ...) on the
+same port: POST requests get the P2P API, GET requests the node API
+(/burst?requestType=...). Peers can be slow, fail, be forked or lag behind.
+
+    with FakeNetwork(peers=100, latency=0.05, failure_rate=0.1) as network:
+        network.addresses           # "127.0.1.1:<port>", ...
+        network.api_url             # node API of the first peer
+"""
+
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+GENESIS_ID = 3444294670862540038
+
+
+@dataclass
+class FakePeer:
+    address: str
+    height: int
+    latency: float = 0
+    failure_rate: float = 0
+    forked: bool = False
+    version: str = "v3.7.2"
+    peers: list = field(default_factory=list)
+
+
+def block_id(height: int, forked: bool = False) -> str:
+    return str((GENESIS_ID + height * 7919 + (1 if forked else 0)) % 2 ** 64)
+
+
+def cumulative_difficulty(height: int, forked: bool = False) -> str:
+    return str(height * 1000 + (1 if forked else 0))
+
+
+class FakeNetwork:
+    def __init__(
+        self,
+        peers: int = 10,
+        height: int = 1000000,
+        latency: float = 0,
+        failure_rate: float = 0,
+        fork_rate: float = 0,
+        lag: int = 0,
+        peers_per_peer: int = 20,
+        mempool: int = 100,
+        seed: int = 0,
+    ) -> None:
+        """
+        :param peers: number of peers
+        :param height: height of the chain tip
+        :param latency: seconds every request of a peer takes
+        :param failure_rate: share of requests answered with a 503
+        :param fork_rate: share of peers on another fork
+        :param lag: peers are up to ``lag`` blocks behind the tip
+        :param peers_per_peer: addresses every peer announces
+        :param mempool: unconfirmed transactions of the node API
+        """
+        self.height = height
+        self.failure_rate = failure_rate
+        self.mempool_size = mempool
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("", 0), self._handler_class())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+
+        self.peers = {}
+        for i in range(peers):
+            address = f"127.0.1.{i + 1}" if i < 254 else f"127.0.{2 + i // 254}.{i % 254 + 1}"
+            self.peers[address] = FakePeer(
+                address=address,
+                height=height - self._random.randint(0, lag),
+                latency=latency,
+                failure_rate=failure_rate,
+                forked=self._random.random() < fork_rate,
+            )
+        hosts = list(self.peers)
+        for peer in self.peers.values():
+            peer.peers = [
+                f"{host}:{self.port}" for host in self._random.sample(hosts, min(peers_per_peer, len(hosts)))
+            ]
+        self.requests = 0
+
+    @property
+    def addresses(self) -> list:
+        return [f"{host}:{self.port}" for host in self.peers]
+
+    @property
+    def api_url(self) -> str:
+        return self.addresses[0]
+
+    def local_difficulty(self) -> dict:
+        """ What ``get_local_difficulty`` returns for the tip of the network """
+        return {
+            "height": self.height - 1,
+            "id": int(block_id(self.height - 1)),
+            "cumulative_difficulty": cumulative_difficulty(self.height - 1),
+            "previous_block_id": int(block_id(self.height - 2)),
+        }
+
+    def start(self) -> "FakeNetwork":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "FakeNetwork":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _fails(self, peer: FakePeer) -> bool:
+        with self._lock:
+            self.requests += 1
+            return self._random.random() < peer.failure_rate
+
+    def p2p(self, peer: FakePeer, request: dict) -> dict:
+        request_type = request.get("requestType")
+        if request_type == "getInfo":
+            return {
+                "announcedAddress": f"{peer.address}:{self.port}",
+                "application": "BRS",
+                "version": peer.version,
+                "platform": "PC",
+                "shareAddress": True,
+            }
+        if request_type == "getCumulativeDifficulty":
+            return {
+                "cumulativeDifficulty": cumulative_difficulty(peer.height, peer.forked),
+                "blockchainHeight": peer.height,
+            }
+        if request_type == "getNextBlockIds":
+            start = self.height - 2
+            return {
+                "nextBlockIds": [
+                    block_id(height, peer.forked and height >= self.height - 1)
+                    for height in range(start + 1, min(start + 101, peer.height + 1))
+                ]
+            }
+        if request_type == "getPeers":
+            return {"peers": peer.peers}
+        return {"error": f"Unsupported request type {request_type}"}
+
+    def api(self, peer: FakePeer, request: dict) -> dict:
+        request_type = request.get("requestType")
+        if request_type == "getUnconfirmedTransactions":
+            return {
+                "unconfirmedTransactions": [self.transaction(i) for i in range(self.mempool_size)],
+                "requestProcessingTime": 0,
+            }
+        if request_type == "getBlockchainStatus":
+            return {
+                "application": "BRS",
+                "version": peer.version,
+                "time": 0,
+                "lastBlock": block_id(peer.height, peer.forked),
+                "cumulativeDifficulty": cumulative_difficulty(peer.height, peer.forked),
+                "numberOfBlocks": peer.height + 1,
+                "lastBlockchainFeeder": peer.address,
+                "lastBlockchainFeederHeight": peer.height,
+                "isScanning": False,
+                "requestProcessingTime": 0,
+            }
+        return {"errorCode": 1, "errorDescription": f"Incorrect request {request_type}"}
+
+    def transaction(self, i: int) -> dict:
+        return {
+            "type": 0,
+            "subtype": 0,
+            "timestamp": 154715780 + i,
+            "deadline": 1440,
+            "senderPublicKey": "447db598ab0b8b128516b3a70b9d87ea4cdb460fb4c550167cbfceda865fb03d",
+            "sender": str(1000 + i),
+            "recipient": "13493329130306648054",
+            "amountNQT": str(10000000 + i),
+            "feeNQT": str(735000 + i),
+            "ecBlockHeight": self.height - 10,
+            "ecBlockId": block_id(self.height - 10),
+            "signature": "9de1f780425b7bc95d63982196ab3349dcfb4fb1297a1ab88db411693eb14b02",
+            "fullHash": f"{i:064x}",
+            "transaction": str(2 ** 63 + i),
+            "attachment": {},
+            "version": 1,
+            "height": 2 ** 31 - 1,
+        }
+
+    def _handler_class(self):
+        network = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, handle, request):
+                peer = network.peers.get(self.connection.getsockname()[0])
+                if peer is None:
+                    self.send_error(404)
+                    return
+                if peer.latency:
+                    time.sleep(peer.latency)
+                if network._fails(peer):
+                    self.send_error(503)
+                    return
+                body = json.dumps(handle(peer, request)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                self._respond(network.api, {key: values[-1] for key, values in query.items()})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    request = {}
+                self._respond(network.p2p, request)
+
+        return Handler
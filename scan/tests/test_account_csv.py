@@ -0,0 +1,46 @@
+from datetime import datetime
+from unittest import mock
+
+from django.test import TestCase
+
+from java_wallet.models import Block, IndirectIncoming, Transaction
+from scan.helpers.tests.test_prefetch import create_tx
+from scan.views.transactions import iter_account_txs
+
+
+@mock.patch("scan.views.transactions.is_index_ready", return_value=False)
+@mock.patch("scan.views.transactions.CSV_CHUNK_SIZE", 2)
+class AccountTxsFallbackTest(TestCase):
+    databases = {"default", "java_wallet"}
+
+    def setUp(self):
+        Block.objects.using("java_wallet").create(
+            id=1,
+            timestamp=datetime(2023, 1, 1),
+            total_amount=0,
+            total_fee=0,
+            payload_length=0,
+            generator_public_key=b"",
+            cumulative_difficulty=b"",
+            base_target=0,
+            height=1,
+            generation_signature=b"",
+            block_signature=b"",
+            payload_hash=b"",
+            generator_id=1,
+            nonce=0,
+        )
+        create_tx(1, sender_id=7)
+        create_tx(2, sender_id=8, recipient_id=7)
+        create_tx(3, sender_id=8, recipient_id=9)
+        create_tx(4, sender_id=8)
+        create_tx(5, sender_id=7)
+        create_tx(6, sender_id=9, recipient_id=7)
+        # two transactions per height
+        for tx_id in range(1, 7):
+            Transaction.objects.using("java_wallet").filter(id=tx_id).update(height=(tx_id + 1) // 2)
+        IndirectIncoming.objects.using("java_wallet").create(account_id=7, transaction_id=3, height=2)
+
+    def test_keyset_chunks(self, _):
+        chunks = [[tx.id for tx in chunk] for chunk in iter_account_txs(7)]
+        self.assertEqual(chunks, [[6, 5], [3, 2], [1]])
@@ -0,0 +1,48 @@
+from django.core.paginator import InvalidPage
+from django.test import TestCase
+
+from scan.cursor_paginator import CursorPaginator
+from scan.models import AccountActivity
+
+
+class CursorPaginatorTest(TestCase):
+    def setUp(self) -> None:
+        # three transactions per height
+        AccountActivity.objects.bulk_create(
+            AccountActivity(account_id=1, height=i // 3, tx_id=i, direction=AccountActivity.Direction.IN)
+            for i in range(10)
+        )
+        self.paginator = CursorPaginator(
+            AccountActivity.objects.all(), 4, fields=("height", "tx_id")
+        )
+
+    @staticmethod
+    def tx_ids(page):
+        return [activity.tx_id for activity in page]
+
+    def test_walk_forward_and_back(self):
+        first = self.paginator.cursor_page()
+        self.assertEqual(self.tx_ids(first), [9, 8, 7, 6])
+        self.assertFalse(first.has_previous())
+        self.assertEqual(first.next_cursor, "2_6")
+
+        second = self.paginator.cursor_page(after=first.next_cursor)
+        self.assertEqual(self.tx_ids(second), [5, 4, 3, 2])
+
+        last = self.paginator.cursor_page(after=second.next_cursor)
+        self.assertEqual(self.tx_ids(last), [1, 0])
+        self.assertFalse(last.has_next())
+
+        back = self.paginator.cursor_page(before=last.previous_cursor)
+        self.assertEqual(self.tx_ids(back), [5, 4, 3, 2])
+        self.assertTrue(back.has_previous())
+        self.assertTrue(back.has_next())
+
+        self.assertEqual(self.tx_ids(self.paginator.cursor_page(before=back.previous_cursor)), [9, 8, 7, 6])
+        self.assertFalse(self.paginator.cursor_page(before=back.previous_cursor).has_previous())
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidPage):
+            self.paginator.cursor_page(after="abc")
+        with self.assertRaises(InvalidPage):
+            self.paginator.cursor_page(after="1")
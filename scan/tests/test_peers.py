@@ -0,0 +1,212 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from burst.api.exceptions import APIException
+from scan.models import PeerMonitor
+from scan.peers import PeerCrawler, apply_updates, check_state
+from scan.tests.fake_node import FakeNetwork, cumulative_difficulty
+
+NETWORK = {
+    "10.0.0.1": ["10.0.0.2", "10.0.0.3:8123", "10.0.0.4"],
+    "10.0.0.2": ["10.0.0.1", "10.0.0.3"],
+    "10.0.0.3": ["10.0.0.5"],
+    "10.0.0.5": [],
+}
+
+
+class FakeP2PApi:
+    calls = []
+
+    def __init__(self, address, timeout=None):
+        self.address = address
+        self.node_url = f"http://{address}"
+        self.timeout = timeout
+
+    def _connect(self, request):
+        self.calls.append((self.address, request))
+        if self.address not in NETWORK:
+            raise APIException("network")
+
+    def get_info(self):
+        self._connect("getInfo")
+        return {"application": "BRS", "version": "v3.7.0", "platform": "PC", "shareAddress": True}
+
+    def get_cumulative_difficulty(self):
+        self._connect("getCumulativeDifficulty")
+        return {"cumulativeDifficulty": "100", "blockchainHeight": 1000}
+
+    def get_next_block_ids(self, block_id):
+        self._connect("getNextBlockIds")
+        return []
+
+    def get_peers(self):
+        self._connect("getPeers")
+        return NETWORK[self.address]
+
+
+@override_settings(MIN_PEER_VERSION="3.6.0", DEFAULT_P2P_PORT=8123)
+@mock.patch("scan.peers.get_country_by_ip", return_value="??")
+@mock.patch("scan.peers.P2PApi", FakeP2PApi)
+class PeerCrawlerTest(SimpleTestCase):
+    local_difficulty = {"height": 1000, "id": 1, "previous_block_id": 2}
+
+    def setUp(self) -> None:
+        FakeP2PApi.calls = []
+
+    def test_crawl(self, _):
+        updates = PeerCrawler(self.local_difficulty, concurrency=2, timeout=5).run(["10.0.0.1", "10.0.0.1:8123"])
+
+        self.assertEqual(set(updates), {"10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4", "10.0.0.5"})
+        self.assertIsNone(updates["10.0.0.4"])
+        self.assertEqual(updates["10.0.0.5"]["announced_address"], "10.0.0.5")
+        self.assertEqual(updates["10.0.0.5"]["real_ip"], "10.0.0.5")
+
+        # every address is explored once
+        requests = [call for call in FakeP2PApi.calls if call[1] == "getInfo"]
+        self.assertEqual(len(requests), len(set(requests)))
+
+    def test_timeout(self, _):
+        # a blocking request is only stopped by its own timeout
+        def slow_info(api):
+            time.sleep(api.timeout)
+            raise APIException("network")
+
+        with mock.patch.object(FakeP2PApi, "get_info", slow_info):
+            updates = PeerCrawler(self.local_difficulty, timeout=0.1).run(["10.0.0.5"])
+        self.assertEqual(updates, {"10.0.0.5": None})
+
+    def test_threads_bounded(self, _):
+        running = []
+        peak = []
+        lock = threading.Lock()
+        valid_info = FakeP2PApi.get_info
+
+        def get_info(api):
+            with lock:
+                running.append(api.address)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(api.address)
+            return valid_info(api)
+
+        with mock.patch.object(FakeP2PApi, "get_info", get_info):
+            PeerCrawler(self.local_difficulty, concurrency=2, timeout=5).run(list(NETWORK))
+        self.assertLessEqual(max(peak), 2)
+        self.assertEqual(len(peak), len(NETWORK) + 1)
+
+    def test_garbage_peer(self, _):
+        valid_info = FakeP2PApi.get_info
+
+        def get_info(api):
+            if api.address == "10.0.0.1":
+                return ["garbage"]
+            return valid_info(api)
+
+        def get_peers(api):
+            if api.address == "10.0.0.2":
+                return [None, 42, {"address": "10.0.0.3"}, "10.0.0.5"]
+            return NETWORK[api.address]
+
+        with mock.patch.object(FakeP2PApi, "get_info", get_info), \
+                mock.patch.object(FakeP2PApi, "get_peers", get_peers):
+            updates = PeerCrawler(self.local_difficulty, timeout=5).run(["10.0.0.1", "10.0.0.2"])
+
+        self.assertEqual(set(updates), {"10.0.0.1", "10.0.0.2", "10.0.0.5"})
+        self.assertIsNone(updates["10.0.0.1"])
+        self.assertIsNotNone(updates["10.0.0.5"])
+
+
+@override_settings(MIN_PEER_VERSION="3.6.0")
+@mock.patch("scan.peers.get_country_by_ip", return_value="??")
+class FakeNetworkCrawlTest(SimpleTestCase):
+    """ The crawler against nodes speaking HTTP, see scan/tests/fake_node.py """
+
+    def test_crawl(self, _):
+        with FakeNetwork(peers=12, fork_rate=0.3, lag=2, seed=1) as network:
+            unreachable = network.addresses[-1]
+            network.peers[unreachable.split(":")[0]].failure_rate = 1
+            local_difficulty = network.local_difficulty()
+            updates = PeerCrawler(local_difficulty, concurrency=4, timeout=5).run(network.addresses[:1])
+
+            self.assertEqual(set(updates), set(network.addresses))
+            self.assertIsNone(updates.pop(unreachable))
+            states = set()
+            with mock.patch("scan.peers.get_block_cumulative_difficulty", cumulative_difficulty):
+                for address, update in updates.items():
+                    if update:
+                        self.assertEqual(update["announced_address"], address)
+                        states.add(check_state(local_difficulty, update, None))
+            self.assertIn(PeerMonitor.State.FORKED, states)
+            self.assertIn(PeerMonitor.State.ONLINE, states)
+
+
+def peer_update(address, **kwargs):
+    return {
+        "announced_address": address,
+        "real_ip": address,
+        "country_code": "??",
+        "application": "BRS",
+        "platform": "PC",
+        "version": "v3.7.0",
+        "height": 1000,
+        "cumulative_difficulty": "100",
+        "last_online_at": timezone.now(),
+        "next_block_ids": [],
+        **kwargs,
+    }
+
+
+@mock.patch("scan.peers.get_block_cumulative_difficulty", return_value="100")
+class ApplyUpdatesTest(TestCase):
+    local_difficulty = {"height": 1000, "id": 1, "previous_block_id": 2}
+
+    def setUp(self) -> None:
+        for address, last_online_at in [
+            ("10.0.0.1", timezone.now()),
+            ("10.0.0.2", timezone.now()),
+            ("10.0.0.3", timezone.now() - timedelta(days=6)),
+        ]:
+            update = peer_update(address, last_online_at=last_online_at, height=900)
+            del update["next_block_ids"]
+            PeerMonitor.objects.create(
+                **update,
+                state=PeerMonitor.State.ONLINE,
+                downtime=1,
+                lifetime=3,
+                reward_state="Active",
+            )
+
+    def test_apply_updates(self, _):
+        updates = {
+            "10.0.0.1": peer_update("10.0.0.1"),
+            "10.0.0.4": peer_update("10.0.0.4"),
+            "10.0.0.5": peer_update("10.0.0.5", country_code="too long"),
+            "10.0.0.6": None,
+        }
+        with self.assertNumQueries(6):
+            apply_updates(self.local_difficulty, updates, list(updates))
+
+        peers = PeerMonitor.objects.in_bulk()
+        self.assertEqual(set(peers), {"10.0.0.1", "10.0.0.2", "10.0.0.4"})
+
+        self.assertEqual(peers["10.0.0.1"].state, PeerMonitor.State.SYNC)
+        self.assertEqual(peers["10.0.0.1"].height, 1000)
+        self.assertEqual((peers["10.0.0.1"].downtime, peers["10.0.0.1"].lifetime), (1, 4))
+        self.assertEqual(peers["10.0.0.1"].availability, 75)
+        self.assertEqual(peers["10.0.0.1"].reward_state, "Active")
+
+        self.assertEqual(peers["10.0.0.2"].state, PeerMonitor.State.UNREACHABLE)
+        self.assertEqual((peers["10.0.0.2"].downtime, peers["10.0.0.2"].lifetime), (2, 4))
+
+        self.assertEqual((peers["10.0.0.4"].downtime, peers["10.0.0.4"].lifetime), (0, 1))
+        self.assertEqual(peers["10.0.0.4"].availability, 100)
+
+    def test_rejected(self, _):
+        apply_updates(self.local_difficulty, {"10.0.0.1": None}, ["10.0.0.1"])
+        self.assertEqual(PeerMonitor.objects.filter(state=PeerMonitor.State.ONLINE).count(), 3)
@@ -21,16 +21,28 @@ from java_wallet.models import (
 from scan.caching_paginator import CachingPaginator
 from scan.helpers.queries import (
     get_account_name,
+    get_account_names,
     get_asset_details_owner,
+    get_block_pool_ids,
+    get_index_counter,
+    is_index_ready,
     get_pool_id_for_account,
-    get_pool_id_for_block,
     get_total_accounts_count,
     get_total_circulating,
+    get_transactions_in_order,
     check_is_contract,
 )
-from scan.views.assets import fill_data_asset_trade, fill_data_asset_transfer
+from scan.helpers.prefetch import (
+    prefetch_aliases,
+    prefetch_holdings,
+    prefetch_indirect_incoming,
+    prefetch_subscriptions,
+)
+from scan.indexer.account_activity import AccountActivityIndexer
+from scan.models import AccountActivity, IndexCounter
+from scan.views.assets import fill_data_asset_trades, fill_data_asset_transfers
 from scan.views.base import IntSlugDetailView
-from scan.views.transactions import fill_data_transaction
+from scan.views.transactions import fill_data_transactions
 from scan.templatetags.burst_tags import cashback_amount
 
 class AccountsListView(ListView):
@@ -44,7 +56,7 @@ class AccountsListView(ListView):
     def get_queryset(self):
         qs = cache.get('top_accounts')
         if not qs:
-            qs = AccountBalance.objects.using("java_wallet").filter(latest=True, balance__gte=10000000000000).exclude(id=0).order_by('-balance').all()[:1000]
+            qs = AccountBalance.objects.filter(latest=True, balance__gte=10000000000000).exclude(id=0).order_by('-balance').all()[:1000]
             cache.set('top_accounts', qs, 86400)  # Cache for 24 hours
         return qs
 
@@ -57,7 +69,7 @@ class AccountsListView(ListView):
 
 class AddressDetailView(IntSlugDetailView):
     model = Account
-    queryset = Account.objects.using("java_wallet").filter(latest=True).all()
+    queryset = Account.objects.filter(latest=True).all()
     template_name = "accounts/detail.html"
     context_object_name = "address"
     slug_field = "id"
@@ -75,21 +87,29 @@ class AddressDetailView(IntSlugDetailView):
         obj.is_contract = check_is_contract(obj.id)
 
         # transactions
-        indirects_query = (
-            IndirectIncoming.objects.using("java_wallet")
-            .values_list('transaction_id', flat=True)
-            .filter(account_id=obj.id)
-        )
-        indirects_count = indirects_query.count()
-        ids_sender = Transaction.objects.using("java_wallet").filter(sender_id=obj.id).values_list("id", flat=True)
-        ids_recipient = Transaction.objects.using("java_wallet").filter(recipient_id=obj.id).values_list("id", flat=True)
-        ids_indirect = indirects_query
-        all_ids = set(ids_sender).union(ids_recipient).union(ids_indirect)
-        txs_cnt =len(all_ids)
-        txs = Transaction.objects.using("java_wallet").filter(id__in=all_ids).order_by("-height")[:min(txs_cnt, 15)]
+        txs_cnt = get_index_counter(IndexCounter.Kind.ACCOUNT_TXS, obj.id)
+        if txs_cnt is not None and is_index_ready(AccountActivityIndexer.name):
+            activities = (
+                AccountActivity.objects
+                .filter(account_id=obj.id)
+                .order_by("-height", "-tx_id")[:min(txs_cnt, 15)]
+            )
+            txs = get_transactions_in_order(activity.tx_id for activity in activities)
+        else:
+            # the block index is still catching up
+            ids_sender = Transaction.objects.filter(sender_id=obj.id).values_list("id", flat=True)
+            ids_recipient = Transaction.objects.filter(recipient_id=obj.id).values_list("id", flat=True)
+            ids_indirect = (
+                IndirectIncoming.objects
+                .values_list('transaction_id', flat=True)
+                .filter(account_id=obj.id)
+            )
+            all_ids = set(ids_sender).union(ids_recipient).union(ids_indirect)
+            txs_cnt =len(all_ids)
+            txs = Transaction.objects.filter(id__in=all_ids).order_by("-height")[:min(txs_cnt, 15)]
 
-        for t in txs:
-            fill_data_transaction(t, list_page=True)
+        fill_data_transactions(txs, list_page=True)
+        prefetch_indirect_incoming(txs, obj.id)
 
         context["txs"] = txs
         context["txs_cnt"] = txs_cnt
@@ -101,7 +121,7 @@ class AddressDetailView(IntSlugDetailView):
             total_cashback = 0 
         else:
             cash_query = (
-                Transaction.objects.using("java_wallet")
+                Transaction.objects
                 .filter(Q(cash_back_id=obj.id))
             )
 
@@ -117,7 +137,7 @@ class AddressDetailView(IntSlugDetailView):
         # aliases
 
         alias_query = (
-            Alias.objects.using("java_wallet")
+            Alias.objects
             .filter(account_id=obj.id, latest=True)
             .order_by("alias_name")
         )
@@ -131,7 +151,7 @@ class AddressDetailView(IntSlugDetailView):
         # subscriptions
 
         subscription_query = (
-            Subscription.objects.using("java_wallet")
+            Subscription.objects
             .filter(sender_id=obj.id, latest=True)
             .order_by("-height")
         )
@@ -145,12 +165,12 @@ class AddressDetailView(IntSlugDetailView):
         # assets
 
         assets_cnt = (
-            AccountAsset.objects.using("java_wallet")
+            AccountAsset.objects
             .filter(account_id=obj.id, latest=True)
             .count()
         )
         assets = (
-            AccountAsset.objects.using("java_wallet")
+            AccountAsset.objects
             .filter(account_id=obj.id, latest=True)
             .order_by("-db_id")[:assets_cnt]
         )
@@ -163,19 +183,17 @@ class AddressDetailView(IntSlugDetailView):
         # assets transfer
 
         assets_transfers_cnt = (
-            AssetTransfer.objects.using("java_wallet")
+            AssetTransfer.objects
             .filter(Q(sender_id=obj.id) | Q(recipient_id=obj.id))
             .count()
         )
         assets_transfers = (
-            AssetTransfer.objects.using("java_wallet")
-            .using("java_wallet")
+            AssetTransfer.objects
             .filter(Q(sender_id=obj.id) | Q(recipient_id=obj.id))
             .order_by("-height")[:min(assets_transfers_cnt, 15)]
         )
 
-        for transfer in assets_transfers:
-            fill_data_asset_transfer(transfer)
+        fill_data_asset_transfers(assets_transfers)
 
         context["assets_transfers"] = assets_transfers
         context["assets_transfers_cnt"] = assets_transfers_cnt
@@ -183,19 +201,17 @@ class AddressDetailView(IntSlugDetailView):
         # assets trades
 
         assets_trades_cnt = (
-            Trade.objects.using("java_wallet")
+            Trade.objects
             .filter(Q(buyer_id=obj.id) | Q(seller_id=obj.id))
             .count()
         )
         assets_trades = (
-            Trade.objects.using("java_wallet")
-            .using("java_wallet")
+            Trade.objects
             .filter(Q(buyer_id=obj.id) | Q(seller_id=obj.id))
             .order_by("-height")[:min(assets_trades_cnt, 15)]
         )
 
-        for trade in assets_trades:
-            fill_data_asset_trade(trade)
+        fill_data_asset_trades(assets_trades)
 
         context["assets_trades"] = assets_trades
         context["assets_trades_cnt"] = assets_trades_cnt
@@ -211,37 +227,44 @@ class AddressDetailView(IntSlugDetailView):
         # ats
 
         ats = (
-            At.objects.using("java_wallet")
+            At.objects
             .filter(creator_id=obj.id)
             .order_by("-height")[:15]
         )
 
         for at in ats:
-            at.creator_name = get_account_name(obj.id)
+            at.creator_name = obj.name
 
         context["ats"] = ats
         context["ats_cnt"] = (
-            At.objects.using("java_wallet").filter(creator_id=obj.id).count()
+            At.objects.filter(creator_id=obj.id).count()
         )
 
 
         # blocks
 
         mined_blocks = (
-            Block.objects.using("java_wallet")
+            Block.objects
             .filter(generator_id=obj.id)
             .order_by("-height")[:15]
         )
 
+        pool_ids = get_block_pool_ids(mined_blocks)
         for block in mined_blocks:
-            pool_id = get_pool_id_for_block(block)
+            pool_id = pool_ids[block.height]
             if pool_id:
                 block.pool_id = pool_id
-                block.pool_name = get_account_name(pool_id)
+
+        names = get_account_names(
+            getattr(block, "pool_id", None) for block in mined_blocks
+        )
+        for block in mined_blocks:
+            if getattr(block, "pool_id", None):
+                block.pool_name = names.get(block.pool_id)
 
         context["mined_blocks"] = mined_blocks
         context["mined_blocks_cnt"] = (
-            Block.objects.using("java_wallet").filter(generator_id=obj.id).count()
+            Block.objects.filter(generator_id=obj.id).count()
         )
 
         return context
@@ -259,7 +282,16 @@ class AddressDetailView(IntSlugDetailView):
             "subscription": "accounts/subscription.html",
         }
 
+        # only the rendered tab needs its rows completed
+        prefetch = {
+            "assets": lambda: prefetch_holdings(context["assets"]),
+            "alias": lambda: prefetch_aliases(context["aliases"]),
+            "subscription": lambda: prefetch_subscriptions(context["subscriptions"]),
+        }
+
         if tab in templates:
+            if tab in prefetch:
+                prefetch[tab]()
             return render(self.request, templates[tab], context)
 
         return super().render_to_response(context, **response_kwargs)
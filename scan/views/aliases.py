@@ -7,10 +7,11 @@ from django.views.generic import ListView
 
 from java_wallet.models import Alias
 from scan.caching_paginator import CachingPaginator
+from scan.helpers.prefetch import prefetch_aliases
 
 class AliasListView(ListView):
     model = Alias
-    queryset = Alias.objects.using("java_wallet").all()
+    queryset = Alias.objects.all()
     template_name = "alias/list.html"
     context_object_name = "aliases"
     paginator_class = CachingPaginator
@@ -27,6 +28,6 @@ class AliasListView(ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-
+        prefetch_aliases(context[self.context_object_name])
         return context
 
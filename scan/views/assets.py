@@ -1,15 +1,27 @@
 from datetime import datetime
 import os
 import simplejson as json
-import sys
-from django.db.models import Q
+from django.core.paginator import Paginator
+from django.db.models import Q, QuerySet
 from django.http import Http404
 from django.views.generic import ListView
 from config.settings import BLOCKED_ASSETS, PHISHING_ASSETS, FEATURED_ASSETS
 
+from burst.constants import TxSubtypeColoredCoins, TxType
 from java_wallet.models import AccountAsset, Asset, AssetTransfer, Trade,Transaction
 from scan.caching_paginator import CachingPaginator
-from scan.helpers.queries import get_account_name, get_asset_details, get_asset_details_owner
+from scan.cursor_paginator import CursorPaginationMixin
+from scan.helpers.queries import (
+    get_account_name,
+    get_account_names,
+    get_asset_details,
+    get_asset_details_owner,
+    get_transactions_in_order,
+    is_index_ready,
+)
+from scan.helpers.prefetch import prefetch_asset_node_data, prefetch_asset_prices, prefetch_holdings
+from scan.indexer.asset_operations import AssetOperationsIndexer, decode_asset_operation
+from scan.models import AssetOperation
 from scan.templatetags.burst_tags import burst_amount, mul_decimals
 from scan.views.base import IntSlugDetailView
 from scan.views.filters.assets import AssetTransferFilter, TradeFilter
@@ -17,27 +29,84 @@ from scan.views.filters.assets import AssetTransferFilter, TradeFilter
   
 
 def fill_data_asset_transfer(transfer):
-    try:
-        transfer.name, transfer.decimals, transfer.total_quantity, mintable = get_asset_details(transfer.asset_id) 
-    except:
-        transfer.name, transfer.decimals, transfer.total_quantity = ["NOTKNOWN",1,0]
-    transfer.sender_name = get_account_name(transfer.sender_id)
-    transfer.recipient_name = get_account_name(transfer.recipient_id)
-    
+    fill_data_asset_transfers([transfer])
+
+
+def fill_data_asset_transfers(transfers):
+    names = get_account_names(
+        account_id for t in transfers for account_id in (t.sender_id, t.recipient_id)
+    )
+    for transfer in transfers:
+        try:
+            transfer.name, transfer.decimals, transfer.total_quantity, mintable = get_asset_details(transfer.asset_id) 
+        except:
+            transfer.name, transfer.decimals, transfer.total_quantity = ["NOTKNOWN",1,0]
+        transfer.sender_name = names.get(transfer.sender_id)
+        transfer.recipient_name = names.get(transfer.recipient_id)
+
 
 def fill_data_asset_trade(trade):
-    trade.name, trade.decimals, trade.total_quantity, mintable = get_asset_details(trade.asset_id)
-    trade.buyer_name = get_account_name(trade.buyer_id)
-    trade.seller_name = get_account_name(trade.seller_id)
+    fill_data_asset_trades([trade])
+
+
+def fill_data_asset_trades(trades):
+    names = get_account_names(
+        account_id for t in trades for account_id in (t.buyer_id, t.seller_id)
+    )
+    for trade in trades:
+        trade.name, trade.decimals, trade.total_quantity, mintable = get_asset_details(trade.asset_id)
+        trade.buyer_name = names.get(trade.buyer_id)
+        trade.seller_name = names.get(trade.seller_id)
+
+
+def fill_data_asset_holders(holders):
+    names = get_account_names(h.account_id for h in holders)
+    for asset in holders:
+        asset.name, asset.decimals, asset.total_quantity, asset.mintable, asset.owner_id = get_asset_details_owner(
+            asset.asset_id
+        )
+        asset.account_name = names.get(asset.account_id)
+    prefetch_holdings(holders)
+
 
 def fill_data_asset_distribution(distrib):
     distrib.sender_name = get_account_name(distrib.sender_id)
 
 
+def get_asset_operations(asset_id: int, subtype: int):
+    """ AssetOperation of the asset, newest first. Until index_asset_operations
+        or the block indexer has filled the index, a list decoded from every
+        mint or distribution on the chain instead.
+    """
+    if is_index_ready(AssetOperationsIndexer.name):
+        return AssetOperation.objects.filter(asset_id=asset_id, subtype=subtype).order_by("-height", "-tx_id")
+    txs = (
+        Transaction.objects
+        .filter(type=TxType.COLORED_COINS, subtype=subtype)
+        .only("id", "height", "type", "subtype", "attachment_bytes")
+        .order_by("-height", "-id")
+    )
+    operations = (decode_asset_operation(tx) for tx in txs.iterator())
+    return [operation for operation in operations if operation.asset_id == asset_id]
+
+
+def count_asset_operations(operations) -> int:
+    return operations.count() if isinstance(operations, QuerySet) else len(operations)
+
+
+def get_asset_operation_txs(operations) -> list:
+    """ Transactions of a page of AssetOperation, in the same order """
+    txs = get_transactions_in_order(operation.tx_id for operation in operations)
+    names = get_account_names(tx.sender_id for tx in txs)
+    for tx in txs:
+        tx.sender_name = names.get(tx.sender_id)
+    return txs
+
+
 
 class AssetListView(ListView):
     model = Asset
-    queryset = Asset.objects.using("java_wallet").all()
+    queryset = Asset.objects.all()
     template_name = "assets/list.html"
     context_object_name = "assets"
     paginator_class = CachingPaginator
@@ -51,29 +120,34 @@ class AssetListView(ListView):
         context["BLOCKED_ASSETS"] = BLOCKED_ASSETS
         context["PHISHING_ASSETS"] = PHISHING_ASSETS
 
+        featured = Asset.objects.in_bulk(FEATURED_ASSETS, field_name="id")
+        featured_assets = [featured[fid] for fid in FEATURED_ASSETS if fid in featured]
+
+        names = get_account_names(
+            [t.account_id for t in obj]
+            + [a.account_id for a in featured_assets]
+        )
+
         for t in obj:
-            t.account_name = get_account_name(t.account_id)
+            t.account_name = names.get(t.account_id)
             check_name = t.name.upper()
             if check_name in BLOCKED_ASSETS or check_name in PHISHING_ASSETS:
                 t.name = str(t.id)[0:10]
 
-        featured_assets = []
-        for fid in FEATURED_ASSETS:
-            asset = Asset.objects.using("java_wallet").filter(id=fid).first()
-            if asset:
-                asset.account_name = get_account_name(asset.account_id)
-                featured_assets.append(asset)
+        for asset in featured_assets:
+            asset.account_name = names.get(asset.account_id)
+        prefetch_asset_node_data(list(obj) + featured_assets)
+        prefetch_asset_prices(list(obj) + featured_assets)
         context["featured_assets"] = featured_assets
 
         return context
 
 
-class AssetTradesListView(ListView):
+class AssetTradesListView(CursorPaginationMixin, ListView):
     model = Trade
-    queryset = Trade.objects.using("java_wallet").all()
+    queryset = Trade.objects.all()
     template_name = "assets/trades.html"
     context_object_name = "assets_trades"
-    paginator_class = CachingPaginator
     paginate_by = 25
     ordering = "-height"
     filter_set = None
@@ -81,7 +155,7 @@ class AssetTradesListView(ListView):
     def get_queryset(self):
         self.filter_set = TradeFilter(self.request.GET, queryset=super().get_queryset())
         if self.filter_set.is_valid() and self.filter_set.data:
-            qs = self.filter_set.qs[:10000]
+            qs = self.filter_set.qs
         else:
             raise Http404()
 
@@ -89,21 +163,18 @@ class AssetTradesListView(ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["assets_trades_cnt"] = self.filter_set.qs.count()
         obj = context[self.context_object_name]
 
-        for trade in obj:
-            fill_data_asset_trade(trade)
+        fill_data_asset_trades(obj)
 
         return context
 
 
-class AssetTransfersListView(ListView):
+class AssetTransfersListView(CursorPaginationMixin, ListView):
     model = AssetTransfer
-    queryset = AssetTransfer.objects.using("java_wallet").all()
+    queryset = AssetTransfer.objects.all()
     template_name = "assets/transfers.html"
     context_object_name = "assets_transfers"
-    paginator_class = CachingPaginator
     paginate_by = 25
     ordering = "-height"
     filter_set = None
@@ -113,7 +184,7 @@ class AssetTransfersListView(ListView):
             self.request.GET, queryset=super().get_queryset()
         )
         if self.filter_set.is_valid() and self.filter_set.data:
-            qs = self.filter_set.qs[:10000]
+            qs = self.filter_set.qs
         else:
             raise Http404()
 
@@ -121,16 +192,13 @@ class AssetTransfersListView(ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["assets_transfers_cnt"] = self.filter_set.qs.count()
-        obj = context[self.context_object_name]
-        for transfer in obj:
-            fill_data_asset_transfer(transfer)
+        fill_data_asset_transfers(context[self.context_object_name])
 
         return context
 
 class AssetHoldersListView(ListView):
     model = AccountAsset
-    queryset = AccountAsset.objects.using("java_wallet").filter(latest=True)
+    queryset = AccountAsset.objects.filter(latest=True)
     template_name = "assets/holders.html"
     context_object_name = "assets_holders"
     paginator_class = CachingPaginator
@@ -152,20 +220,14 @@ class AssetHoldersListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["assets_holders_cnt"] = self.filter_set.qs.count()
-        obj = context[self.context_object_name]
-
-        for asset in obj:
-            asset.name, asset.decimals, asset.total_quantity, asset.mintable, asset.owner_id = get_asset_details_owner(
-                asset.asset_id
-            )
-            asset.account_name = get_account_name(asset.account_id)
+        fill_data_asset_holders(context[self.context_object_name])
 
 
         return context
 
 class AssetDetailView(IntSlugDetailView):
     model = Asset
-    queryset = Asset.objects.using("java_wallet").all()
+    queryset = Asset.objects.all()
     template_name = "assets/detail.html"
     context_object_name = "asset"
     slug_field = "id"
@@ -174,87 +236,66 @@ class AssetDetailView(IntSlugDetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         obj = context[self.context_object_name]
-        obj.account_name = get_account_name(obj.account_id)
+        prefetch_asset_node_data([obj])
+        names = get_account_names([obj.account_id, obj.issuer_id, obj.current_owner_id])
+        obj.account_name = names.get(obj.account_id)
+        obj.issuer_name = names.get(obj.issuer_id)
+        obj.current_owner_name = names.get(obj.current_owner_id)
         name, decimals, total_quantity, mintable = get_asset_details(obj.id)
 
         # assets transfer
 
         assets_transfers = (
-            AssetTransfer.objects.using("java_wallet")
-            .using("java_wallet")
+            AssetTransfer.objects
             .filter(asset_id=obj.id)
             .order_by("-height")[:15]
         )
 
-        for transfer in assets_transfers:
-            fill_data_asset_transfer(transfer)
+        fill_data_asset_transfers(assets_transfers)
 
         context["assets_transfers"] = assets_transfers
         context["assets_transfers_cnt"] = (
-            AssetTransfer.objects.using("java_wallet").filter(asset_id=obj.id).count()
+            AssetTransfer.objects.filter(asset_id=obj.id).count()
         )
 
         # assets trades
 
         assets_trades = (
-            Trade.objects.using("java_wallet")
-            .using("java_wallet")
+            Trade.objects
             .filter(asset_id=obj.id)
             .order_by("-height")[:15]
         )
 
-        for trade in assets_trades:
-            fill_data_asset_trade(trade)
+        fill_data_asset_trades(assets_trades)
 
         context["assets_trades"] = assets_trades
         context["assets_trades_cnt"] = (
-            Trade.objects.using("java_wallet").filter(asset_id=obj.id).count()
+            Trade.objects.filter(asset_id=obj.id).count()
         )
 
         # asset minting
-        mint_tx  = (
-            Transaction.objects.using("java_wallet")
-            .filter(type=2,subtype =6).order_by("-height")
-        )        
-        assets_minting_cnt = 0
-        asset_minting_tx =[]
-        for mints in mint_tx:
-            asset_id = int.from_bytes(mints.attachment_bytes[1:9], byteorder=sys.byteorder)
-            if asset_id == obj.id:
-                assets_minting_cnt += 1
-                asset_minting_tx.append(mints)
-        context["assets_minting_cnt"] = assets_minting_cnt
-        context["assets_minting_tx"] = asset_minting_tx[:15]
+        mints = get_asset_operations(obj.id, TxSubtypeColoredCoins.ASSET_MINT)
+        context["assets_minting_cnt"] = count_asset_operations(mints)
+        context["assets_minting_tx"] = get_asset_operation_txs(mints[:15])
 
         # asset distributions
-        assets_distribution_cnt = 0
-        assets_distribution_tx =[]
-        distribution_tx_qs = Transaction.objects.using("java_wallet").filter(type=2,subtype =8).order_by("-height")           
-            
-        for distrib_tx in distribution_tx_qs:
-            asset_id = int.from_bytes(distrib_tx.attachment_bytes[1:9], byteorder=sys.byteorder)
-            if asset_id == obj.id:
-                assets_distribution_cnt += 1
-                assets_distribution_tx.append(distrib_tx)
-
-        context["assets_distribution_cnt"] = assets_distribution_cnt
-        context["assets_distribution_tx"] = assets_distribution_tx[:15]
+        distributions = get_asset_operations(obj.id, TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS)
+        context["assets_distribution_cnt"] = count_asset_operations(distributions)
+        context["assets_distribution_tx"] = get_asset_operation_txs(distributions[:15])
 
         # asset holders
         assets_holders_cnt = (
-            AccountAsset.objects.using("java_wallet")
+            AccountAsset.objects
             .filter(asset_id=obj.id, latest=True)
             .count()
         )
         assets_holders = (
-            AccountAsset.objects.using("java_wallet")
+            AccountAsset.objects
             .filter(asset_id=obj.id, latest=True)
             .order_by("-quantity")[:15]
         )
 
-        for asset in assets_holders:
-            asset.name, asset.decimals, asset.total_quantity, asset.mintable, asset.owner_id = get_asset_details_owner(asset.asset_id)
-            asset.account_name = get_account_name(asset.account_id)
+        fill_data_asset_holders(assets_holders)
 
 
 
@@ -265,8 +306,7 @@ class AssetDetailView(IntSlugDetailView):
         # price history
 
         price_query = (
-            Trade.objects.using("java_wallet")
-            .using("java_wallet")
+            Trade.objects
             .filter(asset_id=obj.id)
             .order_by("-height")[:2000]
         )
@@ -294,106 +334,43 @@ class AssetDetailView(IntSlugDetailView):
 
         return context
 
-class AssetMintingDetailView(ListView):
-    model = Asset
-    queryset = Asset.objects.using("java_wallet").all()
-    template_name = "assets/mintings.html"
-    context_object_name = "asset"
-    slug_field = "id"
-    slug_url_kwarg = "id"
+class AssetOperationListView(ListView):
+    model = AssetOperation
     paginator_class = CachingPaginator
     paginate_by = 25
-    ordering = "-height"
-    filter_set = None
-
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        focus =  Asset.objects.using("java_wallet").filter(id=self.request.GET['asset'])
-        for asset_focus in focus:
-            obj=asset_focus
-        name, decimals, total_quantity, mintable = get_asset_details(obj.id)
-        # assets transfer
+    subtype = None
 
-        assets_transfers = (
-            AssetTransfer.objects.using("java_wallet")
-            .using("java_wallet")
-            .filter(asset_id=obj.id)
-            .order_by("-height")[:15]
-        )
-
-        for transfer in assets_transfers:
-            fill_data_asset_transfer(transfer)
-
-        context["assets_transfers"] = assets_transfers
-        context["assets_transfers_cnt"] = (
-            AssetTransfer.objects.using("java_wallet").filter(asset_id=obj.id).count()
-        )
-
-        # assets trades
+    def get_queryset(self):
+        try:
+            asset_id = int(self.request.GET.get("asset"))
+        except (TypeError, ValueError):
+            raise Http404
+        return get_asset_operations(asset_id, self.subtype)
 
-        assets_trades = (
-            Trade.objects.using("java_wallet")
-            .using("java_wallet")
-            .filter(asset_id=obj.id)
-            .order_by("-height")[:15]
-        )
+    def get_paginator(self, queryset, *args, **kwargs):
+        if isinstance(queryset, list):
+            # the decoded fallback, CachingPaginator only counts querysets
+            return Paginator(queryset, *args, **kwargs)
+        return super().get_paginator(queryset, *args, **kwargs)
 
-        for trade in assets_trades:
-            fill_data_asset_trade(trade)
 
-        context["assets_trades"] = assets_trades
-        context["assets_trades_cnt"] = (
-            Trade.objects.using("java_wallet").filter(asset_id=obj.id).count()
-        )
-
-        # asset minting
-        mint_tx  = (
-            Transaction.objects.using("java_wallet")
-            .filter(type=2,subtype =6,sender_id=obj.account_id).order_by("-height")
-        )
-        assets_minting_cnt = 0
-        asset_minting_tx =[]
-        for mints in mint_tx:
-            asset_id = int.from_bytes(mints.attachment_bytes[1:9], byteorder=sys.byteorder)
-            if asset_id == obj.id:
-                assets_minting_cnt += 1
-                asset_minting_tx.append(mints)
-        context["assets_minting_cnt"] = assets_minting_cnt
-        context["assets_minting_tx"] = asset_minting_tx
+class AssetMintingDetailView(AssetOperationListView):
+    template_name = "assets/mintings.html"
+    subtype = TxSubtypeColoredCoins.ASSET_MINT
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["assets_minting_cnt"] = context["paginator"].count
+        context["assets_minting_tx"] = get_asset_operation_txs(context["object_list"])
         return context
 
-class AssetDistributionDetailView(ListView):
-    model = Asset
-    queryset = Asset.objects.using("java_wallet").all()
-    template_name = "assets/distributions.html"
-    context_object_name = "asset"
-    paginator_class = CachingPaginator
-    paginate_by = 25
-    ordering = "-height"
-    filter_set = None
 
+class AssetDistributionDetailView(AssetOperationListView):
+    template_name = "assets/distributions.html"
+    subtype = TxSubtypeColoredCoins.DISTRIBUTE_TO_HOLDERS
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        focus =  Asset.objects.using("java_wallet").filter(id=self.request.GET['asset'])
-        for asset_focus in focus:
-            obj=asset_focus
-        name, decimals, total_quantity, mintable = get_asset_details(obj.id)
-
-        # asset distributions
-        assets_distribution_cnt = 0
-        assets_distribution_tx =[]
-        distribution_tx_qs = Transaction.objects.using("java_wallet").filter(type=2,subtype =8).order_by("-height")           
-            
-        for distrib_tx in distribution_tx_qs:
-            asset_id = int.from_bytes(distrib_tx.attachment_bytes[1:9], byteorder=sys.byteorder)
-            if asset_id == obj.id:
-                assets_distribution_cnt += 1
-                assets_distribution_tx.append(distrib_tx)
-
-        context["assets_distribution_cnt"] = assets_distribution_cnt
-        context["assets_distribution_tx"] = assets_distribution_tx
-
+        context["assets_distribution_cnt"] = context["paginator"].count
+        context["assets_distribution_tx"] = get_asset_operation_txs(context["object_list"])
         return context
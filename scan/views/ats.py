@@ -3,23 +3,29 @@ from django.views.generic import ListView
 
 from java_wallet.models import At
 from scan.caching_paginator import CachingPaginator
-from scan.helpers.queries import get_account_name, get_ap_code, get_at_state
+from scan.helpers.queries import get_account_names, get_ap_code, get_at_state
 from scan.views.base import IntSlugDetailView
 
 
 def fill_at_data(obj):
-    obj.creator_name = get_account_name(obj.creator_id)
-    if not obj.ap_code and obj.ap_code_hash_id:
-        obj.ap_code = get_ap_code(obj.ap_code_hash_id)
+    fill_ats_data([obj])
 
-    state, obj.activation = get_at_state(obj.id)
-    # skip the internal state, balances, etc.
-    obj.state = gzip.decompress(state)[106:]
+
+def fill_ats_data(ats):
+    names = get_account_names(at.creator_id for at in ats)
+    for obj in ats:
+        obj.creator_name = names.get(obj.creator_id)
+        if not obj.ap_code and obj.ap_code_hash_id:
+            obj.ap_code = get_ap_code(obj.ap_code_hash_id)
+
+        state, obj.activation = get_at_state(obj.id)
+        # skip the internal state, balances, etc.
+        obj.state = gzip.decompress(state)[106:]
 
 
 class AtListView(ListView):
     model = At
-    queryset = At.objects.using("java_wallet").filter(latest=True).all()
+    queryset = At.objects.filter(latest=True).all()
     template_name = "ats/list.html"
     context_object_name = "ats"
     paginator_class = CachingPaginator
@@ -35,16 +41,14 @@ class AtListView(ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        obj = context[self.context_object_name]
-        for t in obj:
-            fill_at_data(t)
+        fill_ats_data(context[self.context_object_name])
 
         return context
 
 
 class AtDetailView(IntSlugDetailView):
     model = At
-    queryset = At.objects.using("java_wallet").filter(latest=True).all()
+    queryset = At.objects.filter(latest=True).all()
     template_name = "ats/detail.html"
     context_object_name = "at"
     slug_field = "id"
@@ -2,10 +2,11 @@ from django.views.generic import ListView
 
 from java_wallet.models import Block
 from scan.caching_data.last_height import CachingLastHeight
-from scan.caching_paginator import CachingPaginator
+from scan.cursor_paginator import CursorPaginationMixin
+from scan.helpers.fragments import has_fragment
 from scan.helpers.queries import (
-    get_account_name,
-    get_pool_id_for_block,
+    get_account_names,
+    get_block_pool_ids,
     get_txs_count_in_block,
 )
 from scan.views.base import IntSlugDetailView
@@ -13,22 +14,37 @@ from scan.views.filters.blocks import BlockFilter
 
 
 def fill_data_block(obj):
-    obj.txs_cnt = get_txs_count_in_block(obj.id)
-    obj.generator_name = get_account_name(obj.generator_id)
-    pool_id = get_pool_id_for_block(obj)
-    if pool_id:
-        obj.pool_id = pool_id
-        obj.pool_name = get_account_name(pool_id)
+    fill_data_blocks([obj])
 
 
-class BlockListView(ListView):
+def fill_data_blocks(blocks):
+    pool_ids = get_block_pool_ids(blocks)
+    for b in blocks:
+        b.txs_cnt = get_txs_count_in_block(b.id)
+        pool_id = pool_ids[b.height]
+        if pool_id:
+            b.pool_id = pool_id
+
+    names = get_account_names(
+        account_id
+        for b in blocks
+        for account_id in (b.generator_id, getattr(b, "pool_id", None))
+    )
+
+    for b in blocks:
+        b.generator_name = names.get(b.generator_id)
+        if getattr(b, "pool_id", None):
+            b.pool_name = names.get(b.pool_id)
+
+
+class BlockListView(CursorPaginationMixin, ListView):
     model = Block
-    queryset = Block.objects.using("java_wallet").all()
+    queryset = Block.objects.all()
     template_name = "blocks/list.html"
     context_object_name = "blocks"
-    paginator_class = CachingPaginator
     paginate_by = 25
     ordering = "-height"
+    cursor_fields = ("height",)
 
     def get_queryset(self):
         return BlockFilter(self.request.GET, queryset=super().get_queryset()).qs
@@ -36,16 +52,14 @@ class BlockListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["last_height"] = CachingLastHeight().cached_data
-        obj = context[self.context_object_name]
-        for b in obj:
-            fill_data_block(b)
+        fill_data_blocks(context[self.context_object_name])
 
         return context
 
 
 class BlockDetailView(IntSlugDetailView):
     model = Block
-    queryset = Block.objects.using("java_wallet").all()
+    queryset = Block.objects.all()
     template_name = "blocks/detail.html"
     context_object_name = "blk"
     slug_field = "height"
@@ -54,5 +68,9 @@ class BlockDetailView(IntSlugDetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         obj = context[self.context_object_name]
-        fill_data_block(obj)
+        if has_fragment(obj.height, self.template_name, "block_detail", obj.id):
+            # only the page description is rendered outside the fragment
+            obj.txs_cnt = get_txs_count_in_block(obj.id)
+        else:
+            fill_data_block(obj)
         return context
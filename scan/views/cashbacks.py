@@ -2,35 +2,16 @@ import gzip
 from django.views.generic import ListView
 
 from java_wallet.models import Transaction
-from scan.caching_paginator import CachingPaginator
-from scan.helpers.queries import get_account_name
+from scan.cursor_paginator import CursorPaginationMixin
 from scan.views.base import IntSlugDetailView
+from scan.views.transactions import fill_data_transactions
 
-from burst.libs.multiout import MultiOutPack
-from java_wallet.models import Transaction
-from scan.caching_paginator import CachingPaginator
-from scan.helpers.queries import get_account_name
-from scan.views.base import IntSlugDetailView
-
-
-def fill_data_transaction(obj, list_page=True):
-    obj.sender_name = get_account_name(obj.sender_id)
-    if obj.recipient_id:
-        obj.recipient_name = get_account_name(obj.recipient_id)
 
-    if obj.type == 0 and obj.subtype in {1, 2}:
-        if obj.height == 0:
-            # TODO: quick hack pending transaction
-            return
-        v, obj.multiout = MultiOutPack().unpack_header(obj.attachment_bytes)
-
-
-class CBListView(ListView):
+class CBListView(CursorPaginationMixin, ListView):
     model = Transaction
-    queryset = Transaction.objects.using("java_wallet").all()
+    queryset = Transaction.objects.all()
     template_name = "cbs/list.html"
     context_object_name = "cbs"
-    paginator_class = CachingPaginator
     paginate_by = 25
     ordering = "-height"
 
@@ -43,16 +24,14 @@ class CBListView(ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        obj = context[self.context_object_name]
-        for t in obj:
-            fill_data_transaction(t)
+        fill_data_transactions(context[self.context_object_name])
 
         return context
 
 
 class CBDetailView(IntSlugDetailView):
     model = Transaction
-    queryset = Transaction.objects.using("java_wallet").all()
+    queryset = Transaction.objects.all()
     template_name = "cbs/detail.html"
     context_object_name = "cb"
     slug_field = "id"
@@ -6,22 +6,39 @@ from scan.caching_paginator import CachingPaginator
 
 
 from scan.caching_paginator import CachingPaginator
-from scan.helpers.queries import  get_account_name, get_details_by_tx, get_single_tx_class
+from scan.helpers.queries import get_account_names, get_transactions_in_order
 
 
 
 def fill_data_indirect(obj, list_page=True):
-    reciepent,sender,txtimestamp = get_details_by_tx(obj.transaction_id)
-    obj.recipient_name = get_account_name(obj.account_id)
-    obj.sender_id = sender 
-    obj.sender_name = get_account_name(obj.sender_id)
-    obj.timestamp = txtimestamp
-    obj.tx = get_single_tx_class(obj.transaction_id)
+    fill_data_indirects([obj], list_page=list_page)
+
+
+def fill_data_indirects(indirects, list_page=True):
+    txs = {tx.id: tx for tx in get_transactions_in_order(obj.transaction_id for obj in indirects)}
+    for obj in indirects:
+        obj.tx = txs.get(obj.transaction_id)
+        obj.sender_id = obj.tx.sender_id if obj.tx else None
+        obj.timestamp = obj.tx.timestamp if obj.tx else None
+        if obj.tx:
+            # the rows are what the distribution paid, see tx_quantity
+            if not hasattr(obj.tx, "indirect_incomings"):
+                obj.tx.indirect_incomings = {}
+            paid = obj.tx.indirect_incomings.get(obj.account_id)
+            if not paid or paid.height < obj.height:
+                obj.tx.indirect_incomings[obj.account_id] = obj
+
+    names = get_account_names(
+        account_id for obj in indirects for account_id in (obj.account_id, obj.sender_id)
+    )
+    for obj in indirects:
+        obj.recipient_name = names.get(obj.account_id)
+        obj.sender_name = names.get(obj.sender_id)
 
 
 class DistributionListView(ListView):
     model = IndirectIncoming
-    queryset = IndirectIncoming.objects.using("java_wallet").all().order_by("-amount","-quantity")
+    queryset = IndirectIncoming.objects.all().order_by("-amount","-quantity")
     template_name = "distribution/list.html"
     context_object_name = "distribution"
     paginator_class = CachingPaginator
@@ -37,7 +54,5 @@ class DistributionListView(ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        obj = context[self.context_object_name]
-        for t in obj:
-            fill_data_indirect(t)
+        fill_data_indirects(context[self.context_object_name])
         return context
\ No newline at end of file
@@ -1,9 +1,9 @@
+from django.conf import settings
 from django.db.models import Q
 from django_filters import FilterSet, NumberFilter, CharFilter
 from burst.libs.reed_solomon import ReedSolomon, ReedSolomonError
 from java_wallet.models import IndirectIncoming, Transaction, Account
 
-import os
 
 class TxFilter(FilterSet):
     block = NumberFilter(field_name="block__height")
@@ -24,20 +24,20 @@ class TxFilter(FilterSet):
     
     def rs_id(self, queryset, name, value):
         try:
-            if value.startswith(os.environ.get("ADDRESS_PREFIX")):
-                value = value[len(os.environ.get("ADDRESS_PREFIX")):]
+            if value.startswith(settings.ADDRESS_PREFIX):
+                value = value[len(settings.ADDRESS_PREFIX):]
                 numeric_id = ReedSolomon().decode(value)
                 return queryset.filter(**{name: numeric_id})
             elif value.isdigit():
                 return queryset.filter(**{name: value})
             else:
                 account_exists = (
-                    Account.objects.using("java_wallet")
+                    Account.objects
                     .filter(name=value).exists()
                 )
                 if account_exists:
                     act_name = (
-                        Account.objects.using("java_wallet")
+                        Account.objects
                         .filter(name=value)
                         .order_by("-height")
                         .values_list("id", flat=True)
@@ -65,7 +65,7 @@ class TxFilter(FilterSet):
     @staticmethod
     def filter_by_account(queryset, name, value):
         indirects = list(
-            IndirectIncoming.objects.using("java_wallet")
+            IndirectIncoming.objects
             .values_list('transaction_id', flat=True)
             .filter(account_id=value)
         )
@@ -73,7 +73,7 @@ class TxFilter(FilterSet):
  
     def filter_by_indirects(queryset, name, value):
         indirects = list(
-            IndirectIncoming.objects.using("java_wallet")
+            IndirectIncoming.objects
             .values_list('db_id', flat=True)
             .filter(transaction_id=value)
         )
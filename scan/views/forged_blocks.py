@@ -2,16 +2,19 @@ from django.db.models import F, OuterRef, Q
 from django.views.generic import ListView
 
 from java_wallet.models import Block, RewardRecipAssign
-from scan.caching_paginator import CachingPaginator
-from scan.helpers.queries import get_timestamp_of_block
+from scan.cursor_paginator import CursorPaginationMixin
+from scan.helpers.queries import is_index_ready
+from scan.indexer.block_pools import BlockPoolsIndexer
+from scan.models import BlockPool
+from scan.views.pools import fill_data_forged_blocks
 
 
-class ForgedBlocksListView(ListView):
+class ForgedBlocksListView(CursorPaginationMixin, ListView):
     model = Block
     queryset = (
-        Block.objects.using("java_wallet")
+        Block.objects
         .annotate(
-            pool_id=RewardRecipAssign.objects.using("java_wallet")
+            pool_id=RewardRecipAssign.objects
             .filter(~Q(recip_id=F('account_id')))
             .filter(height__lte=OuterRef("height"))
             .filter(account_id=OuterRef("generator_id"))
@@ -27,19 +30,26 @@ class ForgedBlocksListView(ListView):
     )
     template_name = "forged_blocks/list.html"
     context_object_name = "forged_blocks"
-    paginator_class = CachingPaginator
     paginate_by = 25
     ordering = "-block"
+    cursor_fields = ("block",)
 
     def get_queryset(self):
-        qs = self.queryset
+        if is_index_ready(BlockPoolsIndexer.name):
+            qs = (
+                BlockPool.objects
+                .exclude(pool_id__isnull=True)
+                .exclude(pool_id=F("generator_id"))
+                .annotate(block=F("height"))
+                .values("generator_id", "block", "pool_id")
+            )
+        else:
+            qs = self.queryset
         if 'a' in self.request.GET:
             qs = qs.filter(pool_id=self.request.GET['a'])
         return qs.order_by(self.ordering)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        obj = context[self.context_object_name]
-        for forged_block in obj:
-            forged_block["block_timestamp"] = get_timestamp_of_block(forged_block["block"])
+        fill_data_forged_blocks(context[self.context_object_name])
         return context
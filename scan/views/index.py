@@ -2,9 +2,9 @@ from django.shortcuts import redirect, render
 from django.views.decorators.cache import cache_page
 
 from java_wallet.models import Block, Transaction
-from scan.helpers.queries import get_unconfirmed_transactions
-from scan.views.blocks import fill_data_block
-from scan.views.transactions import fill_data_transaction
+from scan.caching_data.pending_txs import CachingPendingTxs
+from scan.views.blocks import fill_data_blocks
+from scan.views.transactions import fill_data_transactions
 
 
 @cache_page(20)
@@ -23,20 +23,16 @@ def index(request):
     if 'action' in request.GET and request.GET['action'] == 'token_inspect' and 'id' in request.GET:
         return redirect('asset/' + request.GET['id'])
 
-    txs = Transaction.objects.using("java_wallet").order_by("-height")[:5]
+    txs = Transaction.objects.order_by("-height")[:5]
+    fill_data_transactions(txs, list_page=True)
 
-    for t in txs:
-        fill_data_transaction(t, list_page=True)
-
-    blocks = Block.objects.using("java_wallet").order_by("-height")[:5]
-
-    for b in blocks:
-        fill_data_block(b)
+    blocks = Block.objects.order_by("-height")[:5]
+    fill_data_blocks(blocks)
 
     context = {
         "txs": txs,
         "blocks": blocks,
-        "txs_pending": get_unconfirmed_transactions()[:5],
+        "txs_pending": CachingPendingTxs().cached_data[:5],
     }
 
     return render(request, "home/index.html", context)
@@ -3,14 +3,14 @@ from django.views.generic import ListView
 
 from java_wallet.models import Goods, Purchase
 from scan.caching_paginator import CachingPaginator
-from scan.helpers.queries import get_account_name
+from scan.helpers.queries import get_account_name, get_account_names
 from scan.views.base import IntSlugDetailView
 from scan.views.filters.marketplace import MarketplaceFilter
 
 
 class MarketPlaceListView(ListView):
     model = Goods
-    queryset = Goods.objects.using("java_wallet").filter(latest=True).all()
+    queryset = Goods.objects.filter(latest=True).all()
     template_name = "marketplace/list.html"
     context_object_name = "goods"
     paginator_class = CachingPaginator
@@ -20,15 +20,16 @@ class MarketPlaceListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         obj = context[self.context_object_name]
+        names = get_account_names(t.seller_id for t in obj)
         for t in obj:
-            t.seller_name = get_account_name(t.seller_id)
+            t.seller_name = names.get(t.seller_id)
 
         return context
 
 
 class MarketPlacePurchasesListView(ListView):
     model = Purchase
-    queryset = Purchase.objects.using("java_wallet").all()
+    queryset = Purchase.objects.all()
     template_name = "marketplace/purchases.html"
     context_object_name = "purchases"
     paginator_class = CachingPaginator
@@ -52,16 +53,19 @@ class MarketPlacePurchasesListView(ListView):
         # total count
         context["purchases_cnt"] = self.filter_set.qs.count()
         obj = context[self.context_object_name]
+        names = get_account_names(
+            account_id for p in obj for account_id in (p.seller_id, p.buyer_id)
+        )
         for purchase in obj:
-            purchase.seller_name = get_account_name(purchase.seller_id)
-            purchase.buyer_name = get_account_name(purchase.buyer_id)
+            purchase.seller_name = names.get(purchase.seller_id)
+            purchase.buyer_name = names.get(purchase.buyer_id)
 
         return context
 
 
 class MarketPlaceDetailView(IntSlugDetailView):
     model = Goods
-    queryset = Goods.objects.using("java_wallet").filter(latest=True).all()
+    queryset = Goods.objects.filter(latest=True).all()
     template_name = "marketplace/detail.html"
     context_object_name = "good"
     slug_field = "id"
@@ -72,18 +76,18 @@ class MarketPlaceDetailView(IntSlugDetailView):
         obj = context[self.context_object_name]
         obj.seller_name = get_account_name(obj.seller_id)
         purchases = (
-            Purchase.objects.using("java_wallet")
-            .using("java_wallet")
+            Purchase.objects
             .filter(goods_id=obj.id)
             .order_by("-height")[:15]
         )
 
+        names = get_account_names(p.buyer_id for p in purchases)
         for purchase in purchases:
-            purchase.buyer_name = get_account_name(purchase.buyer_id)
+            purchase.buyer_name = names.get(purchase.buyer_id)
 
         context["purchases"] = purchases
         context["purchases_cnt"] = (
-            Purchase.objects.using("java_wallet").filter(goods_id=obj.id).count()
+            Purchase.objects.filter(goods_id=obj.id).count()
         )
 
         return context
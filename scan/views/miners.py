@@ -3,13 +3,13 @@ from django.views.generic import ListView
 
 from java_wallet.models import RewardRecipAssign
 from scan.caching_paginator import CachingPaginator
-from scan.helpers.queries import get_timestamp_of_block
+from scan.views.pools import fill_data_miners
 
 
 class MinerListView(ListView):
     model = RewardRecipAssign
     queryset = (
-        RewardRecipAssign.objects.using("java_wallet")
+        RewardRecipAssign.objects
         .filter(~Q(recip_id=F('account_id')))
         .filter(latest=1)
         .values("recip_id", "account_id", "height")
@@ -29,7 +29,5 @@ class MinerListView(ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        obj = context[self.context_object_name]
-        for miner in obj:
-            miner["block_timestamp"] = get_timestamp_of_block(miner["height"])
+        fill_data_miners(context[self.context_object_name])
         return context
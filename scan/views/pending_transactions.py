@@ -1,7 +1,7 @@
 from django.shortcuts import render
 
-from scan.helpers.queries import get_unconfirmed_transactions
+from scan.caching_data.pending_txs import CachingPendingTxs
 
 def pending_transactions(request):
-    context = {"txs_pending": get_unconfirmed_transactions()}
+    context = {"txs_pending": CachingPendingTxs().cached_data}
     return render(request, "txs_pending/list.html", context)
@@ -11,25 +11,51 @@ from java_wallet.models import (
 from scan.caching_paginator import CachingPaginator
 from scan.helpers.queries import (
     get_account_name,
+    get_account_names,
     get_count_of_miners,
     get_description_url,
     get_description_banner,
     get_forged_blocks_of_pool,
+    get_index_counter,
     get_timestamp_of_block,
+    is_index_ready,
 )
+from scan.indexer.pool_summary import PoolSummaryIndexer
+from scan.models import IndexCounter, PoolSummary
 from scan.views.base import IntSlugDetailView
-from scan.views.transactions import fill_data_transaction
+from scan.views.transactions import fill_data_transactions
 
 def fill_data_pool(pool):
-    pool["url"] = get_description_url(pool["pool_id"])
-    pool["banner"] = get_description_banner(pool["pool_id"])
-    pool["miners_cnt"] = get_count_of_miners(pool["pool_id"])
-    pool["block_timestamp"] = get_timestamp_of_block(pool["height"])
+    fill_data_pools([pool])
+
+
+def fill_data_pools(pools):
+    names = get_account_names(pool["pool_id"] for pool in pools)
+    for pool in pools:
+        pool["pool_name"] = names.get(pool["pool_id"])
+        pool["url"] = get_description_url(pool["pool_id"])
+        pool["banner"] = get_description_banner(pool["pool_id"])
+        pool["miners_cnt"] = get_count_of_miners(pool["pool_id"])
+        pool["block_timestamp"] = get_timestamp_of_block(pool["height"])
+
+
+def fill_data_miners(miners):
+    names = get_account_names(miner["account_id"] for miner in miners)
+    for miner in miners:
+        miner["account_name"] = names.get(miner["account_id"])
+        miner["block_timestamp"] = get_timestamp_of_block(miner["height"])
+
+
+def fill_data_forged_blocks(forged_blocks):
+    names = get_account_names(block["generator_id"] for block in forged_blocks)
+    for forged_block in forged_blocks:
+        forged_block["generator_name"] = names.get(forged_block["generator_id"])
+        forged_block["block_timestamp"] = get_timestamp_of_block(forged_block["block"])
 
 class PoolListView(ListView):
     model = RewardRecipAssign
     queryset = (
-        RewardRecipAssign.objects.using("java_wallet")
+        RewardRecipAssign.objects
         .filter(~Q(recip_id=F('account_id')))
         .values("recip_id", "account_id")
     )
@@ -40,9 +66,17 @@ class PoolListView(ListView):
     ordering = "-block"
 
     def get_queryset(self):
+        if is_index_ready(PoolSummaryIndexer.name):
+            return (
+                PoolSummary.objects
+                .annotate(height=F("last_forged_height"), block_timestamp=F("last_forged_at"))
+                .order_by("-last_forged_height")
+                .values("pool_id", "height", "block_timestamp", "url", "banner", "miners_cnt", "forged_cnt")
+            )
+
         qs = self.queryset
         query_block = (
-            Block.objects.using("java_wallet")
+            Block.objects
             .values("generator_id", "height")
             .all()
         )
@@ -92,8 +126,14 @@ class PoolListView(ListView):
         context = super().get_context_data(**kwargs)
         obj = context[self.context_object_name]
 
-        for pool in obj:
-            fill_data_pool(pool)
+        if obj.model is PoolSummary:
+            # Precomputed by the block indexer, only names are left to fill
+            pools = list(obj)
+            names = get_account_names(pool["pool_id"] for pool in pools)
+            for pool in pools:
+                pool["pool_name"] = names.get(pool["pool_id"])
+            context[self.context_object_name] = pools
+            return context
 
         # Remove duplicate pools
         unique_pools = []
@@ -103,13 +143,15 @@ class PoolListView(ListView):
                 unique_pools.append(pool)
                 unique_pool_ids.add(pool["pool_id"])
 
+        fill_data_pools(unique_pools)
+
         context[self.context_object_name] = unique_pools
 
         return context
 
 class PoolDetailView(IntSlugDetailView):
     model = Account
-    queryset = Account.objects.using("java_wallet").filter(latest=True).all()
+    queryset = Account.objects.filter(latest=True).all()
     template_name = "pools/detail.html"
     context_object_name = "address"
     slug_field = "id"
@@ -125,29 +167,28 @@ class PoolDetailView(IntSlugDetailView):
 
         # transactions
         indirects_query = (
-            IndirectIncoming.objects.using("java_wallet")
+            IndirectIncoming.objects
             .values_list('transaction_id', flat=True)
             .filter(account_id=obj.id)
         )
-        indirects_count = indirects_query.count()
-
         txs_query = (
-            Transaction.objects.using("java_wallet")
+            Transaction.objects
             .filter(Q(sender_id=obj.id) | Q(recipient_id=obj.id))
         )
-        txs_cnt = txs_query.count() + indirects_count
+        txs_cnt = get_index_counter(IndexCounter.Kind.ACCOUNT_TXS, obj.id)
+        if txs_cnt is None:
+            txs_cnt = txs_query.count() + indirects_query.count()
 
-        if indirects_count > 0:
+        if indirects_query.exists():
             txs_indirects = (
-                Transaction.objects.using("java_wallet")
+                Transaction.objects
                 .filter(id__in=indirects_query)
             )
             txs_query = txs_query.union(txs_indirects)
 
         txs = txs_query.order_by("-height")[:min(txs_cnt, 15)]
 
-        for t in txs:
-            fill_data_transaction(t, list_page=True)
+        fill_data_transactions(txs, list_page=True)
 
         context["txs"] = txs
         context["txs_cnt"] = txs_cnt
@@ -155,7 +196,7 @@ class PoolDetailView(IntSlugDetailView):
         # Miners
 
         miners_query = (
-            RewardRecipAssign.objects.using("java_wallet")
+            RewardRecipAssign.objects
             .filter(~Q(recip_id=F('account_id')))
             .filter(recip_id=obj.id)
             .filter(latest=1)
@@ -165,8 +206,7 @@ class PoolDetailView(IntSlugDetailView):
         miners = miners_query.order_by('-height')
 
         miners = miners[:25]
-        for miner in miners:
-            miner["block_timestamp"] = get_timestamp_of_block(miner["height"])
+        fill_data_miners(miners)
 
         context["miners"] = miners
         context["miners_cnt"] = get_count_of_miners(obj.id)
@@ -174,10 +214,11 @@ class PoolDetailView(IntSlugDetailView):
         # Forged blocks
 
         forged_blocks = get_forged_blocks_of_pool(obj.id)
-        forged_blocks_cnt = forged_blocks.count()
+        forged_blocks_cnt = get_index_counter(IndexCounter.Kind.POOL_FORGED_BLOCKS, obj.id)
+        if forged_blocks_cnt is None:
+            forged_blocks_cnt = len(forged_blocks)
         forged_blocks = forged_blocks[:25]
-        for forged_block in forged_blocks:
-            forged_block["block_timestamp"] = get_timestamp_of_block(forged_block["block"])
+        fill_data_forged_blocks(forged_blocks)
 
         context["forged_blocks"] = forged_blocks
         context["forged_blocks_cnt"] = forged_blocks_cnt
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.shortcuts import redirect, render
 from django.views.decorators.http import require_http_methods
 
@@ -5,7 +6,6 @@ from burst.libs.reed_solomon import ReedSolomon, ReedSolomonError
 from java_wallet import models
 from scan.models import PeerMonitor
 
-import os
 
 SEARCH_BY = [
     ("Block", "height", "/block/{}"),
@@ -34,7 +34,7 @@ def search_view(request):
         for x in SEARCH_BY:
             exists = (
                 getattr(models, x[0])
-                .objects.using("java_wallet")
+                .objects
                 .filter(**{x[1]: query})
                 .exists()
             )
@@ -43,13 +43,13 @@ def search_view(request):
                 redirect_url = x[2].format(query)
                 break
 
-    elif len(query) in REED_SOLOMON_LENS or query.find(os.environ.get("ADDRESS_PREFIX")) == 0:
+    elif len(query) in REED_SOLOMON_LENS or query.startswith(settings.ADDRESS_PREFIX):
         try:
-            if query.find(os.environ.get("ADDRESS_PREFIX")) == 0:
-                query = query[len(os.environ.get("ADDRESS_PREFIX")):]
+            if query.startswith(settings.ADDRESS_PREFIX):
+                query = query[len(settings.ADDRESS_PREFIX):]
             numeric_id = ReedSolomon().decode(query)
             exists = (
-                models.At.objects.using("java_wallet")
+                models.At.objects
                 .filter(id=numeric_id)
                 .exists()
             )
@@ -57,7 +57,7 @@ def search_view(request):
                 redirect_url = f"/at/{numeric_id}"
             else:
                 exists = (
-                    models.Account.objects.using("java_wallet")
+                    models.Account.objects
                     .filter(id=numeric_id)
                     .exists()
                 )
@@ -69,12 +69,12 @@ def search_view(request):
 
     else:
         account_exists = (
-                    models.Account.objects.using("java_wallet")
+                    models.Account.objects
                     .filter(name=query).exists()
                 )
         if account_exists:
             account_id = (
-                models.Account.objects.using("java_wallet")
+                models.Account.objects
                 .filter(name=query)
                 .order_by("-height")
                 .values_list("id", flat=True)
@@ -7,10 +7,11 @@ from django.views.generic import ListView
 
 from java_wallet.models import Subscription
 from scan.caching_paginator import CachingPaginator
+from scan.helpers.prefetch import prefetch_subscriptions
 
 class SubscriptionListView(ListView):
     model = Subscription
-    queryset = Subscription.objects.using("java_wallet").all()
+    queryset = Subscription.objects.all()
     template_name = "subscription/list.html"
     context_object_name = "subscriptions"
     paginator_class = CachingPaginator
@@ -26,5 +27,6 @@ class SubscriptionListView(ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        prefetch_subscriptions(context[self.context_object_name])
         return context
 
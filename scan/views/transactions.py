@@ -2,56 +2,69 @@ import csv
 
 from django.db.models.query_utils import Q
 from django.http import Http404
-from django.http.response import HttpResponse, StreamingHttpResponse
+from django.http.response import StreamingHttpResponse
 from django.views.generic import ListView
-from burst.constants import TxSubtypeBurstMining, TxType
+from burst.constants import TxSubtypeBurstMining, TxSubtypePayment, TxType
 from scan.templatetags.burst_tags import burst_amount, num2rs, tx_load_recipients, tx_type
 
 from burst.libs.multiout import MultiOutPack
+from java_wallet.db_router import PRIMARY, get_read_db, iter_on_replica, use_primary
 from java_wallet.models import IndirectIncoming, Transaction
 from scan.caching_data.last_height import CachingLastHeight
+from scan.caching_data.pending_txs import CachingPendingTxs
 from scan.caching_data.total_txs_count import CachingTotalTxsCount
-from scan.caching_paginator import CachingPaginator
-from scan.helpers.queries import get_account_name, get_unconfirmed_transactions
+from scan.cursor_paginator import CursorPaginationMixin
+from scan.helpers.queries import (
+    get_account_names,
+    get_transactions_in_order,
+    is_index_ready,
+    iter_account_activity,
+)
+from scan.helpers.fragments import has_fragment
+from scan.helpers.prefetch import prefetch_indirect_incoming
+from scan.indexer.account_activity import AccountActivityIndexer
 from scan.views.base import IntSlugDetailView
 from scan.views.filters.transactions import TxFilter
 
 
 def fill_data_transaction(obj, list_page=True):
-    obj.sender_name = get_account_name(obj.sender_id)
-    if obj.recipient_id:
-        obj.recipient_name = get_account_name(obj.recipient_id)
+    fill_data_transactions([obj], list_page=list_page)
 
-    if obj.type == 0 and obj.subtype in {1, 2}:
-        if obj.height == 0:
-            # TODO: quick hack pending transaction
-            return
-        v, obj.multiout = MultiOutPack().unpack_header(obj.attachment_bytes)
 
+def fill_data_transactions(txs, list_page=True):
+    names = get_account_names(
+        account_id for t in txs for account_id in (t.sender_id, t.recipient_id)
+    )
+
+    for t in txs:
+        t.sender_name = names.get(int(t.sender_id))
+        if t.recipient_id:
+            t.recipient_name = names.get(int(t.recipient_id))
+
+        if t.type == 0 and t.subtype in {1, 2}:
+            if t.height == 0:
+                # TODO: quick hack pending transaction
+                continue
+            v, t.multiout = MultiOutPack().unpack_header(t.attachment_bytes)
 
-class TxListView(ListView):
+
+class TxListView(CursorPaginationMixin, ListView):
     model = Transaction
-    queryset = Transaction.objects.using("java_wallet").all()
+    queryset = Transaction.objects.all()
     template_name = "txs/list.html"
     context_object_name = "txs"
-    paginator_class = CachingPaginator
     paginate_by = 25
-    ordering = ("-height", "-timestamp")
+    ordering = ("-height", "-db_id")
     filter_set = None
 
     def get_queryset(self):
         self.filter_set = TxFilter(self.request.GET, queryset=super().get_queryset())
-        qs = self.filter_set.qs
-        if not self.filter_set.data:
-            qs = qs[:10000]
-
-        return qs
+        return self.filter_set.qs
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        obj = context[self.context_object_name]
-        for t in obj:
-            fill_data_transaction(t, list_page=True)
+        fill_data_transactions(context[self.context_object_name], list_page=True)
+        prefetch_indirect_incoming(context[self.context_object_name], self.request.GET.get("a"))
 
         # if no filtering get cached total count instead paginator.count in template
         if not self.filter_set.data:
@@ -60,68 +73,113 @@ class TxListView(ListView):
         return context
 
 
-def tx_export_csv(request, id : int):
+CSV_CHUNK_SIZE = 1000
 
-    response = HttpResponse(
-        content_type='text/csv',
-        headers={'Content-Disposition': f'attachment; filename="{id}.csv"'},
-    )
-    writer = csv.writer(response)
+
+class Echo:
+    """ File-like object for csv.writer, returns the line instead of buffering it """
+    def write(self, value):
+        return value
+
+
+def iter_account_txs(account_id: int):
+    """ Yields the account's transactions newest first, CSV_CHUNK_SIZE at a time """
+    if is_index_ready(AccountActivityIndexer.name):
+        for activities in iter_account_activity(account_id, chunk_size=CSV_CHUNK_SIZE):
+            yield get_transactions_in_order(activity.tx_id for activity in activities)
+        return
 
     indirects_query = (
-        IndirectIncoming.objects.using("java_wallet")
+        IndirectIncoming.objects
         .values_list('transaction_id', flat=True)
-        .filter(account_id=id)
+        .filter(account_id=account_id)
     )
-    txs_indirects = Transaction.objects.using("java_wallet").filter(id__in=indirects_query)
+    txs_direct = Transaction.objects.filter(Q(sender_id=account_id) | Q(recipient_id=account_id))
+    txs_indirects = Transaction.objects.filter(id__in=indirects_query)
+    # keyset chunks on (height, id): MySQLdb buffers a whole result set client-side
+    chunk = list(txs_direct.union(txs_indirects).order_by("-height", "-id")[:CSV_CHUNK_SIZE])
+    while chunk:
+        yield chunk
+        last = chunk[-1]
+        after = Q(height__lt=last.height) | Q(height=last.height, id__lt=last.id)
+        chunk = list(
+            txs_direct.filter(after).union(txs_indirects.filter(after)).order_by("-height", "-id")[:CSV_CHUNK_SIZE]
+        )
+
+
+def account_csv_rows(account_id: int):
+    yield ['ID', 'Height', 'timestamp', 'Type', 'From', 'To', 'Amount', 'Fee']
+
+    account_rs = num2rs(account_id)
+    for txs in iter_account_txs(account_id):
+        # multi-outs: the amount paid to this account is already split per recipient
+        multi_out_ids = [
+            tx.id for tx in txs
+            if tx.type == TxType.PAYMENT and tx.subtype in (TxSubtypePayment.MULTI_OUT, TxSubtypePayment.MULTI_OUT_SAME)
+        ]
+        indirect_amounts = dict(
+            IndirectIncoming.objects
+            .filter(account_id=account_id, transaction_id__in=multi_out_ids)
+            .values_list("transaction_id", "amount")
+        ) if multi_out_ids else {}
+        rs = {account_id: account_rs}
+        for counterparty_id in {x for tx in txs for x in (tx.sender_id, tx.recipient_id)} - rs.keys():
+            if counterparty_id is not None:
+                rs[counterparty_id] = num2rs(counterparty_id)
+
+        for tx in txs:
+            amount = tx.amount
+            to_rs = rs[tx.recipient_id] if tx.recipient_id else None
+            if tx.id in indirect_amounts:
+                to_rs = account_rs
+                amount = indirect_amounts[tx.id]
+                if amount is None:
+                    # not split by the node, multiout or something like that
+                    tx = tx_load_recipients(tx)
+                    amount = next((r.amount for r in tx.recipients or [] if r.id == account_id), tx.amount)
+
+            yield [tx.id, tx.height, tx.block_timestamp, tx_type(tx), rs[tx.sender_id], to_rs,
+                   burst_amount(amount), burst_amount(tx.fee)]
 
-    txs = (
-            Transaction.objects.using("java_wallet")
-            .filter(Q(sender_id=id) | Q(recipient_id=id)).union(txs_indirects)
-            .order_by("-height")
-        )[:2000]
-
-    header = ['ID', 'Height', 'timestamp', 'Type', 'From', 'To', 'Amount', 'Fee']
-    writer.writerow(header)
 
+def tx_export_csv(request, id : int):
     id = int(id)
-    id_rs = num2rs(id)
-    for tx in txs:
-        amount = tx.amount
-        from_rs = id_rs if tx.sender_id == id else num2rs(tx.sender_id)
-        to_rs = num2rs(tx.recipient_id) if tx.recipient_id else None
-        if not tx.recipient_id:
-            # multiout or something like that
-            tx = tx_load_recipients(tx)
-            if tx.recipients:
-                for r in tx.recipients:
-                    if r.id == id:
-                        to_rs = id_rs
-                        amount = r.amount
-                        break
-
-        writer.writerow([tx.id, tx.height, tx.block_timestamp, tx_type(tx), from_rs, to_rs, burst_amount(amount), burst_amount(tx.fee)])
-
-    return response
+    writer = csv.writer(Echo())
+    # the rows are read while the response streams, after ReplicaReadsMiddleware
+    return StreamingHttpResponse(
+        (writer.writerow(row) for row in iter_on_replica(account_csv_rows(id))),
+        content_type='text/csv',
+        headers={'Content-Disposition': f'attachment; filename="{id}.csv"'},
+    )
 
 
 class TxDetailView(IntSlugDetailView):
     model = Transaction
-    queryset = Transaction.objects.using("java_wallet").all()
+    queryset = Transaction.objects.all()
     template_name = "txs/detail.html"
     context_object_name = "tx"
     slug_field = "id"
     slug_url_kwarg = "id"
 
+    def get_confirmed_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            if get_read_db() == PRIMARY:
+                raise
+            # confirmed in a block the replica of this request does not have yet
+            with use_primary():
+                return super().get_object(queryset)
+
     def get_object(self, queryset=None):
         try:
-            obj = super().get_object(queryset)
+            obj = self.get_confirmed_object(queryset)
         except Http404 as e:
             txs_pending = list(
                 filter(
                     lambda x: x.get("transaction")
                     == self.kwargs.get(self.slug_url_kwarg),
-                    get_unconfirmed_transactions(),
+                    CachingPendingTxs().cached_data,
                 )
             )
             if not txs_pending:
@@ -164,5 +222,6 @@ class TxDetailView(IntSlugDetailView):
         context = super().get_context_data(**kwargs)
         obj = context[self.context_object_name]
         obj.blocks_confirm = CachingLastHeight().cached_data - obj.height
-        fill_data_transaction(obj, list_page=False)
+        if not has_fragment(obj.height, self.template_name, "tx_detail", obj.id):
+            fill_data_transaction(obj, list_page=False)
         return context